@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Runs a list of ShellCommands as a pipeline of lazy line streams.
+
+Every stage yields its output one line at a time (without the trailing
+newline), and the next stage pulls those lines as it needs them. Nothing is
+read before it is needed, so memory does not grow with the size of the data,
+and a stage that stops early (e.g. `head`) stops the stages before it.
+
+Commands that stream define a `<name>_lines` function in `cmd_pkg`, which
+takes the same arguments as `<name>` plus `input`, an iterator of the lines
+piped or redirected into it (`None` if there are none). Other commands get
+the piped text appended to their params, as before, and their result is
+split into lines.
+
+`runPipelineConcurrent` runs each stage in its own thread or process
+instead, connected by bounded queues of line batches. A stage that gets
+ahead of the next one blocks until there is room in its queue, so memory
+stays bounded, while CPU-heavy stages (e.g. `grep -i`, `sort`) overlap with
+the stages feeding them.
+"""
+import multiprocessing
+import queue
+import threading
+from typing import Callable, Iterable, Iterator
+import cmd_pkg
+from cmd_pkg.StreamLines import textLines, fileLines
+from ParseCommand import ShellCommand
+
+def findCommand(name:str)-> Callable | None:
+    """
+    Returns the function of the command named `name` in cmd_pkg,
+    or None if there is no such command.
+    """
+    command = getattr(cmd_pkg, name, None)
+    return command if callable(command) else None
+
+def runStage(shellCommand:ShellCommand, upstream:Iterator[str] | None, command:Callable)-> Iterator[str]:
+    """
+    Returns the lines of output of one stage of a pipeline.
+
+    `upstream` is the output of the previous stage, or None for the first
+    stage. An input file redirect ("<") replaces it.
+    """
+    if shellCommand.fileIn:
+        upstream = fileLines(shellCommand.infile)
+
+    kwargs:dict = {
+        "flags": shellCommand.flags,
+        "params": shellCommand.params,
+        "stdin": shellCommand.stdin,
+        "stdout": shellCommand.stdout,
+    }
+
+    streamingCommand:Callable | None = getattr(cmd_pkg, f"{shellCommand.name}_lines", None)
+    if streamingCommand is not None and getattr(cmd_pkg, shellCommand.name, None) is command:
+        return streamingCommand(input=upstream, **kwargs)
+
+    # Commands that do not stream get the piped text as their last param
+    def legacyStage()-> Iterator[str]:
+        if upstream is not None:
+            shellCommand.params.append("\n".join(upstream))
+        yield from textLines(command(**kwargs))
+
+    return legacyStage()
+
+def runPipeline(commandList:list[ShellCommand], commands:dict[str, Callable])-> Iterator[str]:
+    """
+    Chains the stages of `commandList` and yields the lines of output of the
+    last stage. `commands` maps each command name to its function.
+
+    Stages only run as their output is pulled. When the returned generator is
+    exhausted or closed, every stage is closed too.
+    """
+    stages:list[Iterator[str]] = []
+    output:Iterator[str] | None = None
+
+    try:
+        for shellCommand in commandList:
+            output = runStage(shellCommand, output, commands[shellCommand.name])
+            stages.append(output)
+
+        if output is not None:
+            yield from output
+    finally:
+        # Close the last stage first, so each stage stops pulling from the one before
+        for stage in reversed(stages):
+            close = getattr(stage, "close", None)
+            if close is not None:
+                close()
+
+# Number of lines sent between concurrent stages at a time
+BATCH_SIZE:int = 1024
+# Number of batches a queue between two concurrent stages can hold
+QUEUE_SIZE:int = 16
+# Seconds a stage waits on a full or empty queue before checking if the pipeline stopped
+POLL_INTERVAL:float = 0.1
+
+def putBatch(outQueue, batch:list[str] | BaseException | None, stop)-> bool:
+    """
+    Puts `batch` on `outQueue`, waiting while it is full.
+    Returns False if the pipeline stopped first.
+    """
+    while not stop.is_set():
+        try:
+            outQueue.put(batch, timeout=POLL_INTERVAL)
+            return True
+        except(queue.Full):
+            continue
+    return False
+
+def queueLines(inQueue, stop)-> Iterator[str]:
+    """
+    Yields the lines of the batches on `inQueue`, until the stage before
+    puts None or the pipeline stops. An exception raised in the stage
+    before is raised again here.
+    """
+    while not stop.is_set():
+        try:
+            batch = inQueue.get(timeout=POLL_INTERVAL)
+        except(queue.Empty):
+            continue
+
+        if batch is None:
+            return
+        if isinstance(batch, BaseException):
+            raise batch
+        yield from batch
+
+def stageWorker(shellCommand:ShellCommand, command:Callable, inQueue, outQueue, stop)-> None:
+    """
+    Runs one stage of a concurrent pipeline, reading its input from
+    `inQueue` (None for the first stage) and putting its output on
+    `outQueue` in batches of up to BATCH_SIZE lines, then None.
+
+    A batch that is not full is put on the queue after POLL_INTERVAL
+    seconds anyway, so the lines of slow stages (e.g. `tail -f`) are
+    not held back.
+    """
+    upstream:Iterator[str] | None = queueLines(inQueue, stop) if inQueue is not None else None
+    batch:list[str] = []
+    lock:threading.Lock = threading.Lock()
+    finished:threading.Event = threading.Event()
+
+    def flush()-> bool:
+        nonlocal batch
+        sent:bool = putBatch(outQueue, batch, stop)
+        batch = []
+        return sent
+
+    def flushIdle()-> None:
+        while not finished.wait(POLL_INTERVAL):
+            with lock:
+                if batch:
+                    flush()
+
+    threading.Thread(target=flushIdle, daemon=True).start()
+
+    try:
+        for line in runStage(shellCommand, upstream, command):
+            with lock:
+                batch.append(line)
+                if len(batch) >= BATCH_SIZE and not flush():
+                    return
+
+        with lock:
+            finished.set()
+            if batch and not flush():
+                return
+        putBatch(outQueue, None, stop)
+    # Passed on to the shell, including SystemExit from `exit`
+    except(BaseException) as e:
+        putBatch(outQueue, e, stop)
+    finally:
+        finished.set()
+        # Do not wait to flush batches nobody will read
+        if stop.is_set() and hasattr(outQueue, "cancel_join_thread"):
+            outQueue.cancel_join_thread()
+
+def runPipelineConcurrent(commandList:list[ShellCommand], commands:dict[str, Callable], processes:bool = False)-> Iterator[str]:
+    """
+    Runs every stage of `commandList` at the same time, and yields the lines
+    of output of the last stage. `commands` maps each command name to its
+    function.
+
+    Stages run in threads, or in processes if `processes` is True, so they can
+    use more than one core. Commands that are not in cmd_pkg (e.g. `history`,
+    which changes the history of the shell) always run in a thread. When the
+    returned generator is exhausted or closed, every stage is stopped.
+    """
+    if processes:
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        makeQueue = lambda: context.Queue(QUEUE_SIZE)
+    else:
+        stop = threading.Event()
+        makeQueue = lambda: queue.Queue(QUEUE_SIZE)
+
+    workers:list = []
+    inQueue = None
+
+    try:
+        for shellCommand in commandList:
+            command:Callable = commands[shellCommand.name]
+            outQueue = makeQueue()
+            args:tuple = (shellCommand, command, inQueue, outQueue, stop)
+
+            if processes and command is findCommand(shellCommand.name):
+                worker = context.Process(target=stageWorker, args=args, daemon=True)
+            else:
+                worker = threading.Thread(target=stageWorker, args=args, daemon=True)
+            worker.start()
+
+            workers.append(worker)
+            inQueue = outQueue
+
+        if inQueue is not None:
+            yield from queueLines(inQueue, stop)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(POLL_INTERVAL * 10)
+            # Stages stuck in a command that does not stream can not check `stop`
+            if worker.is_alive() and hasattr(worker, "terminate"):
+                worker.terminate()
+
+def writeLines(lines:Iterable[str], file, flush:bool = False)-> None:
+    """
+    Writes `lines` to `file`, separated by newlines, as they are pulled.
+    If `flush`, each line is flushed as soon as it is written, e.g. so the
+    lines of `tail -f` show up on the terminal right away.
+    """
+    first:bool = True
+
+    for line in lines:
+        if not first:
+            file.write("\n")
+        file.write(line)
+        if flush:
+            file.flush()
+        first = False
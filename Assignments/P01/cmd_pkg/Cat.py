@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 import os
+from typing import Iterator
+from .StreamLines import textLines, fileLines, inputLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
@@ -7,32 +9,26 @@ cat_flags:set[str] = {
     "--help"
 }
 
-def cat(**kwargs):
-    """   
-    NAME
-        cat 
-
-    DESCRIPTION
-        cat                 : concatenate FILE(s) to standard output
-            --help          : displays how to use the cat command
-            
-    EXAMPLES
-        `cat <file name>`   : copy file contents to standard output
+def cat_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `cat`, yields its output one line at a time.
+    Without file params, copies the lines piped or redirected into it.
     """
     params:list[str] = kwargs.get("params", [])
     flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
-    result:str = ""
-    
+    stdin:bool = kwargs.get("stdin", True)
+
     # Check if invalid flags are present
     if not flags.issubset(cat_flags):
-        result = invalidFlagsMsg(cat, cat_flags, flags)
+        yield from textLines(invalidFlagsMsg(cat, cat_flags, flags))
     # Provide help info if --help flag present
     elif "--help" in flags:
-        result = cat.__doc__
+        yield from textLines(cat.__doc__)
+    # If input comes from a pipe or file redirect
+    elif not stdin and (kwargs.get("input") is None or not params):
+        yield from inputLines(kwargs)
     # If other valid flags or none
     else:
-        contents:list[str] = []
-
         for param in params:
             
             # Replace tilde with user directory
@@ -40,15 +36,26 @@ def cat(**kwargs):
                 param = param.replace("~", os.path.expanduser("~"), 1)
 
             if os.path.isfile(param):
-                with open(param, mode="r") as file:
-                    contents.append(file.read())
+                yield from fileLines(param)
             elif os.path.isdir(param):
-                contents.append(f"{cat.__name__}: '{param}': Is a directory")
+                yield f"{cat.__name__}: '{param}': Is a directory"
             else:
-                contents.append(f"{cat.__name__}: cannot access '{param}': No such file or directory")
-        result = '\n'.join(contents)
+                yield f"{cat.__name__}: cannot access '{param}': No such file or directory"
+
+def cat(**kwargs)-> str:
+    """   
+    NAME
+        cat 
 
-    return result    
+    DESCRIPTION
+        cat                 : concatenate FILE(s) to standard output
+            --help          : displays how to use the cat command
+            
+    EXAMPLES
+        `cat <file name>`   : copy file contents to standard output
+        `ls | cat`          : copy piped input to standard output
+    """
+    return '\n'.join(cat_lines(**kwargs))
 
 if __name__ == "__main__":
     s = cat(params=["hi", ".gitignore", "~/hi.txt"])
@@ -1,26 +1,186 @@
 #!/usr/bin/env python3
 import os, shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
+from .FlagValues import flagValues
+from .Ls import format_bytes
 
 cp_flags:set[str] = {
-    "--help"
+    "--help",
+    "-r",
+    "-p",
+    "-v",
+    "-j"
 }
 
+# Most bytes copied by one system call, or read at a time by the fallback
+CHUNK_SIZE:int = 1 << 30
+BUFFER_SIZE:int = 1 << 20
+
+def copyData(src:str, dst:str)-> int:
+    """
+    Copies the contents of file `src` to file `dst`, and returns the number
+    of bytes copied.
+
+    The kernel copies the data when it can, with `os.copy_file_range`, then
+    `os.sendfile`, so it never passes through Python. Otherwise it is copied
+    a buffer at a time.
+    """
+    with open(src, mode="rb") as infile, open(dst, mode="wb") as outfile:
+        inFd:int = infile.fileno()
+        outFd:int = outfile.fileno()
+        copied:int = 0
+
+        for copyCall in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if copyCall is None:
+                continue
+            try:
+                while True:
+                    if copyCall is os.sendfile:
+                        sent:int = os.sendfile(outFd, inFd, copied, CHUNK_SIZE)
+                    else:
+                        sent = os.copy_file_range(inFd, outFd, CHUNK_SIZE, copied, copied)
+                    if not sent:
+                        return copied
+                    copied += sent
+            # Not supported for these files (e.g. across file systems on older kernels)
+            except(OSError) as error:
+                if copied:
+                    raise error
+                continue
+
+        buffer:bytearray = bytearray(BUFFER_SIZE)
+        view:memoryview = memoryview(buffer)
+        while size := infile.readinto(buffer):
+            outfile.write(view[:size])
+            copied += size
+
+    return copied
+
+def copyFile(src:str, dst:str, preserve:bool = False)-> int:
+    """
+    Copies file `src` to `dst` with its permissions, and with -p its access
+    and modification times too. A symbolic link `src` is followed.
+    Returns the number of bytes copied.
+    """
+    copied:int = copyData(src, dst)
+    if preserve:
+        shutil.copystat(src, dst)
+    else:
+        shutil.copymode(src, dst)
+    return copied
+
+def copyLink(src:str, dst:str)-> int:
+    """
+    Copies symbolic link `src` to `dst` as a link to the same target.
+    Returns 0, no bytes are copied.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    os.symlink(os.readlink(src), dst)
+    return 0
+
+def copyTree(src:str, dst:str, preserve:bool, jobs:int, errors:list[str])-> tuple[int, int]:
+    """
+    Copies directory `src` to `dst`, with the files copied by a pool of
+    `jobs` threads. Directories are made first, in order, and with -p get
+    their times after their files are copied. Symbolic links are copied as
+    links, and other files that are not regular files (FIFOs, sockets,
+    devices) are skipped. Errors are added to `errors`.
+
+    Returns the number of files and of bytes copied.
+    """
+    files:int = 0
+    copied:int = 0
+    directories:list[tuple[str, str]] = []
+    pending:deque = deque()
+
+    def collect(future, path:str)-> None:
+        nonlocal files, copied
+        try:
+            copied += future.result()
+            files += 1
+        except(OSError) as error:
+            errors.append(f"{cp.__name__}: cannot copy '{path}': {error.strerror}")
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        walk:list[tuple[str, str]] = [(src, dst)]
+
+        while walk:
+            srcDir, dstDir = walk.pop()
+            try:
+                os.makedirs(dstDir, exist_ok=True)
+                with os.scandir(srcDir) as entries:
+                    entries = list(entries)
+            except(OSError) as error:
+                errors.append(f"{cp.__name__}: cannot copy '{srcDir}': {error.strerror}")
+                continue
+            directories.append((srcDir, dstDir))
+
+            for entry in entries:
+                target:str = os.path.join(dstDir, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        walk.append((entry.path, target))
+                        continue
+                    elif entry.is_symlink():
+                        future = executor.submit(copyLink, entry.path, target)
+                    elif entry.is_file(follow_symlinks=False):
+                        future = executor.submit(copyFile, entry.path, target, preserve)
+                    # Opening a FIFO would wait for a writer forever
+                    else:
+                        errors.append(f"{cp.__name__}: cannot copy '{entry.path}': Not a regular file")
+                        continue
+                except(OSError) as error:
+                    errors.append(f"{cp.__name__}: cannot copy '{entry.path}': {error.strerror}")
+                    continue
+
+                pending.append((future, entry.path))
+                # Only a few files per thread wait at a time, however many there are
+                if len(pending) >= jobs * 4:
+                    collect(*pending.popleft())
+
+        while pending:
+            collect(*pending.popleft())
+
+    for srcDir, dstDir in reversed(directories):
+        try:
+            if preserve:
+                shutil.copystat(srcDir, dstDir)
+            else:
+                shutil.copymode(srcDir, dstDir)
+        except(OSError) as error:
+            errors.append(f"{cp.__name__}: cannot copy '{srcDir}': {error.strerror}")
+
+    return files, copied
+
 def cp(**kwargs)-> str:
     """
     NAME
         cp
-        
+
     DESCRIPTION
-        cp          : copies a file or directory do a new location
-            --help  : displays how to use the cp command
-        
+        cp              : copies a file or directory do a new location
+            --help      : displays how to use the cp command
+            -r          : copies directories and everything in them
+            -p          : keeps the access and modification times of what is copied
+            -v          : prints how many files and bytes were copied, and how fast
+            -j <num>    : with -r, copies <num> files at a time (defaults to 4 per core, at most 32)
+
+        Copies several files (or with -r, directories) into a directory
+        when it is the last param.
+
     EXAMPLE
         `cp <file/directory to copy> <path to destination>'
+        `cp <file> <file> <directory>'
+        `cp -r -p -v <directory> <path to destination>'
     """
-    params:list[str] = kwargs.get("params", [])
-    flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
+    params:list[str] = list(kwargs.get("params", []))
+    flagList:list[str] = kwargs.get("flags", [])
+    flags:set[str] = tockenizeFlags(flagList)
     result:str = ""
 
     # Check if invalid flags are present
@@ -31,20 +191,67 @@ def cp(**kwargs)-> str:
         result = cp.__doc__
     # If other valid flags or none
     else:
-        if len(params) == 2:
-            for i in range(0, len(params)):
-                # Replace tilde with user directory
-                if params[i].startswith("~"):
-                    params[i] = params[i].replace("~", os.path.expanduser("~"), 1)
+        try:
+            jobs:int = int(flagValues(flagList, params, {"-j"}).get("-j", min(32, (os.cpu_count() or 1) * 4)))
+        except(ValueError):
+            return f"{cp.__name__}: invalid number for -j"
+
+        if len(params) < 2:
+            return f"{cp.__name__}: missing file operand(s)"
+
+        for i in range(0, len(params)):
+            # Replace tilde with user directory
+            if params[i].startswith("~"):
+                params[i] = params[i].replace("~", os.path.expanduser("~"), 1)
+
+        sources:list[str] = params[:-1]
+        destination:str = params[-1]
+        intoDirectory:bool = os.path.isdir(destination)
+
+        if len(sources) > 1 and not intoDirectory:
+            return f"{cp.__name__}: target '{destination}' is not a directory"
+
+        recursive:bool = "-r" in flags
+        preserve:bool = "-p" in flags
+        errors:list[str] = []
+        files:int = 0
+        copied:int = 0
+        start:float = perf_counter()
+
+        for src in sources:
+            target:str = os.path.join(destination, os.path.basename(os.path.normpath(src))) if intoDirectory else destination
+
             try:
-                shutil.copyfile(params[0], params[1])
-            except(FileNotFoundError, IsADirectoryError) as error:
-                result = f"{cp.__name__}: cannot copy '{error.filename}': {error.strerror}"
-        else:
-            result = f"{cp.__name__}: missing file operand(s)"
-            
+                if os.path.isdir(src):
+                    if not recursive:
+                        errors.append(f"{cp.__name__}: -r not specified; omitting directory '{src}'")
+                        continue
+                    # Copying a directory into itself would never end
+                    if os.path.commonpath([os.path.realpath(src), os.path.realpath(target)]) == os.path.realpath(src):
+                        errors.append(f"{cp.__name__}: cannot copy a directory, '{src}', into itself, '{target}'")
+                        continue
+
+                    treeFiles, treeBytes = copyTree(src, target, preserve, max(jobs, 1), errors)
+                    files += treeFiles
+                    copied += treeBytes
+                else:
+                    if os.path.exists(target) and os.path.samefile(src, target):
+                        errors.append(f"{cp.__name__}: '{src}' and '{target}' are the same file")
+                        continue
+
+                    copied += copyFile(src, target, preserve)
+                    files += 1
+            except(OSError) as error:
+                errors.append(f"{cp.__name__}: cannot copy '{error.filename}': {error.strerror}")
+
+        if "-v" in flags:
+            elapsed:float = perf_counter() - start
+            errors.append(f"copied {files} file(s), {format_bytes(copied)}B in {elapsed:.2f}s ({format_bytes(copied / elapsed if elapsed else 0)}B/s)")
+
+        result = "\n".join(errors)
+
     return result
 
 if __name__ == "__main__":
     s= cp(params=["~", "~/Fort/w2.txt"], flags=[])
-    print(s)
\ No newline at end of file
+    print(s)
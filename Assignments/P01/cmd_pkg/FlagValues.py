@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+from .TockenizeFlags import tockenizeFlags
+
+def flagValues(flagList:list[str], params:list[str], valueFlags:set[str])-> dict[str, str]:
+    """
+    Takes the values of flags that have one, e.g. `-m 5`, from the start
+    of `params`, in the order the flags were given. Raises ValueError
+    naming the flag if there are not enough params.
+    """
+    values:dict[str, str] = {}
+
+    for flagStr in flagList:
+        for flag in sorted(tockenizeFlags([flagStr]), key=lambda flag: flagStr.find(flag.removeprefix("-"))):
+            if flag in valueFlags and flag not in values:
+                if not params:
+                    raise ValueError(flag)
+                values[flag] = params.pop(0)
+
+    return values
+
+if __name__ == "__main__":
+    p = ["5", ",", "pattern", "file"]
+    print(flagValues(["-m", "-ct"], p, {"-m", "-t"}), p)
@@ -1,103 +1,379 @@
 #!/usr/bin/env python3
 import sys
 import os
-import re 
+import re
+import mmap
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator
+from .StreamLines import textLines, inputLines
 from .TockenizeFlags import tockenizeFlags
+from .FlagValues import flagValues
 from .InvalidFlagsMsg import invalidFlagsMsg
 from rich import print
 
 grep_flags:set[str] = {
-    "--help", "-c", "-i", "-v", "-l",
+    "--help", "-c", "-i", "-v", "-l", "-E", "-n", "-w", "-m", "-r", "-j", "--unordered",
 }
-def grep(**kwargs)-> str:
-    # print(kwargs)
+
+# Number of bytes at the start of a file checked for NUL bytes
+BINARY_CHECK_SIZE:int = 8192
+
+@lru_cache(maxsize=64)
+def compilePattern(pattern:str | bytes, extended:bool, ignore_case:bool, whole_word:bool)-> re.Pattern:
     """
-    NAME
-        grep
-        
-    DESCRIPTION
-        grep                    : prints out the lines in a file that match a given pattern
-            --help              : displays how to use the grep command
-            -c                  : prints the number of lines in a file that match a given pattern
-            -i                  : ignores upper and lower case when searching for a pattern
-            -v                  : prints lines that do not match the pattern
-            -l                  : prints only the names of files that contain at least one matching line
-    
-    EXAMPLE
-        `grep python README.md' : prints out the lines in README.md that contain the word "python"
-            
+    Compiles a grep pattern, once per pattern and options.
+
+    Without `extended` the pattern is a fixed string. MULTILINE makes `^`
+    and `$` match at the start and end of each line when searching a
+    whole file at once.
+    """
+    if not extended:
+        pattern = re.escape(pattern)
+    if whole_word:
+        pattern = (rb"(?<!\w)(?:%s)(?!\w)" if isinstance(pattern, bytes) else r"(?<!\w)(?:%s)(?!\w)") % pattern
+
+    return re.compile(pattern, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+
+def matchingLineSpans(regex:re.Pattern, data)-> Iterator[tuple[int, int]]:
+    """
+    Yields the (start, end) byte offsets of each line of `data` that has a
+    match of `regex`, end excluding the newline. The whole buffer is searched
+    at once, so the lines in between are never looked at one by one.
+
+    With -E a match can run across newlines, or look past them, so each line
+    found is searched again on its own, as if lines were searched one by one.
+    """
+    size:int = len(data)
+    pos:int = 0
+
+    while pos < size:
+        for match in regex.finditer(data, pos):
+            # Only the first match of each line is needed, but a later one that
+            # runs into the next lines may hide their matches, so search again from there
+            if match.start() < pos:
+                if match.end() > pos:
+                    break
+                continue
+            # An empty match after the last newline is not on a line
+            if match.start() == size and data[size - 1] == ord("\n"):
+                return
+
+            start:int = data.rfind(b"\n", pos, match.start()) + 1 or pos
+            end:int = data.find(b"\n", match.start())
+            if end == -1:
+                end = size
+
+            if regex.search(data[start:end]) is not None:
+                yield start, end
+            pos = end + 1
+
+            # The lines a match ran into may have their own, search again from the next line
+            if match.end() > end:
+                break
+        else:
+            return
+
+def searchBuffer(regex:re.Pattern, data, invert_match:bool = False)-> Iterator[tuple[int, int]]:
+    """
+    Yields the (start, end) byte offsets of the selected lines of `data`,
+    the lines with a match, or without one if `invert_match`.
+    """
+    if not invert_match:
+        yield from matchingLineSpans(regex, data)
+        return
+
+    size:int = len(data)
+    pos:int = 0
+
+    # Every line between two matching lines is selected
+    for start, end in [*matchingLineSpans(regex, data), (size + 1, size + 1)]:
+        while pos < start and pos < size:
+            lineEnd:int = data.find(b"\n", pos, start)
+            if lineEnd == -1:
+                lineEnd = min(start, size)
+            yield pos, lineEnd
+            pos = lineEnd + 1
+        pos = end + 1
+
+def searchFile(path:str, pattern:str, extended:bool = False, ignore_case:bool = False, whole_word:bool = False, invert_match:bool = False, line_numbers:bool = True)-> Iterator[tuple[int, str]]:
+    """
+    Yields the line number and text of each selected line of the file at `path`.
+
+    The file is memory mapped and searched as bytes, so `\\w` and -w only
+    know ASCII letters, and only the selected lines are decoded. Line
+    numbers are counted between selected lines, and are all 0 if
+    `line_numbers` is False.
+    """
+    # Bytes patterns only ignore the case of ASCII letters, search the text instead
+    if ignore_case and not pattern.isascii():
+        regex:re.Pattern = compilePattern(pattern, extended, ignore_case, whole_word)
+        with open(path, mode="r", newline="\n") as file:
+            for line_number, line in enumerate(file, start=1):
+                if bool(regex.search(line.removesuffix("\n"))) != invert_match:
+                    yield line_number, line.removesuffix("\n")
+        return
+
+    regex:re.Pattern = compilePattern(pattern.encode("utf-8"), extended, ignore_case, whole_word)
+
+    with open(path, mode="rb") as file:
+        # Empty files can not be memory mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            line_number:int = 1 if line_numbers else 0
+            counted:int = 0
+
+            for start, end in searchBuffer(regex, data, invert_match):
+                if line_numbers:
+                    line_number += data[counted:start].count(b"\n")
+                    counted = start
+                yield line_number, data[start:end].decode("utf-8", errors="replace")
+
+def searchLines(lines:Iterator[str], pattern:str, extended:bool = False, ignore_case:bool = False, whole_word:bool = False, invert_match:bool = False)-> Iterator[tuple[int, str]]:
+    """
+    Yields the line number and text of each selected line of `lines`.
+    """
+    search = compilePattern(pattern, extended, ignore_case, whole_word).search
+
+    for line_number, line in enumerate(lines, start=1):
+        if bool(search(line)) != invert_match:
+            yield line_number, line
+
+def isBinary(path:str)-> bool:
+    """
+    Returns True if the file at `path` looks binary, i.e. has a NUL
+    byte in its first BINARY_CHECK_SIZE bytes.
+    """
+    with open(path, mode="rb") as file:
+        return b"\0" in file.read(BINARY_CHECK_SIZE)
+
+def walkFiles(path:str)-> Iterator[str]:
+    """
+    Yields the paths of the files under the directory `path`, recursively,
+    in name order. Symbolic links to directories are not followed.
+    """
+    try:
+        with os.scandir(path) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+    except(OSError):
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from walkFiles(entry.path)
+        elif entry.is_file():
+            yield entry.path
+
+def grepFile(path:str, pattern:str, options:dict, line_numbers:bool = False, max_count:int | None = None, keep_text:bool = True)-> list[tuple[int, str]] | str | None:
+    """
+    Searches one file for the process pool of `grep_lines`.
+
+    Returns the selected lines, up to `max_count` (without their text if
+    not `keep_text`), None if the file is binary, or an error message if
+    the file can not be read.
+    """
+    try:
+        if isBinary(path):
+            return None
+        selected:Iterator[tuple[int, str]] = searchFile(path, pattern, **options, line_numbers=line_numbers)
+        return [(line_number, line if keep_text else "") for line_number, line in islice(selected, max_count)]
+    except(OSError) as e:
+        return f"{grep.__name__}: cannot read '{path}': {e.strerror}"
+
+def parallelGrep(paths:Iterator[str], jobs:int, ordered:bool, *args)-> Iterator[tuple[str, list[tuple[int, str]] | str | None]]:
+    """
+    Yields each path of `paths` with the result of `grepFile(path, *args)`,
+    searching up to `jobs` files at a time in a process pool.
+
+    If `ordered`, results come in the order of `paths`, else as soon as
+    they are ready. Only a few files per process are queued at a time, so
+    the paths are walked as the results are pulled.
+    """
+    executor:ProcessPoolExecutor = ProcessPoolExecutor(max_workers=jobs)
+    pending:deque = deque()
+    window:int = jobs * 4
+
+    try:
+        paths = iter(paths)
+        for path in paths:
+            pending.append((path, executor.submit(grepFile, path, *args)))
+            if len(pending) < window:
+                continue
+
+            if ordered:
+                path, future = pending.popleft()
+                yield path, future.result()
+            else:
+                wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+                for path, future in [item for item in pending if item[1].done()]:
+                    pending.remove((path, future))
+                    yield path, future.result()
+
+        while pending:
+            if not ordered:
+                wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+                pending = deque(sorted(pending, key=lambda item: not item[1].done()))
+            path, future = pending.popleft()
+            yield path, future.result()
+    finally:
+        # Files already being searched are waited for, the rest are dropped
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def grep_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `grep`, yields its output one line at a time.
+    Files are searched with `searchFile`, piped input line by line.
+    With -r, or -j greater than 1, files are searched by a process pool.
     """
-    flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
-    params:list[str] = kwargs.get("params", [])
+    flagList:list[str] = kwargs.get("flags", [])
+    flags:set[str] = tockenizeFlags(flagList)
+    params:list[str] = list(kwargs.get("params", []))
     stdin:bool = kwargs.get("stdin", True)
-    result:str = ""
-    
+
     # Check if invalid flags are present
     if not flags.issubset(grep_flags):
-        result = invalidFlagsMsg(grep, grep_flags, flags)
+        yield from textLines(invalidFlagsMsg(grep, grep_flags, flags))
+        return
     # Provide help info if --help flag present
     elif "--help" in flags:
-        result = "".join(grep.__doc__)
-       
-    
-    elif stdin:
-        ignore_case:bool = "-i" in flags
+        yield from textLines(grep.__doc__)
+        return
+
+    # Flags with a number take the first params, in the order of the flags,
+    # e.g. `grep -m 5 -j 4 <pattern> <dir>`
+    try:
+        values:dict[str, int] = {flag: int(value) for flag, value in flagValues(flagList, params, {"-m", "-j"}).items()}
+    except(ValueError):
+        yield f"{grep.__name__}: invalid number for -m or -j"
+        return
+
+    max_count:int | None = values.get("-m")
+    recursive:bool = "-r" in flags
+    jobs:int = max(values.get("-j", (os.cpu_count() or 1) if recursive else 1), 1)
+    # Daemon processes, like the stages of a concurrent pipeline, can not start a pool
+    if multiprocessing.current_process().daemon:
+        jobs = 1
+
+    if params:
+        options:dict = {
+            "extended": "-E" in flags,
+            "ignore_case": "-i" in flags,
+            "whole_word": "-w" in flags,
+            "invert_match": "-v" in flags,
+        }
         count_only:bool = "-c" in flags
-        invert_match:bool = "-v" in flags
         list_file:bool = "-l" in flags
-        
-        contents:list[list[str]] = []
-        count:int = 0
-        # print(kwargs)
+        line_numbers:bool = "-n" in flags
+
+        pattern:str = params[0]
         try:
-            if len(params) >= 2:
-                pattern = params[0]
-                paths = params[1:]
-
-                for path in paths:
-                    if os.path.isfile(path):
-                        with open(path, 'r') as file:
-                            line_number = 1
-                            for line in file:
-                                line = line.strip()
-                                match = False
-
-                                if ignore_case:
-                                    pattern = re.escape(pattern)
-                                    if re.search(pattern, line, re.IGNORECASE):
-                                        match = True
-                                         
-                                elif pattern in line:
-                                    match = True
-                                   
-
-                                if match and not invert_match:
-                                    if not list_file:
-                                        contents.append(f'{os.path.abspath(path)}: {line_number}: {line}')
-                                    elif list_file:
-                                        contents.append(f'{os.path.abspath(path)}')
-                                        
-                                    count += 1
-                                elif not match and invert_match:
-                                    if not count_only:
-                                        contents.append(f'{os.path.abspath(path)}: {line_number}: {line}')
-
-                                line_number += 1
-
-                if count_only:
-                    return str(count)
+            compilePattern(pattern, options["extended"], options["ignore_case"], options["whole_word"])
+        except(re.error) as e:
+            yield f"{grep.__name__}: invalid pattern '{pattern}': {e}"
+            return
+
+        # Lines to search, and the name to show for them (None for piped input)
+        sources:Iterator[tuple[str | None, Iterable[tuple[int, str]] | str | None]]
+        if stdin:
+            missing:list[str] = []
+
+            def searchPaths()-> Iterator[str]:
+                for path in params[1:]:
+                    if recursive and os.path.isdir(path):
+                        yield from walkFiles(path)
+                    elif os.path.isfile(path):
+                        yield path
+                    else:
+                        missing.append(path)
+
+            def searchSequential()-> Iterator[tuple[str, Iterable[tuple[int, str]] | str | None]]:
+                for path in searchPaths():
+                    # Files are only opened when their turn comes
+                    try:
+                        yield path, None if isBinary(path) else searchFile(path, pattern, **options, line_numbers=line_numbers)
+                    except(OSError) as e:
+                        yield path, f"{grep.__name__}: cannot read '{path}': {e.strerror}"
+
+            if jobs > 1:
+                sources = parallelGrep(searchPaths(), jobs, "--unordered" not in flags, pattern, options, line_numbers, 1 if list_file else max_count, not count_only)
+            else:
+                sources = searchSequential()
+        else:
+            lines:Iterator[str] = inputLines({"input": kwargs.get("input"), "params": params[1:]})
+            sources = iter([(None, searchLines(lines, pattern, **options))])
 
+        count:int = 0
+        for path, selected in sources:
+            name:str | None = os.path.abspath(path) if path is not None else None
+
+            # Binary files are skipped
+            if selected is None:
+                continue
+            if isinstance(selected, str):
+                yield selected
+                continue
+
+            fileCount:int = 0
+            for line_number, line in selected:
+                if max_count is not None and fileCount >= max_count:
+                    break
+
+                line = line.strip()
+                fileCount += 1
+                count += 1
                 if list_file:
-                    # contents = [os.path.abspath(path) for path in paths]
-                    result = "\n".join(set(contents)) 
-                    
+                    yield name if name is not None else "(standard input)"
+                    break
+                elif count_only:
+                    pass
+                elif line_numbers:
+                    yield f'{name}: {line_number}: {line}' if name is not None else f'{line_number}: {line}'
                 else:
-                    result = "\n".join(contents)
-                    
-        except FileNotFoundError as e:
-            result = f"Error: '{e.filename}' not found."
+                    yield f'{name}: {line}' if name is not None else line
+
+            if hasattr(selected, "close"):
+                selected.close()
+
+        if stdin:
+            for path in missing:
+                yield f"{grep.__name__}: cannot access '{path}': No such file or directory"
+
+        if count_only and not list_file:
+            yield str(count)
+
+def grep(**kwargs)-> str:
+    """
+    NAME
+        grep
 
-    return result
+    DESCRIPTION
+        grep                    : prints out the lines in a file that match a given pattern
+            --help              : displays how to use the grep command
+            -c                  : prints the number of lines in a file that match a given pattern
+            -i                  : ignores upper and lower case when searching for a pattern
+            -v                  : prints lines that do not match the pattern
+            -l                  : prints only the names of files that contain at least one matching line
+            -E                  : the pattern is a regular expression, instead of plain text
+            -n                  : prints the line number of each matching line
+            -w                  : only matches whole words
+            -m <num>            : stops reading a file after <num> matching lines
+            -r                  : searches every file under the given directories, skipping binary files
+            -j <num>            : searches <num> files at a time (defaults to the number of cores with -r)
+            --unordered         : with -j, prints the results of each file as soon as it is searched
+
+    EXAMPLE
+        `grep python README.md'          : prints out the lines in README.md that contain the word "python"
+        `grep -n -m 3 python README.md'  : prints the first 3 of them, with their line numbers
+        `grep -E '^[0-9]+[.]' facts.txt' : prints out the lines in facts.txt that start with a number and a dot
+        `grep -r -j 4 TODO .'            : searches every file under the current directory, 4 at a time
+
+    """
+    return "\n".join(grep_lines(**kwargs))
 
 if __name__ == "__main__":
 
@@ -106,4 +382,4 @@ if __name__ == "__main__":
     #     print(grep.__doc__)
     #     sys.exit(1)
     # grep(pattern=sys.argv[1], path=sys.argv[2])
-    print(grep(params=["Angel","README.md", ]))
\ No newline at end of file
+    print(grep(params=["Angel","README.md", ]))
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 import os
+from itertools import islice
+from typing import Iterator
+from .StreamLines import textLines, fileLines, inputLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
@@ -7,23 +10,15 @@ head_flags:set[str] = {
     "--help"
 }
 
-def head(**kwargs):
-    """   
-    NAME
-        head 
-
-    DESCRIPTION
-        head               : display the first 10 lines of a file         
-            --help         : displays how to use the head command
-            -<n>           : displays the first n lines of a file
-            
-    EXAMPLES
-        `head <file name>` : copy the first 10 lines of the file contents to standard output
+def head_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `head`, yields its output one line at a time.
+    Stops pulling lines from its input after the first n, so the commands
+    before it in a pipeline stop too.
     """
     params:list[str] = kwargs.get("params", [])
     flags:set[str] = set(kwargs.get("flags", []))
     stdin:bool = kwargs.get("stdin", True)
-    result:str = ""
     numDisplayLines:int = 10
     
     # Check for -n flag
@@ -32,20 +27,21 @@ def head(**kwargs):
         try:
             numDisplayLines = int(numFlag.removeprefix("-"))
         except(ValueError) as e:
-            return f"{head.__name__}: invalid option -- {numFlag}\nTry '{head.__name__} --help for more information."
+            yield f"{head.__name__}: invalid option -- {numFlag}"
+            yield f"Try '{head.__name__} --help for more information."
+            return
     # When n flag not present
     else:
         flags = tockenizeFlags(flags)
 
     # Check if invalid flags are present
     if not flags.issubset(head_flags):
-        result = invalidFlagsMsg(head, head_flags, flags)
+        yield from textLines(invalidFlagsMsg(head, head_flags, flags))
     # Provide help info if --help flag present
     elif "--help" in flags:
-        result = head.__doc__
+        yield from textLines(head.__doc__)
     # If other valid flags and expect data from stdin
     elif stdin:
-        contents:list[str] = []
         for param in params:
             
             # Replace tilde with user directory
@@ -53,36 +49,35 @@ def head(**kwargs):
                 param = param.replace("~", os.path.expanduser("~"), 1)
 
             if os.path.isfile(param):
-                with open(param, mode="r") as file:
-                    for line_number, line in enumerate(file, start=1):
-                        if line_number <= numDisplayLines:  # Only read the first n lines
-                            line = line.strip()
-                            contents.append(line)
-                        else:
-                            break  # Stop reading after the first n lines
-                            
+                lines:Iterator[str] = fileLines(param)
+                # Only read the first n lines, closing the file after them
+                for line in islice(lines, max(numDisplayLines, 0)):
+                    yield line.strip()
+                lines.close()
             elif os.path.isdir(param):
-                contents.append(f"{head.__name__}: '{param}': Is a directory")
+                yield f"{head.__name__}: '{param}': Is a directory"
             else:
-                contents.append(f"{head.__name__}: cannot access '{param}': No such file or directory")
-                
-        result = '\n'.join(contents)
+                yield f"{head.__name__}: cannot access '{param}': No such file or directory"
     # if other valid flags and expect data from pipe or file redirect
     else:
-        contents:list[str] = []
-        for param in params:
-            
-            text:list[str] = param.splitlines()
+        # Only get the first n lines
+        for line in islice(inputLines(kwargs), max(numDisplayLines, 0)):
+            yield line.strip()
 
-            for line_number, line in enumerate(text, start=1):
-                if line_number <= numDisplayLines: # Only get the first n lines
-                    line = line.strip()
-                    contents.append(line)
-                else:
-                    break # Stop reading after the first n lines
+def head(**kwargs)-> str:
+    """   
+    NAME
+        head 
 
-        result = '\n'.join(contents)
-    return result    
+    DESCRIPTION
+        head               : display the first 10 lines of a file         
+            --help         : displays how to use the head command
+            -<n>           : displays the first n lines of a file
+            
+    EXAMPLES
+        `head <file name>` : copy the first 10 lines of the file contents to standard output
+    """
+    return '\n'.join(head_lines(**kwargs))
 
 if __name__ == "__main__":
     s = head(params=["facts.txt"])
@@ -1,89 +1,407 @@
 #!/usr/bin/env python3
 import os
 import sys
+import mmap
+import select
+import shutil
+import tempfile
+from bisect import bisect_right
+from typing import Iterator
+from .StreamLines import textLines, fileLines, inputLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
-CLEAR = "\033c"
+ALT_SCREEN_ON = "\033[?1049h"   # Switch to the alternate screen, the shell's screen is restored after
+ALT_SCREEN_OFF = "\033[?1049l"  # Switch back to the normal screen
+HIDE_CURSOR = "\033[?25l"       # Hide the cursor
+SHOW_CURSOR = "\033[?25h"       # Show the cursor
+CLEAR_LINE = "\033[K"           # Clear from the cursor to the end of the line
+REVERSE = "\033[7m"             # Reverse video, for the status line
+RESET = "\033[0m"               # Reset text formatting and color
 
 less_flags:set[str] = {"--help"}
 
-def less(**kwargs):
+# Bytes between two checkpoints of a LineIndex
+INDEX_GAP:int = 1 << 20
+# Bytes counted at a time when looking for a line number
+COUNT_BLOCK:int = 1 << 20
+# Farthest a line number is counted for the status line, in bytes, so
+# jumping to the end of a huge file does not count all of its lines
+STATUS_COUNT_LIMIT:int = 64 << 20
+
+class LineIndex(object):
     """
-    NAME
-        less
-    
-    DESCRIPTION
-        less               : display the contents of a file one page at a time
-            --help         : displays how to use the less command
-            
-    EXAMPLES
-        `less <file name>` : copy the contents of the file to standard output
+    Finds the lines of a (memory mapped) file without reading all of it.
+
+    Positions are the byte offsets of the start of lines. Line numbers are
+    counted from the nearest checkpoint before them, and a new checkpoint is
+    kept every INDEX_GAP bytes or so, as the lines are looked at.
+    """
+    def __init__(self, data) -> None:
+        """
+        Init LineIndex Object
+        """
+        # contents of the file, `mmap` or `bytes`
+        self.data = data
+        # size of the file in bytes
+        self.size:int = len(data)
+
+        # byte offsets of the checkpoints, sorted
+        self.offsets:list[int] = [0]
+        # line numbers of the checkpoints, counted from 0
+        self.numbers:list[int] = [0]
+
+    def addCheckpoint(self, index:int, offset:int, number:int)-> None:
+        """
+        Keeps a checkpoint after the one at `index`, if it is far enough from it.
+        """
+        if offset - self.offsets[index] >= INDEX_GAP:
+            self.offsets.insert(index + 1, offset)
+            self.numbers.insert(index + 1, number)
+
+    def nextLine(self, offset:int)-> int | None:
+        """
+        Returns the start of the line after the one at `offset`, None if it is the last.
+        """
+        end:int = self.data.find(b"\n", offset)
+        if end == -1 or end + 1 >= self.size:
+            return None
+        return end + 1
+
+    def previousLine(self, offset:int)-> int | None:
+        """
+        Returns the start of the line before the one at `offset`, None if it is the first.
+        """
+        if offset <= 0:
+            return None
+        return self.data.rfind(b"\n", 0, offset - 1) + 1
+
+    def lineStart(self, offset:int)-> int:
+        """
+        Returns the start of the line `offset` is in.
+        """
+        return self.data.rfind(b"\n", 0, offset) + 1
+
+    def lastLine(self)-> int:
+        """
+        Returns the start of the last line.
+        """
+        return self.data.rfind(b"\n", 0, max(self.size - 1, 0)) + 1
+
+    def lineNumber(self, offset:int, limit:int | None = None)-> int | None:
+        """
+        Returns the line number (from 0) of the line at `offset`, or None if
+        it is more than `limit` bytes from the nearest checkpoint.
+        """
+        index:int = bisect_right(self.offsets, offset) - 1
+        pos:int = self.offsets[index]
+        number:int = self.numbers[index]
+
+        if limit is not None and offset - pos > limit:
+            return None
+
+        while pos < offset:
+            end:int = min(pos + COUNT_BLOCK, offset)
+            number += self.data[pos:end].count(b"\n")
+            pos = end
+
+        self.addCheckpoint(index, offset, number)
+        return number
+
+    def lineOffset(self, number:int)-> int:
+        """
+        Returns the start of line `number` (from 0), or of the last line
+        if there are not that many.
+        """
+        index:int = bisect_right(self.numbers, number) - 1
+        pos:int = self.offsets[index]
+        current:int = self.numbers[index]
+
+        # Skip whole blocks while the line is not in them
+        scan:int = pos
+        while current < number:
+            end:int = min(scan + COUNT_BLOCK, self.size)
+            count:int = self.data[scan:end].count(b"\n")
+            if current + count >= number or end == self.size:
+                break
+            if count:
+                current += count
+                pos = self.data.rfind(b"\n", scan, end) + 1
+            scan = end
+
+        while current < number:
+            nextPos:int | None = self.nextLine(pos)
+            if nextPos is None:
+                break
+            pos = nextPos
+            current += 1
+
+        self.addCheckpoint(bisect_right(self.offsets, pos) - 1, pos, current)
+        return pos
+
+    def text(self, offset:int, width:int)-> str:
+        """
+        Returns the line at `offset` as it fits in `width` columns. Only the
+        start of very long lines is decoded.
         """
+        end:int = self.data.find(b"\n", offset, offset + width * 4)
+        if end == -1:
+            end = min(offset + width * 4, self.size)
+
+        line:str = self.data[offset:end].decode("utf-8", errors="replace")
+        line = line.rstrip("\r").expandtabs()
+        # Control characters would move the cursor
+        line = "".join(char if char.isprintable() else "?" for char in line)
+        return line[:width]
+
+def readKey(fd:int)-> str:
+    """
+    Reads one key press. Keys like the arrows send an escape sequence,
+    which is returned whole, e.g. "\\x1b[A".
+    """
+    key:bytes = os.read(fd, 1)
+
+    if key == b"\x1b":
+        while select.select([fd], [], [], 0.05)[0]:
+            key += os.read(fd, 1)
+            if key[-1:].isalpha() or key.endswith(b"~"):
+                break
+    # Rest of a character of more than one byte
+    elif key and key[0] >= 0xC0:
+        while select.select([fd], [], [], 0.05)[0] and len(key) < 4:
+            key += os.read(fd, 1)
+            try:
+                return key.decode("utf-8")
+            except(UnicodeDecodeError):
+                continue
+
+    return key.decode("utf-8", errors="replace")
+
+def page(data, name:str, fd:int)-> None:
+    """
+    Shows `data` one screen at a time, until 'q' is pressed.
+
+    Only the lines on the screen are read, so even huge files open right
+    away. Each key redraws the screen in place with ANSI escapes.
+    """
+    index:LineIndex = LineIndex(data)
+    top:int = 0
+    message:str = ""
+    pattern:bytes = b""
+
+    def draw(status:str | None = None)-> None:
+        columns, rows = shutil.get_terminal_size()
+        height:int = max(rows - 1, 1)
+        screen:list[str] = []
+
+        pos:int | None = top if index.size else None
+        for row in range(1, height + 1):
+            text:str = "~" if pos is None else index.text(pos, columns)
+            screen.append(f"\033[{row};1H{text}{CLEAR_LINE}")
+            if pos is not None:
+                pos = index.nextLine(pos)
+
+        if status is None:
+            number:int | None = index.lineNumber(top, STATUS_COUNT_LIMIT)
+            where:str = f"line {number + 1}" if number is not None else "line ?"
+            percent:int = 100 if pos is None else (pos * 100) // max(index.size, 1)
+            status = f" {name}  {where}  {percent}%  {message or 'q quit, f/space next page, b previous page, / search, n/N next/previous match'}"
+        screen.append(f"\033[{height + 1};1H{REVERSE}{status[:columns]}{RESET}{CLEAR_LINE}")
+
+        sys.stdout.write("".join(screen))
+        sys.stdout.flush()
+
+    def scroll(lines:int)-> None:
+        nonlocal top
+        for _ in range(abs(lines)):
+            pos:int | None = index.nextLine(top) if lines > 0 else index.previousLine(top)
+            if pos is None:
+                break
+            top = pos
+
+    def search(forward:bool)-> None:
+        nonlocal top, message
+        if not pattern:
+            return
+
+        # Scans from the current line, only as far as the next match
+        if forward:
+            start:int | None = index.nextLine(top)
+            found:int = data.find(pattern, start) if start is not None else -1
+        else:
+            found = data.rfind(pattern, 0, top)
+
+        if found == -1:
+            message = f"Pattern not found: {pattern.decode('utf-8', errors='replace')}"
+        else:
+            top = index.lineStart(found)
+
+    def prompt(text:str)-> str | None:
+        """
+        Reads a line typed on the status line, None if escape is pressed.
+        """
+        typed:str = ""
+        while True:
+            draw(text + typed)
+            key:str = readKey(fd)
+            if key in ("\r", "\n"):
+                return typed
+            elif key.startswith("\x1b") or key == "\x03":
+                return None
+            elif key in ("\x7f", "\b"):
+                typed = typed[:-1]
+            elif key.isprintable():
+                typed += key
+
+    count:str = ""
+    draw()
+    while True:
+        key:str = readKey(fd)
+        height:int = max(shutil.get_terminal_size().lines - 1, 1)
+        message = ""
+
+        # A number before a key repeats it, or is the line to go to with 'g'
+        if key.isdigit():
+            count += key
+            continue
+        repeat:int = int(count) if count else 1
+
+        if key in ("q", "Q", "\x03", ""):
+            break
+        elif key in ("j", "\r", "\n", "\x1b[B", "\x1bOB"):
+            scroll(repeat)
+        elif key in ("k", "\x1b[A", "\x1bOA"):
+            scroll(-repeat)
+        elif key in ("f", " ", "\x1b[6~"):
+            scroll(height * repeat)
+        elif key in ("b", "\x1b[5~"):
+            scroll(-height * repeat)
+        elif key == "g":
+            top = index.lineOffset(int(count) - 1) if count else 0
+        elif key == "G":
+            top = index.lastLine()
+            scroll(-(height - 1))
+        elif key == "/":
+            typed:str | None = prompt("/")
+            if typed:
+                pattern = typed.encode("utf-8")
+                search(True)
+        elif key == "n":
+            search(True)
+        elif key == "N":
+            search(False)
+
+        count = ""
+        draw()
+
+def pageFile(file, name:str, fd:int)-> None:
+    """
+    Memory maps the open binary `file` and pages it, see `page`.
+    """
+    # Empty files can not be memory mapped
+    if os.fstat(file.fileno()).st_size == 0:
+        page(b"", name, fd)
+        return
+
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        page(data, name, fd)
+
+def less_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `less`. On a terminal, pages each file (or the
+    piped input) and yields nothing. Otherwise, e.g. in the middle of a
+    pipeline, it copies its input like `cat`.
+    """
     params:list[str] = kwargs.get("params", [])
     flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
-    result:str = CLEAR
-    message:str = ""
-    contents:list[str] = []
+    stdin:bool = kwargs.get("stdin", True)
+    stdout:bool = kwargs.get("stdout", True)
+
     # Check if invalid flags are present
     if not flags.issubset(less_flags):
-        result = invalidFlagsMsg(less, less_flags, flags)
+        yield from textLines(invalidFlagsMsg(less, less_flags, flags))
+        return
     # Provide help info if --help flag present
-    if "--help" in flags:
-        result = less. __doc__
-        
-     
-    # If other valid flags or none
+    elif "--help" in flags:
+        yield from textLines(less.__doc__)
+        return
+
+    paths:list[str] = []
+    for param in params if stdin or kwargs.get("input") is not None else []:
+        # Replace tilde with user directory
+        if param.startswith("~"):
+            param = param.replace("~", os.path.expanduser("~"), 1)
+
+        if os.path.isfile(param):
+            paths.append(param)
+        else:
+            yield f"{less.__name__}: cannot access '{param}': No such file or directory"
 
+    interactive:bool = stdout and sys.stdin.isatty() and sys.stdout.isatty()
+    try:
+        import termios, tty
+    except(ImportError):
+        interactive = False
+
+    if not interactive:
+        for path in paths:
+            yield from fileLines(path)
+        if not stdin and not paths:
+            yield from inputLines(kwargs)
+        return
 
+    fd:int = sys.stdin.fileno()
+    oldSettings = termios.tcgetattr(fd)
     try:
-        # if len(params) > 0:
-        for param in params:
-            #print(CLEAR)
-            os.system('clear' if os.name == 'posix' else 'cls')
-            # filename = params[0]
-            if os.path.isfile(param):
-                with open(param, 'r') as file:
-                    lines = file.readlines()
-                    num_lines = len(lines)
-                    current_line = 0
-                    lines_per_page = 10  # Number of lines to display per page
-
-                    while True:
-                        print(CLEAR)
-                        #os.system('clear' if os.name == 'posix' else 'cls')  # Clear the terminal screen
-
-                        for i in range(current_line, current_line + lines_per_page):
-                            if i < num_lines:
-                                print(lines[i].rstrip())
-
-                        print("\n-- Press 'q' to quit, 'f' for next page, 'b' for previous page --")
-
-                        user_input = input()
-                        #  return to terminal screen
-                        if user_input == 'q':
-                            break
-                        # move forward a page
-                        elif user_input == 'f':
-                            current_line += lines_per_page 
-                            if current_line >= num_lines:
-                                current_line = num_lines - 1
-                        # move backward a page
-                        elif user_input == 'b':
-                            current_line -= lines_per_page
-                            if current_line < 0:
-                                current_line = 0
-                        print(CLEAR)
-                        #os.system('clear' if os.name == 'posix' else 'cls')
-    except(FileNotFoundError) as error:
-        result = f"{less.__name__}: cannot access '{error.filename}': {error.strerror}"
-           
-    return result
-    
+        tty.setcbreak(fd)
+        sys.stdout.write(ALT_SCREEN_ON + HIDE_CURSOR)
+
+        for path in paths:
+            with open(path, mode="rb") as file:
+                pageFile(file, path, fd)
+
+        # Piped input is saved to a temporary file to page it the same way
+        if not stdin and not paths:
+            with tempfile.TemporaryFile() as spool:
+                for line in inputLines(kwargs):
+                    spool.write(line.encode("utf-8", errors="surrogateescape") + b"\n")
+                spool.flush()
+                pageFile(spool, "(standard input)", fd)
+    except(KeyboardInterrupt):
+        pass
+    finally:
+        sys.stdout.write(SHOW_CURSOR + ALT_SCREEN_OFF)
+        sys.stdout.flush()
+        termios.tcsetattr(fd, termios.TCSADRAIN, oldSettings)
+
+def less(**kwargs)-> str:
+    """
+    NAME
+        less
+
+    DESCRIPTION
+        less               : display the contents of a file one page at a time
+            --help         : displays how to use the less command
+
+        keys:
+            q              : quit
+            f, space       : next page
+            b              : previous page
+            j, k, arrows   : next / previous line
+            g, G, <n>g     : first line, last line, line n
+            /<text>        : search forward for text
+            n, N           : next / previous match
+
+    EXAMPLES
+        `less <file name>` : shows the contents of the file one page at a time
+        `ls -l | less`     : shows the output of ls one page at a time
+        """
+    return '\n'.join(less_lines(**kwargs))
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
-        print("Usage: python less.py <filename>")
+        print("Usage: python -m cmd_pkg.Less <filename>")
         sys.exit(1)
 
-    less_output = less(params=["facts.txt"])
-    print(less_output)  # Print the captured output
\ No newline at end of file
+    less_output = less(params=[sys.argv[1]])
+    print(less_output)  # Print the captured output
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-import os, stat, datetime, pwd, grp
+import os, stat, datetime, pwd, grp, shutil
+from functools import lru_cache
+from typing import Iterator
+from .StreamLines import textLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
@@ -10,12 +13,18 @@ BLUE = "\033[94m"      # Blue text
 RED = "\033[91m"       # Red text
 
 ls_flags:set[str] = {
-    "-l",    
+    "-l",
     "-a",
     "-h",
+    "-R",
+    "-S",
+    "-t",
     "--help",
 }
 
+# Spaces between the columns of a short listing
+COLUMN_GAP:int = 2
+
 # Converts bytes to "human-readable" format
 # Credits to:
 # https://stackoverflow.com/questions/12523586/python-format-size-application-converting-b-to-kb-mb-gb-tb
@@ -30,231 +39,282 @@ def format_bytes(num_bytes:float)-> str:
 
     return f"{num_bytes:.1f}{power_labels[n]}" if n > 0 else f"{num_bytes:.0f}"
 
-def calculate_total(directory_path):
-    total_blocks = 0
-    
-    for path in os.scandir(directory_path):
-        total_blocks += os.stat(path).st_blocks
+@lru_cache(maxsize=None)
+def userName(uid:int)-> str:
+    """
+    Returns the name of user `uid`, or the id if it has none.
+    Looked up once per user, however many files they own.
+    """
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except(KeyError):
+        return str(uid)
+
+@lru_cache(maxsize=None)
+def groupName(gid:int)-> str:
+    """
+    Returns the name of group `gid`, or the id if it has none.
+    """
+    try:
+        return grp.getgrgid(gid).gr_name
+    except(KeyError):
+        return str(gid)
+
+@lru_cache(maxsize=4096)
+def formatMinute(minute:int)-> str:
+    """
+    Returns the local date and time of `minute` (minutes since the epoch).
+    Files changed in the same minute share the formatted string.
+    """
+    return datetime.datetime.fromtimestamp(minute * 60).isoformat(sep=' ', timespec="minutes")
+
+class Entry:
+    """
+    One file of a listing: its name, path, whether it is a directory, and
+    its stat, taken at most once (`DirEntry.stat` caches it).
+    """
+    __slots__ = ("name", "path", "isDir", "stats")
+
+    def __init__(self, name:str, path:str, isDir:bool, stats:os.stat_result | None = None):
+        self.name:str = name
+        self.path:str = path
+        self.isDir:bool = isDir
+        self.stats:os.stat_result | None = stats
+
+def listEntries(path:str, showHidden:bool, needStats:bool)-> list[Entry]:
+    """
+    Returns the entries of directory `path`, sorted by name. Whether an entry
+    is a directory comes from the directory itself, so it is only stat'ed
+    (without following symbolic links) if `needStats`.
+    """
+    entries:list[Entry] = []
+
+    with os.scandir(path) as scan:
+        for entry in scan:
+            # If '-a' flag enabled, show hidden files
+            if entry.name.startswith(".") and not showHidden:
+                continue
+            try:
+                isDir:bool = entry.is_dir(follow_symlinks=False)
+                stats:os.stat_result | None = entry.stat(follow_symlinks=False) if needStats else None
+            # Removed since the directory was read
+            except(FileNotFoundError):
+                continue
+            entries.append(Entry(entry.name, entry.path, isDir, stats))
+
+    entries.sort(key=lambda entry: entry.name)
+    return entries
+
+def sortEntries(entries:list[Entry], flags:set[str])-> None:
+    """
+    Sorts `entries` largest first with -S, or newest first with -t.
+    The sorts are stable, so equal entries stay sorted by name.
+    """
+    if "-S" in flags:
+        entries.sort(key=lambda entry: entry.stats.st_size, reverse=True)
+    elif "-t" in flags:
+        entries.sort(key=lambda entry: entry.stats.st_mtime, reverse=True)
 
-    return total_blocks
+def colorName(entry:Entry, name:str)-> str:
+    """
+    Returns `name` colored by the type of `entry`: directories blue,
+    executable files red (when stat'ed), other files green.
+    """
+    if entry.isDir:
+        return BLUE + BOLD + name + RESET
+    elif entry.stats is not None and entry.stats.st_mode & stat.S_IXUSR:
+        return RED + name + RESET
+    return DARK_GREEN + name + RESET
+
+def longLines(entries:list[Entry], humanReadable:bool, color:bool)-> Iterator[str]:
+    """
+    Yields the long listing of `entries`, one line each, with its columns
+    aligned to the widest value of each.
+    """
+    rows:list[tuple[str, ...]] = []
+    for entry in entries:
+        entryStats:os.stat_result = entry.stats
+        size:str = format_bytes(entryStats.st_size) if humanReadable else str(entryStats.st_size)
+        rows.append((
+            stat.filemode(entryStats.st_mode),
+            str(entryStats.st_nlink),
+            userName(entryStats.st_uid),
+            groupName(entryStats.st_gid),
+            size,
+            formatMinute(int(entryStats.st_mtime // 60)),
+        ))
+
+    if not rows:
+        return
+
+    linkWidth:int = max(len(row[1]) for row in rows)
+    userWidth:int = max(len(row[2]) for row in rows)
+    groupWidth:int = max(len(row[3]) for row in rows)
+    sizeWidth:int = max(len(row[4]) for row in rows)
+
+    for entry, (mode, links, user, group, size, mtime) in zip(entries, rows):
+        name:str = entry.name
+        if stat.S_ISLNK(entry.stats.st_mode):
+            try:
+                name += " -> " + os.readlink(entry.path)
+            except(OSError):
+                pass
+
+        if color:
+            mode = (RED if entry.stats.st_mode & stat.S_IXUSR else DARK_GREEN) + mode + RESET
+            name = colorName(entry, name)
+
+        yield f"{mode} {links:>{linkWidth}} {user:<{userWidth}} {group:<{groupWidth}} {size:>{sizeWidth}} {mtime} {name}"
+
+def columnLines(entries:list[Entry], width:int, color:bool)-> Iterator[str]:
+    """
+    Yields the names of `entries` in as few rows as fit in `width` characters,
+    down each column then across, like `ls` on a terminal.
+    """
+    count:int = len(entries)
+    if not count:
+        return
+
+    lengths:list[int] = [len(entry.name) + COLUMN_GAP for entry in entries]
+    # No fewer rows than it takes to fit all the names one after another
+    numRows:int = max(1, -(-sum(lengths) // max(width, 1)))
+
+    while numRows < count:
+        numColumns:int = -(-count // numRows)
+        columnWidths:list[int] = [max(lengths[column * numRows:(column + 1) * numRows]) for column in range(numColumns)]
+        if sum(columnWidths) - COLUMN_GAP <= width:
+            break
+        numRows += 1
+    else:
+        numRows = count
+        columnWidths = [max(lengths)]
+
+    for row in range(numRows):
+        line:list[str] = []
+        for column, columnWidth in enumerate(columnWidths):
+            index:int = column * numRows + row
+            if index >= count:
+                break
+            entry:Entry = entries[index]
+            padding:str = " " * (columnWidth - lengths[index] + COLUMN_GAP)
+            line.append((colorName(entry, entry.name) if color else entry.name) + padding)
+        yield "".join(line).rstrip()
+
+def ls_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `ls`, yields its output one line at a time,
+    a directory at a time. Each entry is stat'ed at most once, and only when
+    -l, -S or -t need it.
+    """
+    params:list[str] = list(kwargs.get("params", []))
+    flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
+    stdout:bool = kwargs.get("stdout", True)
+
+    # Check if invalid flags are present
+    if not flags.issubset(ls_flags):
+        yield from textLines(invalidFlagsMsg(ls, ls_flags, flags))
+        return
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield from textLines(ls.__doc__)
+        return
+
+    # If no params, default to cwd
+    if not params:
+        params.append(os.getcwd())
+
+    showHidden:bool = "-a" in flags
+    longListing:bool = "-l" in flags
+    humanReadable:bool = "-h" in flags
+    recursive:bool = "-R" in flags
+    needStats:bool = longListing or "-S" in flags or "-t" in flags
+    width:int = shutil.get_terminal_size().columns
+
+    def listing(entries:list[Entry])-> Iterator[str]:
+        sortEntries(entries, flags)
+        # Colors and columns only when the output goes to the terminal
+        if longListing:
+            yield from longLines(entries, humanReadable, stdout)
+        elif stdout:
+            yield from columnLines(entries, width, stdout)
+        else:
+            for entry in entries:
+                yield entry.name
+
+    files:list[Entry] = []
+    directories:list[str] = []
+
+    for param in params:
+        # Replace tilde with user directory
+        if param.startswith("~"):
+            param = param.replace("~", os.path.expanduser("~"), 1)
+
+        try:
+            paramStats:os.stat_result = os.stat(param)
+        # Provide error message if invalid directory
+        except(OSError):
+            yield f"{ls.__name__}: cannot access '{param}': No such file or directory"
+            continue
+
+        if stat.S_ISDIR(paramStats.st_mode):
+            directories.append(param)
+        else:
+            files.append(Entry(param, param, False, paramStats if needStats else None))
+
+    # Files named as params are listed together, before any directory
+    yield from listing(files)
+    showNames:bool = len(params) > 1 or recursive
+    first:bool = not files
+
+    # Directories left to list, the next one last
+    pending:list[str] = list(reversed(directories))
+
+    while pending:
+        path:str = pending.pop()
+        try:
+            entries:list[Entry] = listEntries(path, showHidden, needStats)
+        except(OSError) as error:
+            yield f"{ls.__name__}: cannot open directory '{path}': {error.strerror}"
+            continue
+
+        # Show directory name if multiple parameters or -R
+        if showNames:
+            if not first:
+                yield ""
+            yield f"{path}:"
+        first = False
+
+        if longListing:
+            yield f"total {sum(entry.stats.st_blocks for entry in entries)}"
+
+        # Subdirectories are listed after this one, in name order
+        if recursive:
+            pending.extend(entry.path for entry in reversed(entries) if entry.isDir)
+
+        yield from listing(entries)
 
 def ls(**kwargs)-> str:
     """
     NAME
-        ls 
-        
+        ls
+
     DESCRIPTION
         ls          : lists the contents of a directory
             --help  : displays how to use the ls command
             -l      : lists the contents of a directory in long format
             -a      : lists the contents of a directory including hidden files
             -h      : lists the contents of a directory in human readable format
-    
+            -R      : lists the contents of every directory inside the directory too
+            -S      : sorts the contents by size, largest first
+            -t      : sorts the contents by modification time, newest first
+
     EXAMPLE
         `ls'        : lists the contents of a directory in shor format
         `ls -l'     : lists the contents of a directory in long format
         `ls -lah`   : lists the contents of a directory in long format including hidden files in human readable format
+        `ls -lSh`   : lists the contents of a directory in long format, largest first
     """
-    params:list[str] = kwargs.get("params", [])
-    flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
-    stdout:bool = kwargs.get("stdout", True)
-    result:str = ""
-
-    # If no params, default to cwd
-    if not params:
-        params.append(os.getcwd())
-
-
-    # Check if invalid flags are present
-    if not flags.issubset(ls_flags):
-        result = invalidFlagsMsg(ls, ls_flags, flags)
-    # Provide help info if --help flag present
-    elif "--help" in flags:
-        result = ls.__doc__
-    # If other valid flags or none
-    elif stdout:
-        showHidden:bool = "-a" in flags
-        longListing:bool = "-l" in flags
-        humanReadable:bool = "-h" in flags
-
-        contents:list[list[str]] = []
-
-        # Perform ls command for all params (directories)
-        for param in params:
-            
-            line:list[str] = []
-
-            # Replace tilde with user directory
-            if param.startswith("~"):
-                param = param.replace("~", os.path.expanduser("~"), 1)
-
-            # Provide error message if invalid directory
-            if not os.path.exists(param):
-                contents.append(f"{ls.__name__}: cannot access '{param}': No such file or directory")
-            else:
-                # Show directory name if multiple parameters
-                if not len(params) == 1:
-                    contents.append(f"{param}:")
-
-                if longListing:
-                    contents.append(f"total {calculate_total(param)}")
-
-                for entry in os.scandir(param):
-                    RED_MODE = False
-                    # If '-a' flag enabled, show hidden files
-                    if not entry.name.startswith(".") or showHidden:
-
-                        # if '-l' flag enabled, show long listing
-                        if longListing:
-                            entryStats = os.stat(f"{param}/{entry.name}")
-                            mode:str = stat.filemode(entryStats.st_mode)
-                            
-                            
-                            if entryStats.st_mode & stat.S_IXUSR:
-                                line.append(RED + mode + RESET)
-                                RED_MODE = True
-                            else:
-                                line.append(DARK_GREEN + mode + RESET)
-
-                            # permissions
-                            # line.append(mode)
-                            line.append("\t")
-                            
-                            # hard links
-                            line.append(str(entryStats.st_nlink))
-                            line.append('\t')
-
-                            # owner and group id
-                            uid:int = entryStats.st_uid
-                            gid:int = entryStats.st_gid
-                            u_name:str = pwd.getpwuid(uid).pw_name
-                            g_name:str = grp.getgrgid(gid).gr_name
-
-                            line.append(u_name)
-                            line.append('\t')
-                            line.append(g_name)
-                            line.append('\t')
-
-                            # if '-h' flag enabled, show human readable sizes
-                            if humanReadable:
-                                line.append(str(format_bytes(entryStats.st_size)))
-                                line.append('\t')
-                            else:
-                                line.append(str(entryStats.st_size))
-                                line.append('\t')
-
-                            # time of last modification
-                            mtime:str = datetime.datetime.fromtimestamp(entryStats.st_mtime).isoformat(sep='\t', timespec="minutes")
-                            line.append(mtime)
-                            line.append('\t')
-                            # if ls flags are subset of flags print in contents in colors
-                            if RED_MODE and not os.path.isdir(f"{param}/{entry.name}"):
-                                entryStats = os.stat(f"{param}/{entry.name}")
-                                entryStats.st_mode & stat.S_IXUSR
-                                line.append(RED +  entry.name + RESET)
-                            elif os.path.isdir(f"{param}/{entry.name}"):
-                                line.append(BLUE + BOLD + entry.name + RESET)
-                            else:
-                                line.append(DARK_GREEN +  entry.name + RESET)
-
-                            line.append('\n')
-                        # else show short listing
-                        else:
-                            # Name
-                            entryStats = os.stat(f"{param}/{entry.name}")
-                            if os.path.isdir(f"{param}/{entry.name}"):
-                                line.append(BLUE + BOLD + entry.name + RESET)
-                            else:
-                                line.append(DARK_GREEN +  entry.name + RESET)
-
-                            line.append('\t')
-                        
-                      
-                            
-                contents.append(''.join(line))
-            
-            result = "\n".join(contents)
-    else:
-        showHidden:bool = "-a" in flags
-        longListing:bool = "-l" in flags
-        humanReadable:bool = "-h" in flags
-
-        contents:list[list[str]] = []
-
-        # Perform ls command for all params (directories)
-        for param in params:
-            
-            line:list[str] = []
-
-            # Replace tilde with user directory
-            if param.startswith("~"):
-                param = param.replace("~", os.path.expanduser("~"), 1)
-
-            # Provide error message if invalid directory
-            if not os.path.exists(param):
-                contents.append(f"{ls.__name__}: cannot access '{param}': No such file or directory")
-            else:
-                # Show directory name if multiple parameters
-                if not len(params) == 1:
-                    contents.append(f"{param}:")
-
-                if longListing:
-                    contents.append(f"total {calculate_total(param)}")
-
-                for entry in os.scandir(param):
-                    # If '-a' flag enabled, show hidden files
-                    if not entry.name.startswith(".") or showHidden:
-
-                        # if '-l' flag enabled, show long listing
-                        if longListing:
-                            entryStats = os.stat(f"{param}/{entry.name}")
-                            mode:str = stat.filemode(entryStats.st_mode)
-
-                            # permissions
-                            line.append(mode)
-                            line.append("\t")
-                            
-                            # hard links
-                            line.append(str(entryStats.st_nlink))
-                            line.append('\t')
-
-                            # owner and group id
-                            uid:int = entryStats.st_uid
-                            gid:int = entryStats.st_gid
-                            u_name:str = pwd.getpwuid(uid).pw_name
-                            g_name:str = grp.getgrgid(gid).gr_name
-
-                            line.append(u_name)
-                            line.append('\t')
-                            line.append(g_name)
-                            line.append('\t')
-
-                            # if '-h' flag enabled, show human readable sizes
-                            if humanReadable:
-                                line.append(str(format_bytes(entryStats.st_size)))
-                                line.append('\t')
-                            else:
-                                line.append(str(entryStats.st_size))
-                                line.append('\t')
-
-                            # time of last modification
-                            mtime:str = datetime.datetime.fromtimestamp(entryStats.st_mtime).isoformat(sep='\t', timespec="minutes")
-                            line.append(mtime)
-                            line.append('\t')
-                            
-                            line.append(entry.name)
-                            line.append('\n')
-                        # else show short listing
-                        else:
-                            line.append(entry.name)
-                            line.append('\n')
-                        
-                      
-                            
-                contents.append(''.join(line))
-            
-            result = "\n".join(contents)
-    return result
+    return '\n'.join(ls_lines(**kwargs))
 
 if __name__ == "__main__":
-    print(ls(flags=["-lah"], params=["~/"]))
\ No newline at end of file
+    print(ls(flags=["-lah"], params=["~/"]))
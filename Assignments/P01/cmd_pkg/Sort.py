@@ -1,72 +1,281 @@
 #!/usr/bin/env python3
 import os
+import re
+import heapq
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import Callable, Iterable, Iterator
+from .StreamLines import textLines, fileLines, inputLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
+from .FlagValues import flagValues
 
 sort_flags:set[str] = {
-    "--help"
+    "--help", "-n", "-r", "-u", "-k", "-t", "-j", "-S"
 }
 
-def sort(**kwargs)-> str:
+# Default number of characters sorted in memory at a time, see -S
+CHUNK_SIZE:int = 64 << 20
+# Most sorted runs merged at once, more are merged in passes
+MERGE_WIDTH:int = 64
+
+# Leading number of a key, for -n
+numberPattern:re.Pattern = re.compile(r"\s*([-+]?(?:\d+(?:\.\d*)?|\.\d+))")
+
+def sortKey(line:str, numeric:bool = False, field:tuple[int, int | None] | None = None, separator:str | None = None)-> str | float:
     """
-    NAME
-        sort
-        
-    DESCRIPTION
-        sort             : used to sort a file, arranging the records in a particular order
-            --help       : displays how to use the sort command
-        
-    EXAMPLE 
-        `sort <file>'   : sorts the specified file
-        `sort  --help`  : displays how to use the sort command
+    Returns the key `line` is sorted by: the fields of -k (1-based, the
+    last one included), as a number with -n (0 if there is none).
+    """
+    key:str = line
+
+    if field is not None:
+        fields:list[str] = line.split(separator)
+        first, last = field
+        key = (separator if separator is not None else " ").join(fields[first-1:last])
+
+    if numeric:
+        match = numberPattern.match(key)
+        return float(match.group(1)) if match else 0.0
+    return key
+
+def lineKey(key:Callable, line:str)-> tuple:
+    """
+    Returns the full sort key of `line`: its key, then the whole line
+    to order lines with equal keys.
+    """
+    return (key(line), line)
+
+def writeRun(lines:Iterable[str], path:str)-> str:
+    """
+    Writes sorted lines to the run file `path`, one per line, and returns `path`.
+    """
+    with open(path, mode="w", newline="\n", errors="surrogateescape") as run:
+        for line in lines:
+            run.write(line)
+            run.write("\n")
+    return path
+
+def readRun(path:str)-> Iterator[str]:
+    """
+    Yields the lines of the run file `path`.
+    """
+    with open(path, mode="r", newline="\n", errors="surrogateescape") as run:
+        for line in run:
+            yield line.removesuffix("\n")
+
+def sortRun(lines:list[str], key:Callable, reverse:bool, path:str)-> str:
+    """
+    Sorts one chunk of lines and writes it to the run file `path`.
+    Runs in the process pool of `externalSort` when chunks are sorted in parallel.
+    """
+    lines.sort(key=partial(lineKey, key), reverse=reverse)
+    return writeRun(lines, path)
+
+def chunks(lines:Iterable[str], chunkSize:int)-> Iterator[list[str]]:
+    """
+    Yields lists of lines of about `chunkSize` characters in total.
+    """
+    chunk:list[str] = []
+    size:int = 0
+
+    for line in lines:
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= chunkSize:
+            yield chunk
+            chunk = []
+            size = 0
+
+    if chunk:
+        yield chunk
+
+def mergeRuns(paths:list[str], key:Callable, reverse:bool, tempDir:str)-> Iterator[str]:
+    """
+    Merges the sorted run files `paths` with `heapq.merge`. If there are more
+    than MERGE_WIDTH runs, groups of them are first merged into longer runs,
+    so only MERGE_WIDTH files are open at a time.
+    """
+    fullKey:Callable = partial(lineKey, key)
+    mergePass:int = 0
+
+    while len(paths) > MERGE_WIDTH:
+        merged:list[str] = []
+        for index in range(0, len(paths), MERGE_WIDTH):
+            group:list[str] = paths[index:index + MERGE_WIDTH]
+            path:str = os.path.join(tempDir, f"merge{mergePass}_{index}")
+            writeRun(heapq.merge(*map(readRun, group), key=fullKey, reverse=reverse), path)
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        paths = merged
+        mergePass += 1
+
+    yield from heapq.merge(*map(readRun, paths), key=fullKey, reverse=reverse)
+
+def externalSort(lines:Iterable[str], key:Callable, reverse:bool = False, chunkSize:int = CHUNK_SIZE, jobs:int = 1)-> Iterator[str]:
+    """
+    Yields `lines` sorted by `key`, holding only about `chunkSize` characters
+    of them in memory (per process).
+
+    Input that fits in one chunk is sorted in memory. Otherwise each chunk is
+    sorted and written to a temporary run file, by up to `jobs` processes at a
+    time, and the runs are merged. The run files are removed once the output
+    is exhausted or closed.
+    """
+    chunkList:Iterator[list[str]] = chunks(lines, chunkSize)
+    first:list[str] = next(chunkList, [])
+    second:list[str] | None = next(chunkList, None)
+
+    if second is None:
+        first.sort(key=partial(lineKey, key), reverse=reverse)
+        yield from first
+        return
+
+    with tempfile.TemporaryDirectory(prefix="sort_") as tempDir:
+        paths:list[str] = []
+        allChunks:Iterator[list[str]] = chain([first, second], chunkList)
+        del first, second
+
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                pending:list = []
+                for index, chunk in enumerate(allChunks):
+                    pending.append(executor.submit(sortRun, chunk, key, reverse, os.path.join(tempDir, f"run{index}")))
+                    del chunk
+                    # Only `jobs` chunks wait in memory to be sorted
+                    if len(pending) >= jobs:
+                        paths.append(pending.pop(0).result())
+                paths.extend(future.result() for future in pending)
+        else:
+            for index, chunk in enumerate(allChunks):
+                paths.append(sortRun(chunk, key, reverse, os.path.join(tempDir, f"run{index}")))
+                del chunk
+
+        yield from mergeRuns(paths, key, reverse, tempDir)
+
+def uniqueLines(lines:Iterable[str], key:Callable)-> Iterator[str]:
+    """
+    Yields the first of each group of sorted lines with equal keys.
+    """
+    last:object = object()
+
+    for line in lines:
+        currentKey = key(line)
+        if currentKey != last:
+            yield line
+            last = currentKey
+
+def parseField(value:str)-> tuple[int, int | None]:
+    """
+    Parses the value of -k, "<first>" or "<first>,<last>", fields counted from 1.
+    """
+    first, _, last = value.partition(",")
+    field:tuple[int, int | None] = (int(first), int(last) if last else None)
+    if field[0] < 1 or (field[1] is not None and field[1] < field[0]):
+        raise ValueError(value)
+    return field
+
+def sort_lines(**kwargs)-> Iterator[str]:
     """
-    params:list[str] = kwargs.get("params", [])
-    flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
+    Streaming version of `sort`, yields its output one line at a time.
+    Sorting needs all of its input, so it is read before the first line
+    is yielded, but only a chunk of it is held in memory, see `externalSort`.
+    """
+    params:list[str] = list(kwargs.get("params", []))
+    flagList:list[str] = kwargs.get("flags", [])
+    flags:set[str] = tockenizeFlags(flagList)
     stdin:bool = kwargs.get("stdin", True)
-    result:str = ""
 
     # Check if invalid flags are present
     if not flags.issubset(sort_flags):
-        result = invalidFlagsMsg(sort, sort_flags, flags)
+        yield from textLines(invalidFlagsMsg(sort, sort_flags, flags))
+        return
     # Provide help info if --help flag present
     elif "--help" in flags:
-        result = sort.__doc__
-    # If valid flags, and expect data from stdin
-    elif stdin:
-        contents:list[str] = []
+        yield from textLines(sort.__doc__)
+        return
+
+    # Flags with a value take the first params, in the order of the flags
+    try:
+        values:dict[str, str] = flagValues(flagList, params, {"-k", "-t", "-j", "-S"})
+        field:tuple[int, int | None] | None = parseField(values["-k"]) if "-k" in values else None
+        jobs:int = max(int(values.get("-j", 1)), 1)
+        chunkSize:int = int(values["-S"]) << 20 if "-S" in values else CHUNK_SIZE
+        if chunkSize < 1:
+            raise ValueError(values["-S"])
+    except(ValueError) as e:
+        yield f"{sort.__name__}: invalid option value -- {e}"
+        yield f"Try '{sort.__name__} --help for more information."
+        return
+
+    separator:str | None = values.get("-t")
+    if separator is not None and len(separator) != 1:
+        yield f"{sort.__name__}: the separator must be one character: '{separator}'"
+        return
 
+    # Daemon processes, like the stages of a concurrent pipeline, can not start a pool
+    if multiprocessing.current_process().daemon:
+        jobs = 1
+
+    key:Callable = partial(sortKey, numeric="-n" in flags, field=field, separator=separator)
+
+    # If valid flags, and expect data from stdin
+    if stdin:
+        paths:list[str] = []
         for param in params:
             if param.startswith("~"):
                 param = param.replace("~", os.path.expanduser("~"), 1)
-            
-            text:list[str] = []
-            data:str = ""
-            
-            try:
-                with open(param, "r") as infile:
-                    data = infile.read()
-            except(FileNotFoundError) as e:
-                return f"{sort.__name__}: cannot access '{param}': No such file or directory"
-
-            text = data.splitlines()
-            text.sort()
-
-            contents.append('\n'.join(text))
-
-        result = '\n'.join(contents)
+
+            if os.path.isfile(param):
+                paths.append(param)
+            else:
+                yield f"{sort.__name__}: cannot access '{param}': No such file or directory"
+
+        lines:Iterable[str] = chain.from_iterable(map(fileLines, paths))
     # If expect data from file or pipe
     else:
-        contents:list[str] = []
+        lines = inputLines(kwargs)
 
-        for param in params:
-            text:list[str] = param.splitlines()
-            text.sort()
+    output:Iterator[str] = externalSort(lines, key, "-r" in flags, chunkSize, jobs)
+    if "-u" in flags:
+        output = uniqueLines(output, key)
 
-            contents.append('\n'.join(text))
+    try:
+        yield from output
+    finally:
+        # Removes the temporary runs, even if the output is not read to the end
+        output.close()
 
-        result = '\n'.join(contents)
-        
-    return result
+def sort(**kwargs)-> str:
+    """
+    NAME
+        sort
+
+    DESCRIPTION
+        sort             : used to sort a file, arranging the records in a particular order
+            --help       : displays how to use the sort command
+            -n           : sorts by the number at the start of each line (or key)
+            -r           : sorts in reverse order
+            -u           : prints only the first of lines with equal keys
+            -k <f>[,<l>] : sorts by fields f to l (or to the end of the line), counted from 1
+            -t <char>    : fields are separated by <char> instead of blanks
+            -j <num>     : sorts <num> chunks at a time, in separate processes
+            -S <MiB>     : sorts about <MiB> million characters in memory at a time,
+                           larger inputs are sorted in chunks and merged (default 64)
+
+        Files are sorted together. Input larger than memory is sorted in chunks,
+        written to temporary files, and merged.
+
+    EXAMPLE
+        `sort <file>'              : sorts the specified file
+        `sort -t , -k 2 -n <file>' : sorts the lines of a CSV file by the number in their second column
+        `sort  --help`             : displays how to use the sort command
+    """
+    return '\n'.join(sort_lines(**kwargs))
 
 if __name__ == "__main__":
-    print(sort(params=["README.md"], flags=[], stdin=True))
\ No newline at end of file
+    print(sort(params=["README.md"], flags=[], stdin=True))
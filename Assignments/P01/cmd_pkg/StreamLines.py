@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import os
+from typing import Iterable, Iterator
+
+def textLines(text:str)-> Iterator[str]:
+    """
+    Yields the lines of `text`, without their newlines.
+    """
+    start:int = 0
+
+    while start < len(text):
+        end:int = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+        start = end + 1
+
+def fileLines(path:str)-> Iterator[str]:
+    """
+    Yields the lines of the file at `path`, without their newlines.
+    The file is read as the lines are pulled, and closed when the
+    generator is exhausted or closed.
+    """
+    # Replace tilde with user directory
+    if path.startswith("~"):
+        path = path.replace("~", os.path.expanduser("~"), 1)
+
+    with open(path, mode="r") as file:
+        for line in file:
+            yield line.removesuffix("\n")
+
+def inputLines(kwargs:dict)-> Iterator[str]:
+    """
+    Returns the lines piped or redirected into a command.
+
+    Streaming commands get them from the `input` kwarg. When a command
+    is called the old way, without `input`, the text of each param
+    is the input instead.
+    """
+    lines:Iterable[str] | None = kwargs.get("input")
+
+    if lines is None:
+        return (line for param in kwargs.get("params", []) for line in textLines(param))
+    return iter(lines)
+
+if __name__ == "__main__":
+    print(list(textLines("one\ntwo\n\nthree\n")))
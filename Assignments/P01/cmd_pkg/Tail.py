@@ -1,89 +1,167 @@
 #!/usr/bin/env python3
 import os
+from collections import deque
+from time import sleep
+from typing import Iterator
+from .StreamLines import textLines, inputLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
 tail_flags:set[str] = {
-    "--help"
+    "--help",
+    "-f"
 }
 
-def tail(**kwargs):
-    """   
-    NAME
-        tail 
+# Number of bytes read at a time, backwards from the end of a file or appended to it
+BLOCK_SIZE:int = 1 << 16
+# Seconds between checks for lines appended to followed files
+FOLLOW_INTERVAL:float = 0.05
 
-    DESCRIPTION
-        tail                : display the last 10 lines of a file
-            --help          : displays how to use the tail command
-            -<n>            : displays the last n lines of a file
-            
-    EXAMPLES
-        `tail <file name>`   : copy the last 10 lines of the file contents to standard output
+def lastLines(path:str, numLines:int)-> tuple[list[str], int]:
+    """
+    Returns the last `numLines` lines of the file at `path`, and the size
+    of the file when they were read.
+
+    The file is read backwards from its end, a block at a time, until it
+    has enough lines, so the time taken does not depend on its size.
+    """
+    with open(path, mode="rb") as file:
+        end:int = file.seek(0, os.SEEK_END)
+        if numLines <= 0:
+            return [], end
+
+        blocks:deque[bytes] = deque()
+        pos:int = end
+        newlines:int = 0
+
+        # A newline at the very end does not start another line
+        while pos > 0 and newlines <= numLines:
+            size:int = min(BLOCK_SIZE, pos)
+            pos -= size
+            file.seek(pos)
+            block:bytes = file.read(size)
+            blocks.appendleft(block)
+            newlines += block.count(b"\n")
+            if pos + size == end and block.endswith(b"\n"):
+                newlines -= 1
+
+    lines:list[bytes] = b"".join(blocks).split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+
+    return [line.decode("utf-8", errors="replace") for line in lines[-numLines:]], end
+
+def followFiles(offsets:dict[str, int])-> Iterator[str]:
+    """
+    Yields the lines appended to each file of `offsets` after its offset,
+    as they are written, until the generator is closed. Files are checked
+    every FOLLOW_INTERVAL seconds; a file that gets shorter (e.g. a
+    truncated log) is followed again from its start.
+    """
+    files:dict = {}
+    partial:dict[str, bytes] = {}
+
+    try:
+        for path, offset in offsets.items():
+            files[path] = open(path, mode="rb")
+            files[path].seek(offset)
+            partial[path] = b""
+
+        while True:
+            appended:bool = False
+
+            for path, file in files.items():
+                data:bytes = file.read(BLOCK_SIZE)
+
+                if not data:
+                    if os.fstat(file.fileno()).st_size < file.tell():
+                        file.seek(0)
+                        partial[path] = b""
+                    continue
+
+                appended = True
+                *lines, partial[path] = (partial[path] + data).split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8", errors="replace").strip()
+
+            # Read on without waiting while lines keep coming
+            if not appended:
+                sleep(FOLLOW_INTERVAL)
+    finally:
+        for file in files.values():
+            file.close()
+
+def tail_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `tail`, yields its output one line at a time.
+    Files are read backwards from their end, see `lastLines`, and only the
+    last n lines of piped input are kept in memory. With -f the output
+    does not end, see `followFiles`.
     """
     params:list[str] = kwargs.get("params", [])
-    flags:set[str] = set(kwargs.get("flags", []))
+    flags:set[str] = set()
     stdin:bool = kwargs.get("stdin", True)
-    result:str = ""
     numDisplayLines:int = 10
-    
+
     # Check for -n flag
-    if len(flags) == 1 and not "--help" in flags:
-        numFlag = flags.pop()
-        try:
-            numDisplayLines = int(numFlag.removeprefix("-"))
-        except(ValueError) as e:
-            return f"{tail.__name__}: invalid option -- {numFlag}\nTry '{tail.__name__} --help for more information."
-    # When n flag not present
-    else:
-        flags = tockenizeFlags(flags)
-    
+    for flag in kwargs.get("flags", []):
+        if flag.removeprefix("-").isdigit():
+            numDisplayLines = int(flag.removeprefix("-"))
+        else:
+            flags.update(tockenizeFlags([flag]))
+
     # Check if invalid flags are present
     if not flags.issubset(tail_flags):
-        result = invalidFlagsMsg(tail, tail_flags, flags)
+        yield from textLines(invalidFlagsMsg(tail, tail_flags, flags))
     # Provide help info if --help flag present
     elif "--help" in flags:
-        result = tail.__doc__
+        yield from textLines(tail.__doc__)
     # If other valid flags and expect data from stdin
     elif stdin:
-        contents:list[str] = []
+        offsets:dict[str, int] = {}
+
         for param in params:
-            
+
             # Replace tilde with user directory
             if param.startswith("~"):
                 param = param.replace("~", os.path.expanduser("~"), 1)
 
             if os.path.isfile(param):
-                with open(param, mode="r") as file:
-                    lines = file.readlines()  # Read all lines into a list
-                    last_n_lines = lines[-numDisplayLines:]  # Get the last n lines or fewer
-
-                    for line in last_n_lines:
-                        line = line.strip()
-                        contents.append(line)
-                    else:
-                        break  
-                           
+                # Get the last n lines or fewer
+                lines, offsets[param] = lastLines(param, numDisplayLines)
+                for line in lines:
+                    yield line.strip()
             elif os.path.isdir(param):
-                contents.append(f"{tail.__name__}: '{param}': Is a directory")
+                yield f"{tail.__name__}: '{param}': Is a directory"
             else:
-                contents.append(f"{tail.__name__}: cannot access '{param}': No such file or directory")
-                
-        result = '\n'.join(contents)
+                yield f"{tail.__name__}: cannot access '{param}': No such file or directory"
+
+        if "-f" in flags and offsets:
+            yield from followFiles(offsets)
     # If other valid flags and expect data from pipe or file redirect
     else:
-        contents:list[str] = []
+        # Get the last n lines or fewer
+        for line in deque(inputLines(kwargs), maxlen=max(numDisplayLines, 0)):
+            yield line.strip()
 
-        for param in params:
-            text:list[str] = param.splitlines()
-            last_n_lines = text[-numDisplayLines:] # Get the last n lines or fewer
+def tail(**kwargs)-> str:
+    """
+    NAME
+        tail
 
-            for line in last_n_lines:
-                line = line.strip()
-                contents.append(line)
-        result = '\n'.join(contents)
+    DESCRIPTION
+        tail                : display the last 10 lines of a file
+            --help          : displays how to use the tail command
+            -<n>            : displays the last n lines of a file
+            -f              : keeps displaying lines as they are added to the file, until ctrl-c
 
-    return result    
+    EXAMPLES
+        `tail <file name>`      : copy the last 10 lines of the file contents to standard output
+        `tail -f <log file>`    : copy the last 10 lines of the log, then every line added to it
+        `tail -f <log> | grep x`: copy the lines added to the log that contain x
+    """
+    return '\n'.join(tail_lines(**kwargs))
 
 if __name__ == "__main__":
     s = tail(params=["facts.txt"])
-    print(s)
\ No newline at end of file
+    print(s)
@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
 import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import chain
+from typing import Iterator
+from .StreamLines import textLines, inputLines
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
@@ -10,104 +17,210 @@ wc_flags:set[str] = {
     "-w"
 }
 
-def wc(**kwargs)-> str:
+# Number of bytes counted at a time
+BUFFER_SIZE:int = 1 << 20
+# Files of this many bytes or more are counted in parallel, in chunks
+PARALLEL_SIZE:int = 64 << 20
+
+def wcCounts(lineCount:int, wordCount:int, byteCount:int, flags:set[str])-> list[str]:
     """
-    NAME
-        wc 
-        
-    DESCRIPTION
-        wc                  : prints out the number of lines, words, and bytes in a file
-            -l              : prints the number of lines in a file
-            -m              : prints the number of bytes in a file
-            -w              : prints the number of words in a file
-            --help          : displays how to use the wc command
-        
-    EXAMPLE
-        `wc README.md'      : prints out the number of lines, words, and bytes in README.md
-        `wc -l README.md'   : prints out the number of lines in README.md
+    Returns the counts selected by the flags of `wc`, in the order
+    lines, words, bytes.
+    """
+    counts:list[str] = []
+
+    if "-l" in flags:
+        counts.append(str(lineCount))
+    if "-w" in flags:
+        counts.append(str(wordCount))
+    if "-m" in flags:
+        counts.append(str(byteCount))
+    return counts
+
+def countBuffer(data:bytes)-> tuple[int, int, int, bool, bool]:
+    """
+    Counts one buffer of bytes. Returns its newlines, words and bytes, and
+    whether it starts and ends inside a word, so the counts of buffers
+    next to each other can be joined with `joinCounts`.
+    """
+    return (
+        data.count(b"\n"),
+        len(data.split()),
+        len(data),
+        data[:1] != b"" and not data[:1].isspace(),
+        data[-1:] != b"" and not data[-1:].isspace(),
+    )
+
+def joinCounts(first:tuple[int, int, int, bool, bool], second:tuple[int, int, int, bool, bool])-> tuple[int, int, int, bool, bool]:
+    """
+    Returns the counts of two buffers one after the other. A word cut
+    between the two is counted in both, so it is counted once less.
+    """
+    if not first[2]:
+        return second
+    if not second[2]:
+        return first
+
+    return (
+        first[0] + second[0],
+        first[1] + second[1] - (first[4] and second[3]),
+        first[2] + second[2],
+        first[3],
+        second[4],
+    )
+
+def countRange(path:str, start:int, end:int)-> tuple[int, int, int, bool, bool]:
+    """
+    Counts bytes `start` to `end` of the file at `path`, BUFFER_SIZE bytes
+    at a time. Runs in the process pool of `countFile` for large files.
+    """
+    counts:tuple[int, int, int, bool, bool] = (0, 0, 0, False, False)
+
+    with open(path, mode="rb") as file:
+        file.seek(start)
+        pos:int = start
+        while pos < end:
+            data:bytes = file.read(min(BUFFER_SIZE, end - pos))
+            if not data:
+                break
+            counts = joinCounts(counts, countBuffer(data))
+            pos += len(data)
+
+    return counts
+
+def countFile(path:str, jobs:int = 1)-> tuple[int, int, int]:
+    """
+    Returns the lines, words and bytes of the file at `path`, in one pass
+    over its bytes. Files of PARALLEL_SIZE bytes or more are cut into
+    chunks counted by up to `jobs` processes.
+
+    A last line without a newline is counted as a line.
+    """
+    size:int = os.path.getsize(path)
+
+    if jobs > 1 and size >= PARALLEL_SIZE:
+        numChunks:int = min(jobs, size // (PARALLEL_SIZE // 4))
+        bounds:list[int] = [size * index // numChunks for index in range(numChunks + 1)]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunkCounts = list(executor.map(countRange, [path] * numChunks, bounds[:-1], bounds[1:]))
+        counts:tuple[int, int, int, bool, bool] = reduce(joinCounts, chunkCounts)
+    else:
+        counts = countRange(path, 0, size)
+
+    lineCount:int = counts[0]
+    if size:
+        with open(path, mode="rb") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                lineCount += 1
+
+    return lineCount, counts[1], counts[2]
+
+def countLines(lines:Iterator[str])-> tuple[int, int, int]:
+    """
+    Returns the lines, words and bytes of piped lines, as if they were
+    joined by newlines. Lines are counted in batches of about BUFFER_SIZE
+    characters, not one at a time.
+    """
+    lineCount:int = 0
+    wordCount:int = 0
+    byteCount:int = 0
+    batch:list[str] = []
+    batchSize:int = 0
+
+    for line in chain(lines, [None]):
+        if line is not None:
+            batch.append(line)
+            batchSize += len(line) + 1
+            if batchSize < BUFFER_SIZE:
+                continue
+        if not batch:
+            continue
+
+        data:bytes = "\n".join(batch).encode("utf-8", errors="surrogateescape")
+        # Newline between this batch and the one before
+        byteCount += len(data) + (1 if lineCount else 0)
+        wordCount += len(data.split())
+        lineCount += len(batch)
+        batch = []
+        batchSize = 0
+
+    return lineCount, wordCount, byteCount
+
+def wc_lines(**kwargs)-> Iterator[str]:
+    """
+    Streaming version of `wc`, yields one line of counts per file.
+    Files are counted in one pass over their bytes, see `countFile`, and
+    piped input in batches of lines, see `countLines`. With no file and
+    no pipe, standard input is counted if it is not a terminal.
     """
     params:list[str] = kwargs.get("params", [])
     flags:set[str] = tockenizeFlags(kwargs.get("flags", []))
     stdin:bool = kwargs.get("stdin", True)
-    result:str = ""
-    
+
     # Set all flags to true
     if not flags:
         flags = wc_flags.difference({"--help"})
 
     # Check if invalid flags are present
     if not flags.issubset(wc_flags):
-        result = invalidFlagsMsg(wc, wc_flags, flags)
+        yield from textLines(invalidFlagsMsg(wc, wc_flags, flags))
     # Provide help info if --help flag present
     elif "--help" in flags:
-        result = wc.__doc__
+        yield from textLines(wc.__doc__)
+    # If input is piped into the shell itself
+    elif stdin and not params and not sys.stdin.isatty():
+        counts:tuple[int, int, int, bool, bool] = (0, 0, 0, False, False)
+        lastByte:bytes = b""
+        while data := sys.stdin.buffer.read(BUFFER_SIZE):
+            counts = joinCounts(counts, countBuffer(data))
+            lastByte = data[-1:]
+
+        lineCount:int = counts[0] + (1 if lastByte not in (b"", b"\n") else 0)
+        yield '\t'.join(wcCounts(lineCount, counts[1], counts[2], flags))
     # If valid flags and expect data from stdin
     elif stdin:
-        showLines:bool = "-l" in flags
-        showChars:bool = "-m" in flags
-        showWords:bool = "-w" in flags
-
-        contents:list[str] = []
+        # Daemon processes, like the stages of a concurrent pipeline, can not start a pool
+        jobs:int = 1 if multiprocessing.current_process().daemon else (os.cpu_count() or 1)
 
         for param in params:
-            
+
             # Replace tilde with user directory
             if param.startswith("~"):
                 param = param.replace("~", os.path.expanduser("~"), 1)
 
             if os.path.isfile(param):
-                with open(param, mode="r") as file:
-                    wcCounts:list[str] = []
-
-                    fileData:str = file.read()
-                    byteCount:int = len(fileData.encode('utf-8'))
-                    lines:list[str] = fileData.splitlines(True)
-                    lineCount:int = len(lines)
-                    wordCount:int = 0
-                    for line in lines:
-                        wordCount += len(line.split())
-
-                    if showLines:
-                        wcCounts.append(str(lineCount))
-                    if showWords:
-                        wcCounts.append(str(wordCount))
-                    if showChars:
-                        wcCounts.append(str(byteCount))
-                    wcCounts.append(param)
-                    contents.append('\t'.join(wcCounts))
-                    
+                lineCount, wordCount, byteCount = countFile(param, jobs)
+                yield '\t'.join(wcCounts(lineCount, wordCount, byteCount, flags) + [param])
             elif os.path.isdir(param):
-                contents.append(f"{wc.__name__}: '{param}': Is a directory")
+                yield f"{wc.__name__}: '{param}': Is a directory"
             else:
-                contents.append(f"{wc.__name__}: cannot access '{param}': No such file or directory")
-        result = '\n'.join(contents)
+                yield f"{wc.__name__}: cannot access '{param}': No such file or directory"
     # If expect data from input file redirect or pipe
     else:
-        showLines:bool = "-l" in flags
-        showChars:bool = "-m" in flags
-        showWords:bool = "-w" in flags
+        lineCount, wordCount, byteCount = countLines(inputLines(kwargs))
+        yield '\t'.join(wcCounts(lineCount, wordCount, byteCount, flags))
 
-        contents:list[str] = []
+def wc(**kwargs)-> str:
+    """
+    NAME
+        wc 
+        
+    DESCRIPTION
+        wc                  : prints out the number of lines, words, and bytes in a file
+            -l              : prints the number of lines in a file
+            -m              : prints the number of bytes in a file
+            -w              : prints the number of words in a file
+            --help          : displays how to use the wc command
+        
+        Large files are counted in chunks by several processes at a time.
 
-        for param in params:
-            wcCounts:list[str] = []
-
-            byteCount:int = len(param.encode('utf-8'))
-            lines:list[str] = param.splitlines(True)
-            lineCount:int = len(lines)
-            wordCount:int = 0
-            for line in lines:
-                wordCount += len(line.split())
-
-            if showLines:
-                wcCounts.append(str(lineCount))
-            if showWords:
-                wcCounts.append(str(wordCount))
-            if showChars:
-                wcCounts.append(str(byteCount))
-        contents.append('\t'.join(wcCounts))
-        result = '\n'.join(contents)
-    return result
+    EXAMPLE
+        `wc README.md'      : prints out the number of lines, words, and bytes in README.md
+        `wc -l README.md'   : prints out the number of lines in README.md
+        `ls | wc -l'        : prints out the number of lines piped into it
+    """
+    return '\n'.join(wc_lines(**kwargs))
 
 if __name__ == "__main__":
     print(wc(params=["README.md"], flags=["-m"]))
\ No newline at end of file
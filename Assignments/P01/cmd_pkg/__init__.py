@@ -17,4 +17,12 @@ from .Chmod import chmod
 from .Grep import grep
 from .Head import head
 from .Tail import tail
-from .Less import less
\ No newline at end of file
+from .Less import less
+from .Cat import cat_lines
+from .Sort import sort_lines
+from .Wc import wc_lines
+from .Grep import grep_lines
+from .Head import head_lines
+from .Tail import tail_lines
+from .Less import less_lines
+from .Ls import ls_lines
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 import os,sys, socket, getpass, shutil
+from functools import partial
 from time import sleep
+from typing import Callable, Iterator
 import cmd_pkg
 from getch import Getch
 from ParseCommand import parseCommand
 from ParseCommand import ShellCommand
+from Pipeline import findCommand, runPipeline, runPipelineConcurrent, writeLines
 from cmd_pkg.TockenizeFlags import tockenizeFlags
 from cmd_pkg.InvalidFlagsMsg import invalidFlagsMsg
 
@@ -95,6 +98,11 @@ def print_cmd(commandStr:str)->str:
 
 historyFileName:str = ".myHistory"
 
+# How the stages of a pipeline run: "lazy" (one after another, a line at a time),
+# "threads" or "processes" (all at the same time). Set with `--pipeline=<mode>`.
+pipelineModes:set[str] = {"lazy", "threads", "processes"}
+pipelineMode:str = "lazy"
+
 # Store history here
 historyList:list[str] = []
 # Current index of history
@@ -110,6 +118,13 @@ if os.path.isfile(historyFileName):
 getch:Getch = Getch()                             # create instance of our getch class
 
 if __name__ == '__main__':
+    for arg in sys.argv[1:]:
+        if arg.removeprefix("--pipeline=") in pipelineModes:
+            pipelineMode = arg.removeprefix("--pipeline=")
+        else:
+            print(f"shell.py: invalid option -- {arg}\nValid options: {', '.join(f'--pipeline={mode}' for mode in sorted(pipelineModes))}")
+            sys.exit(1)
+
     commandStr = ""                                # empty commandStr variable
 
                               # print to terminal
@@ -186,61 +201,64 @@ if __name__ == '__main__':
 
             commandList:list[ShellCommand] = parseCommand(commandStr)
 
-            for i in range(0, len(commandList)):
-                result:str = ""
+            # If only whitespace was entered, there is nothing to run
+            if not commandList:
+                print_cmd(f"{commandStr}\n")
+                commandStr = ""
+                continue
+
+            # Find the function of each command before running any of them
+            commands:dict[str, Callable] = {}
+            for shellCommand in commandList:
+                if shellCommand.name.startswith("!"):
+                    try:
+                        index:int = int(shellCommand.name.removeprefix("!"))
+                        commandStr = historyList[index-1]
+                    except(ValueError, IndexError):
+                        print_cmd(f"{commandStr}\n{shellCommand.name}: event not found\n")
+                        commandStr = ""
+                    break
+                elif shellCommand.name == "history":
+                    commands[shellCommand.name] = partial(history, historyList)
+                elif findCommand(shellCommand.name) is not None:
+                    commands[shellCommand.name] = findCommand(shellCommand.name)
+                else:
+                    print_cmd(f"{commandStr}\n{shellCommand.name}: command not found\n")
+                    commandStr = ""
+                    break
+            else:
+                lastCommand:ShellCommand = commandList[-1]
+
+                if pipelineMode == "lazy" or len(commandList) == 1:
+                    output:Iterator[str] = runPipeline(commandList, commands)
+                else:
+                    output:Iterator[str] = runPipelineConcurrent(commandList, commands, processes=pipelineMode == "processes")
+
                 try:
-                    if commandList[i].name.startswith("!"):
-                        try:
-                            index:int = int(commandList[i].name.removeprefix("!"))
-                            commandStr = historyList[index-1]
-                            break
-                        except(ValueError, IndexError):
-                            result = f"{commandStr}\n{commandList[i].name}: event not found\n"
-                            print_cmd(result)
-                            commandStr = ""
-                            break
-                    if commandList[i].name == "history":
-                        result = history(historyList, flags=commandList[i].flags, params=commandList[i].params)
-
-                        if not historyList:
-                            movingIndex = 0
-                    elif callable(getattr(cmd_pkg, commandList[i].name, None)):
-                        commandFunc = getattr(cmd_pkg, commandList[i].name)
-
-                        if commandList[i].fileIn:
-                            with open(commandList[i].infile) as infile:
-                                commandList[i].params.append(infile.read())
-
-                        result = commandFunc(flags=commandList[i].flags, \
-                                params=commandList[i].params, \
-                                stdin= commandList[i].stdin, \
-                                stdout=commandList[i].stdout)
+                    # Output is written as the last command yields it
+                    if lastCommand.fileOut or lastCommand.fileAppend:
+                        with open(lastCommand.outfile, "w" if lastCommand.fileOut else "a") as outfile:
+                            writeLines(output, outfile)
+                        print_cmd(f"{commandStr}\n\n")
                     else:
-                        result = f"{commandStr}\n{commandList[i].name}: command not found\n"
-                        print_cmd(result)
-                        commandStr = ""
-                        break
+                        print_cmd(f"{commandStr}\n")
+                        writeLines(output, sys.stdout, flush=sys.stdout.isatty())
+                        sys.stdout.write("\n")
+                        sys.stdout.flush()
+                # ctrl-c stops the command (e.g. `tail -f`), not the shell
+                except(KeyboardInterrupt) as e:
+                    output.close()
+                    sys.stdout.write("\n")
+                    sys.stdout.flush()
                 except(SystemExit) as e:
                     with open(historyFileName, "w") as historyFile:
                         historyFile.write('\n'.join(historyList))
                     print_cmd(f"{commandStr}\n")
                     cmd_pkg.exit()
-                # If next command recieves params from current command output, store output
-                if i + 1 < len(commandList):
-                    commandList[i+1].params.append(result)
-                    result = ""
-                elif commandList[i].fileOut:
-                    with open(commandList[i].outfile, "w") as outfile:
-                        outfile.write(result)
-                        result = ""
-                elif commandList[i].fileAppend:
-                    with open(commandList[i].outfile, "a") as outfile:
-                        outfile.write(result)
-                        result = ""
-                # If last command
-                if i == len(commandList) - 1:
-                    print_cmd(f"{commandStr}\n{result}\n")
-                    commandStr = ""
+
+                if not historyList:
+                    movingIndex = 0
+                commandStr = ""
         else:
             commandStr += char                     # add typed character to our "cmd"
             # print_cmd(commandStr)                  # print the cmd out
@@ -0,0 +1,93 @@
+"""Provides a utility function for simulating Lottery CPU Scheduling Algorithm.
+
+Given a `list` of `PCB`s, `lottery` will perform the Lottery CPU Scheduling Algorithm,
+while providing a visualization. `LotteryPolicy` is the `SchedulingPolicy` used for it.
+
+"""
+from random import Random
+from pcb import PCB
+from cpu import CPU
+from scheduler import simulate
+from readyqueue import LotteryReadyQueue
+from RR import RoundRobinPolicy
+
+
+class LotteryPolicy(RoundRobinPolicy):
+    """Lottery scheduling policy.
+
+    Each process holds tickets in proportion to its priority. Whenever a core
+    is free, a winning ticket is drawn from the ready processes and its holder
+    runs for at most `time_slice` ticks. Over time each process gets a share
+    of the CPU proportional to its tickets. The "ready" queue is a
+    `LotteryReadyQueue`, so each draw is O(log n).
+
+    Attributes:
+        tickets_per_priority (int): tickets given for each point of priority
+        seed                 (int | None): seed of the random number generator
+
+    """
+
+    name: str = "LOTTERY"
+    show_priority: bool = True
+    randomized: bool = True
+
+    def __init__(
+        self,
+        time_slice: int = 1,
+        tickets_per_priority: int = 100,
+        seed: int | None = None,
+    ) -> None:
+        """__init__ method for `LotteryPolicy`
+
+        Constructs a new `LotteryPolicy` object.
+
+        Args:
+            time_slice(optional): `int` representing the quantum.
+            tickets_per_priority(optional): `int` representing tickets per point of priority. Defaults to 100.
+            seed(optional): `int` seed for the random number generator, for reproducible runs. Defaults to `None`.
+
+        """
+        super().__init__(time_slice)
+        self.tickets_per_priority: int = tickets_per_priority
+        self.seed: int | None = seed
+        self.title: str = f"Lottery\nTime Slice: {time_slice}"
+
+    def tickets(self, pcb: PCB) -> int:
+        """Returns the number of tickets held by `pcb`."""
+        return max(pcb.priority, 1) * self.tickets_per_priority
+
+    def on_start(self, cpu: CPU) -> None:
+        cpu.ready = LotteryReadyQueue(self.tickets, Random(self.seed))
+
+
+def lottery(
+    pcbList: list[PCB],
+    num_cores: int = 1,
+    io_devices: int = 1,
+    sleep_delay: float = 1,
+    time_slice: int = 1,
+    seed: int | None = None,
+) -> None:
+    """Performs the Lottery algorithm on a `list` of `PCB` objects.
+
+    Performs Lottery algorithm on `pcbList`, then shows a visualization of the results.
+
+    Args:
+        pcbList: a `list` of `PCB` objects.
+        num_cores (optional): `int` representing number of cores in CPU.
+        io_devices (optional): `int` representing number of I/O devices.
+        sleep_delay (optional): `int` controlling how fast the visualization occurs.
+        time_slice (optional): `int` representing the quantum.
+        seed (optional): `int` seed for the random number generator.
+    """
+    simulate(
+        pcbList=pcbList,
+        policy=LotteryPolicy(time_slice, seed=seed),
+        num_cores=num_cores,
+        io_devices=io_devices,
+        sleep_delay=sleep_delay,
+    )
+
+
+if __name__ == "__main__":
+    help("LOTTERY")
@@ -0,0 +1,120 @@
+"""Provides a utility function for simulating MLFQ (Multi-Level Feedback Queue) CPU Scheduling Algorithm.
+
+Given a `list` of `PCB`s, `multi_level_feedback_queue` will perform the MLFQ CPU Scheduling Algorithm,
+while providing a visualization. `MultiLevelFeedbackQueuePolicy` is the `SchedulingPolicy` used for it.
+
+"""
+from pcb import PCB
+from cpu import CPU
+from scheduler import simulate
+from readyqueue import MultiLevelReadyQueue
+from RR import RoundRobinPolicy
+
+
+class MultiLevelFeedbackQueuePolicy(RoundRobinPolicy):
+    """Multi-Level Feedback Queue (MLFQ) scheduling policy.
+
+    Every process starts in level 0, the highest priority. Each level is a
+    round robin queue with its own quantum. A process that uses up its whole
+    quantum is demoted one level, while a process that gives up the core for
+    I/O keeps its level. A ready process preempts a running process of a lower
+    priority level when every core is busy. Every `boost_interval` ticks all
+    processes are moved back to level 0 ("aging"), to prevent starvation.
+
+    Attributes:
+        quanta         (list[int]): quantum of each level
+        boost_interval (int): ticks between priority boosts, 0 disables boosting
+        levels         (dict[int, int]): current level of each process, by process id
+
+    """
+
+    name: str = "MLFQ"
+
+    def __init__(
+        self,
+        time_slice: int = 1,
+        num_levels: int = 3,
+        quanta: list[int] | None = None,
+        boost_interval: int = 100,
+    ) -> None:
+        """__init__ method for `MultiLevelFeedbackQueuePolicy`
+
+        Constructs a new `MultiLevelFeedbackQueuePolicy` object.
+
+        Args:
+            time_slice(optional): `int` representing the quantum of level 0.
+            num_levels(optional): `int` representing the number of levels. Ignored if `quanta` is given.
+            quanta(optional): `list[int]` of the quantum of each level. Defaults to `time_slice` doubling each level.
+            boost_interval(optional): `int` representing ticks between priority boosts. Defaults to 100.
+
+        """
+        super().__init__(time_slice)
+        self.quanta: list[int] = quanta or [time_slice * 2**i for i in range(num_levels)]
+        self.boost_interval: int = boost_interval
+        self.levels: dict[int, int] = {}
+        self.title: str = f"Multi-Level Feedback Queue\nQuanta: {self.quanta}"
+        self.__ticks: int = 0
+
+    def level(self, pcb: PCB) -> int:
+        """Returns the current level of `pcb`."""
+        return self.levels.get(pcb.process_id, 0)
+
+    def quantum(self, pcb: PCB) -> int:
+        return self.quanta[self.level(pcb)]
+
+    def on_start(self, cpu: CPU) -> None:
+        cpu.ready = MultiLevelReadyQueue(len(self.quanta), self.level)
+
+    def should_preempt(self, cpu: CPU) -> bool:
+        return (
+            len(cpu.running) >= cpu.num_cores
+            and cpu.ready.top_level() < self.level(cpu.running[-1])
+        )
+
+    def on_dispatch(self, cpu: CPU) -> None:
+        # Sort running queue by level, so rightmost has the lowest priority
+        cpu.running.sort(key=self.level)
+
+    def on_quantum_expire(self, cpu: CPU, pcb: PCB) -> None:
+        # Used the whole quantum, so demote one level
+        self.levels[pcb.process_id] = min(self.level(pcb) + 1, len(self.quanta) - 1)
+        super().on_quantum_expire(cpu, pcb)
+
+    def on_tick(self, cpu: CPU) -> None:
+        self.__ticks += 1
+
+        # Move every process back to the highest priority level
+        if self.boost_interval and self.__ticks % self.boost_interval == 0:
+            self.levels.clear()
+            cpu.ready.boost()
+
+
+def multi_level_feedback_queue(
+    pcbList: list[PCB],
+    num_cores: int = 1,
+    io_devices: int = 1,
+    sleep_delay: float = 1,
+    time_slice: int = 1,
+) -> None:
+    """Performs the Multi-Level Feedback Queue (MLFQ) algorithm on a `list` of `PCB` objects.
+
+    Performs MLFQ algorithm on `pcbList`, then shows a visualization of the results.
+
+    Args:
+        pcbList: a `list` of `PCB` objects.
+        num_cores (optional): `int` representing number of cores in CPU.
+        io_devices (optional): `int` representing number of I/O devices.
+        sleep_delay (optional): `int` controlling how fast the visualization occurs.
+        time_slice (optional): `int` representing the quantum of the highest priority level.
+    """
+    simulate(
+        pcbList=pcbList,
+        policy=MultiLevelFeedbackQueuePolicy(time_slice),
+        num_cores=num_cores,
+        io_devices=io_devices,
+        sleep_delay=sleep_delay,
+    )
+
+
+if __name__ == "__main__":
+    help("MLFQ")
@@ -0,0 +1,68 @@
+"""Provides a utility function for simulating SJF (Shortest-Job-First) CPU Scheduling Algorithm.
+
+Given a `list` of `PCB`s, `shortest_job_first` will perform the SJF CPU Scheduling Algorithm,
+while providing a visualization. `ShortestJobFirstPolicy` is the `SchedulingPolicy` used for it.
+
+"""
+from pcb import PCB
+from cpu import CPU
+from scheduler import SchedulingPolicy, simulate
+from readyqueue import HeapReadyQueue
+
+
+def next_burst(pcb: PCB) -> int:
+    """Returns the length of the next (or current) CPU burst of `pcb`.
+
+    Args:
+        pcb: a `PCB` object.
+
+    Returns:
+        int: the remaining ticks of the current CPU burst, or 0 if there is none.
+
+    """
+    return pcb.cpu_bursts[0] if pcb.cpu_bursts else 0
+
+
+class ShortestJobFirstPolicy(SchedulingPolicy):
+    """Shortest-Job-First (SJF) non-preemptive scheduling policy.
+
+    The ready process with the shortest next CPU burst runs first, and keeps
+    its core until the burst is finished. Ties are broken first-come-first-serve.
+    The "ready" queue is a `HeapReadyQueue`, so dispatching is O(log n).
+
+    """
+
+    name: str = "SJF"
+    title: str = "Shortest Job First"
+
+    def on_start(self, cpu: CPU) -> None:
+        cpu.ready = HeapReadyQueue(key=next_burst)
+
+
+def shortest_job_first(
+    pcbList: list[PCB],
+    num_cores: int = 1,
+    io_devices: int = 1,
+    sleep_delay: float = 1,
+) -> None:
+    """Performs the Shortest-Job-First (SJF) algorithm on a `list` of `PCB` objects.
+
+    Performs SJF algorithm on `pcbList`, then shows a visualization of the results.
+
+    Args:
+        pcbList: a `list` of `PCB` objects.
+        num_cores (optional): `int` representing number of cores in CPU.
+        io_devices (optional): `int` representing number of I/O devices.
+        sleep_delay (optional): `int` controlling how fast the visualization occurs.
+    """
+    simulate(
+        pcbList=pcbList,
+        policy=ShortestJobFirstPolicy(),
+        num_cores=num_cores,
+        io_devices=io_devices,
+        sleep_delay=sleep_delay,
+    )
+
+
+if __name__ == "__main__":
+    help("SJF")
@@ -0,0 +1,66 @@
+"""Provides a utility function for simulating SRTF (Shortest-Remaining-Time-First) CPU Scheduling Algorithm.
+
+Given a `list` of `PCB`s, `shortest_remaining_time_first` will perform the SRTF CPU Scheduling Algorithm,
+while providing a visualization. `ShortestRemainingTimeFirstPolicy` is the `SchedulingPolicy` used for it.
+
+"""
+from pcb import PCB
+from cpu import CPU
+from scheduler import simulate
+from SJF import ShortestJobFirstPolicy, next_burst
+
+
+class ShortestRemainingTimeFirstPolicy(ShortestJobFirstPolicy):
+    """Shortest-Remaining-Time-First (SRTF) preemptive scheduling policy.
+
+    Preemptive version of SJF. When every core is busy, a ready process whose
+    next CPU burst is shorter than the remaining burst of a running process
+    takes that process's core. The "running" queue is kept sorted by remaining
+    burst, so `cpu.running[-1]` is always the longest one.
+
+    """
+
+    name: str = "SRTF"
+    title: str = "Shortest Remaining Time First"
+
+    def should_preempt(self, cpu: CPU) -> bool:
+        return len(cpu.running) >= cpu.num_cores and next_burst(
+            cpu.ready.peek()
+        ) < next_burst(cpu.running[-1])
+
+    def on_dispatch(self, cpu: CPU) -> None:
+        # Sort running queue by remaining burst, so rightmost has the longest
+        cpu.running.sort(key=next_burst)
+
+    def on_tick(self, cpu: CPU) -> None:
+        # Remaining bursts changed this tick
+        cpu.running.sort(key=next_burst)
+
+
+def shortest_remaining_time_first(
+    pcbList: list[PCB],
+    num_cores: int = 1,
+    io_devices: int = 1,
+    sleep_delay: float = 1,
+) -> None:
+    """Performs the Shortest-Remaining-Time-First (SRTF) algorithm on a `list` of `PCB` objects.
+
+    Performs SRTF algorithm on `pcbList`, then shows a visualization of the results.
+
+    Args:
+        pcbList: a `list` of `PCB` objects.
+        num_cores (optional): `int` representing number of cores in CPU.
+        io_devices (optional): `int` representing number of I/O devices.
+        sleep_delay (optional): `int` controlling how fast the visualization occurs.
+    """
+    simulate(
+        pcbList=pcbList,
+        policy=ShortestRemainingTimeFirstPolicy(),
+        num_cores=num_cores,
+        io_devices=io_devices,
+        sleep_delay=sleep_delay,
+    )
+
+
+if __name__ == "__main__":
+    help("SRTF")
@@ -0,0 +1,102 @@
+"""Provides a utility function for simulating Stride CPU Scheduling Algorithm.
+
+Given a `list` of `PCB`s, `stride` will perform the Stride CPU Scheduling Algorithm,
+while providing a visualization. `StridePolicy` is the `SchedulingPolicy` used for it.
+
+"""
+from pcb import PCB
+from cpu import CPU
+from scheduler import simulate
+from readyqueue import HeapReadyQueue
+from LOTTERY import LotteryPolicy
+
+# Large number divided by the tickets of a process to get its stride
+STRIDE1: int = 1 << 20
+
+
+class StridePolicy(LotteryPolicy):
+    """Stride scheduling policy, the deterministic version of lottery scheduling.
+
+    Each process has a stride inversely proportional to its tickets, and a
+    "pass" value that grows by its stride for every tick it runs. The ready
+    process with the lowest pass runs next, for at most `time_slice` ticks.
+    The "ready" queue is a `HeapReadyQueue` ordered by pass, so dispatching
+    is O(log n).
+
+    Attributes:
+        pass_values (dict[int, int]): pass value of each process, by process id
+        global_pass (int): pass value of the most recently dispatched process
+
+    """
+
+    name: str = "STRIDE"
+    randomized: bool = False
+
+    def __init__(self, time_slice: int = 1, tickets_per_priority: int = 100) -> None:
+        """__init__ method for `StridePolicy`
+
+        Constructs a new `StridePolicy` object.
+
+        Args:
+            time_slice(optional): `int` representing the quantum.
+            tickets_per_priority(optional): `int` representing tickets per point of priority. Defaults to 100.
+
+        """
+        super().__init__(time_slice, tickets_per_priority)
+        self.pass_values: dict[int, int] = {}
+        self.global_pass: int = 0
+        self.title: str = f"Stride\nTime Slice: {time_slice}"
+
+    def on_start(self, cpu: CPU) -> None:
+        cpu.ready = HeapReadyQueue(key=lambda pcb: self.pass_values[pcb.process_id])
+
+    def on_ready(self, cpu: CPU, pcb: PCB) -> None:
+        # Processes that were away (new, or doing I/O) do not get to catch up
+        self.pass_values[pcb.process_id] = max(
+            self.pass_values.get(pcb.process_id, 0), self.global_pass
+        )
+        cpu.ready.append(pcb)
+
+    def pick_next(self, cpu: CPU) -> PCB:
+        pcb: PCB = cpu.ready.popleft()
+        self.global_pass = self.pass_values[pcb.process_id]
+        return pcb
+
+    def quantum_expired(self, pcb: PCB) -> bool:
+        self.pass_values[pcb.process_id] += STRIDE1 // self.tickets(pcb)
+        return super().quantum_expired(pcb)
+
+    def on_burst_complete(self, pcb: PCB) -> None:
+        self.pass_values[pcb.process_id] += STRIDE1 // self.tickets(pcb)
+        super().on_burst_complete(pcb)
+
+
+def stride(
+    pcbList: list[PCB],
+    num_cores: int = 1,
+    io_devices: int = 1,
+    sleep_delay: float = 1,
+    time_slice: int = 1,
+) -> None:
+    """Performs the Stride algorithm on a `list` of `PCB` objects.
+
+    Performs Stride algorithm on `pcbList`, then shows a visualization of the results.
+
+    Args:
+        pcbList: a `list` of `PCB` objects.
+        num_cores (optional): `int` representing number of cores in CPU.
+        io_devices (optional): `int` representing number of I/O devices.
+        sleep_delay (optional): `int` controlling how fast the visualization occurs.
+        time_slice (optional): `int` representing the quantum.
+    """
+    simulate(
+        pcbList=pcbList,
+        policy=StridePolicy(time_slice),
+        num_cores=num_cores,
+        io_devices=io_devices,
+        sleep_delay=sleep_delay,
+    )
+
+
+if __name__ == "__main__":
+    help("STRIDE")
@@ -0,0 +1,330 @@
+"""Benchmarks the CPU Scheduling Simulation and tracks its speed over time.
+
+CPU Scheduling Benchmarks
+
+Every combination of the given scheduling algorithms, workload sizes, cores
+and burst mixes is simulated headless (no visualization, no delay). Workloads
+are generated once per size and mix with `workload.WorkloadGenerator` (same
+burst mixes as `generate_file`) and cached as binary traces in `workdir`.
+Each case runs in a fresh worker process, so its peak RSS is its own.
+
+Measured per case:
+    wall_time           : seconds spent in `simulate`, best of `repeat` runs
+    spread              : (slowest - fastest) / fastest wall time of the `repeat` runs
+    ticks_per_second    : simulated ticks / wall time
+    events_per_second   : process state transitions / wall time
+    peak_rss_mb         : peak resident memory of the worker process, in MiB
+
+Results are appended to a JSON history file. Each case is compared with its
+latest result in the history: if its ticks per second dropped by more than
+`threshold`, and by more than the spread of either result (run-to-run noise),
+the regressions are reported, the results are not appended (the baseline
+stays the same), and the exit status is 1.
+
+Command-line Args (lists are comma separated):
+    sched(str, optional): Scheduling algorithms. Defaults to every algorithm in `main.scheduling_algorithms`.
+    nj(int, optional): Numbers of jobs, e.g. "1000,10000,100000,1000000". Defaults to `1000`.
+    cpu(int, optional): Numbers of cores. Defaults to `1,4`.
+    io(int, optional): Number of IO devices. Defaults to `2`.
+    mix(str, optional): Burst mixes, "cpu", "io" or "normal". Defaults to `cpu,io,normal`.
+    timeslice(int, optional): Quantum. Defaults to `4`.
+    seed(int, optional): Seed of the workloads and randomized algorithms. Defaults to `0`.
+    repeat(int, optional): Runs per case, the fastest is kept. Defaults to `3`.
+    threshold(float, optional): Largest allowed drop in ticks per second, e.g. 0.1 for 10%. Defaults to `0.1`.
+    history(str, optional): JSON history file. Defaults to `"bench_history.json"`.
+    workdir(str, optional): Directory for cached workloads. Defaults to `".bench"`.
+    --no-save(optional): Compare with the history without appending to it.
+
+Examples:
+    python3.11 bench.py
+
+    python3.11 bench.py sched=FCFS,RR nj=1000,10000,100000 cpu=1,8 mix=normal repeat=3
+
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import product
+from time import perf_counter
+from pcb import PCB, TRACE_EXTENSION, trace2PCBs
+from scheduler import simulate
+from tickcounter import Clock
+from main import scheduling_algorithms
+from generate_input import parse_commandline_args
+from workload import WorkloadGenerator, write_workload
+
+burst_mixes: tuple[str, ...] = ("cpu", "io", "normal")
+
+# Fields identifying a case in the history
+case_fields: tuple[str, ...] = ("sched", "nj", "cpu", "io", "mix", "timeslice", "seed")
+
+
+class EventCounter:
+    """Counts the process state transitions of a simulation.
+
+    Passed to `simulate` in place of a `timeline.TimelineRecorder`, so counting
+    costs one call and one addition per event.
+
+    Attributes:
+        events (int): number of state transitions recorded
+    """
+
+    def __init__(self) -> None:
+        """__init__ method for `EventCounter`
+
+        Constructs a new `EventCounter` object, with no events.
+        """
+        self.events: int = 0
+
+    def record(self, tick: int, process_id: int, from_state: int, to_state: int) -> None:
+        """Counts one state transition, see `TimelineRecorder.record`."""
+        self.events += 1
+
+
+def workload_file(workdir: str, nj: int, mix: str, seed: int) -> str:
+    """Returns the binary trace of a benchmark workload, generating it if it is not cached.
+
+    Args:
+        workdir: directory of cached workloads.
+        nj: number of jobs.
+        mix: burst mix, "cpu", "io" or "normal".
+        seed: seed of the workload.
+
+    Returns:
+        str: name of the binary trace.
+    """
+    ofile: str = os.path.join(workdir, f"{mix}_nj={nj}_seed={seed}{TRACE_EXTENSION}")
+    if not os.path.exists(ofile):
+        os.makedirs(workdir, exist_ok=True)
+        # Written under a temporary name, so an interrupted run leaves no partial workload
+        partial: str = os.path.join(workdir, f"partial_{mix}_nj={nj}_seed={seed}{TRACE_EXTENSION}")
+        write_workload(WorkloadGenerator(seed=seed, intBurstType=mix), nj, partial)
+        os.replace(partial, ofile)
+    return ofile
+
+
+def run_case(case: dict, trace_file: str, repeat: int = 3) -> dict:
+    """Runs one benchmark case and returns its measurements.
+
+    Meant to run in a fresh worker process, since peak RSS covers the whole process.
+
+    Args:
+        case: `dict` with the keys of `case_fields`.
+        trace_file: binary trace of the workload.
+        repeat (optional): number of runs, the fastest is kept. Defaults to 3.
+
+    Returns:
+        dict: `case` merged with the ticks, events, wall time, spread of the wall times,
+            ticks and events per second and peak RSS of the run.
+    """
+    policy_class = scheduling_algorithms[case["sched"]]
+    policy_kwargs: dict = {"time_slice": case["timeslice"]}
+    if policy_class.randomized:
+        policy_kwargs["seed"] = case["seed"]
+
+    wall_times: list[float] = []
+
+    for _ in range(repeat):
+        pcbList: list[PCB] = trace2PCBs(trace_file)
+        counter: EventCounter = EventCounter()
+        clock: Clock = Clock()
+
+        start: float = perf_counter()
+        simulate(
+            pcbList=pcbList,
+            policy=policy_class(**policy_kwargs),
+            num_cores=case["cpu"],
+            io_devices=case["io"],
+            sleep_delay=0,
+            visualize=False,
+            timeline=counter,
+            clock=clock,
+        )
+        wall_times.append(perf_counter() - start)
+        ticks: int = clock.get_ticks()
+
+    wall_time: float = min(wall_times)
+
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb: float = peak_rss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+
+    return {
+        **case,
+        "ticks": ticks,
+        "events": counter.events,
+        "wall_time": wall_time,
+        "spread": max(wall_times) / wall_time - 1,
+        "ticks_per_second": ticks / wall_time,
+        "events_per_second": counter.events / wall_time,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+def case_key(result: dict) -> tuple:
+    """Returns the fields identifying the case of `result`."""
+    return tuple(result.get(field) for field in case_fields)
+
+
+def latest_results(history: list[dict]) -> dict[tuple, dict]:
+    """Returns the latest result of every case in `history`, by `case_key`."""
+    return {case_key(result): result for entry in history for result in entry["results"]}
+
+
+def find_regressions(results: list[dict], baseline: dict[tuple, dict], threshold: float) -> list[str]:
+    """Compares the ticks per second of `results` with the same cases in `baseline`.
+
+    A drop only counts when it is larger than the spread measured across the
+    repeats of either result, so noise between runs is not reported.
+
+    Args:
+        results: measurements of this run.
+        baseline: earlier measurements, by `case_key`, see `latest_results`.
+        threshold: largest allowed drop, e.g. 0.1 for 10%.
+
+    Returns:
+        list[str]: a description of each case slower than its baseline by more than `threshold`
+            and than the spread of both results.
+    """
+    regressions: list[str] = []
+
+    for result in results:
+        before: dict | None = baseline.get(case_key(result))
+        if before is None:
+            continue
+
+        change: float = result["ticks_per_second"] / before["ticks_per_second"] - 1
+        # Results from before the spread was recorded count as noiseless
+        allowed: float = max(threshold, result.get("spread", 0.0), before.get("spread", 0.0))
+        if change < -allowed:
+            name: str = " ".join(f"{field}={result[field]}" for field in case_fields)
+            regressions.append(
+                f"{name}: {before['ticks_per_second']:.0f} -> {result['ticks_per_second']:.0f} ticks/s ({change:+.1%})"
+            )
+
+    return regressions
+
+
+def load_history(history_file: str) -> list[dict]:
+    """Reads the benchmark history, an empty history if the file does not exist."""
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, "r") as jsonFile:
+        return json.load(jsonFile)
+
+
+def git_commit() -> str | None:
+    """Returns the short hash of the git commit of this module, `None` outside a git repository."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cases: list[dict], workdir: str, repeat: int = 3) -> list[dict]:
+    """Runs every case, each in a fresh worker process, one at a time.
+
+    Args:
+        cases: `list` of cases, `dict`s with the keys of `case_fields`.
+        workdir: directory of cached workloads.
+        repeat (optional): runs per case. Defaults to 3.
+
+    Returns:
+        list[dict]: measurements of each case, see `run_case`.
+    """
+    results: list[dict] = []
+
+    for done, case in enumerate(cases, start=1):
+        trace_file: str = workload_file(workdir, case["nj"], case["mix"], case["seed"])
+
+        # One case per process, so peak RSS and timings are not shared between cases
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+            result: dict = executor.submit(run_case, case, trace_file, repeat).result()
+
+        results.append(result)
+        print(
+            f"[{done}/{len(cases)}] {case['sched']:<8} nj={case['nj']:<8} cpu={case['cpu']:<3} mix={case['mix']:<7}"
+            f" {result['wall_time']:8.2f}s {result['ticks_per_second']:12.0f} ticks/s"
+            f" {result['events_per_second']:12.0f} events/s {result['peak_rss_mb']:8.1f} MiB",
+            file=sys.stderr,
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    argv: list[str] = sys.argv[1:]
+    args, kwargs = parse_commandline_args(argv)
+
+    # If --help flag is present, print module level doc-string,
+    # then exit program.
+    if "--help" in args:
+        help("bench")
+        sys.exit()
+
+    def as_list(key: str, default: str, cast=str) -> list:
+        return [cast(value) for value in kwargs.get(key, default).split(",") if value]
+
+    try:
+        scheds: list[str] = as_list("sched", ",".join(scheduling_algorithms))
+        unknown: set[str] = set(scheds).difference(scheduling_algorithms)
+        if unknown:
+            raise ValueError(f"unknown 'sched' value(s) {unknown}. Must be values in {set(scheduling_algorithms)}.")
+
+        mixes: list[str] = as_list("mix", ",".join(burst_mixes))
+        unknown = set(mixes).difference(burst_mixes)
+        if unknown:
+            raise ValueError(f"unknown 'mix' value(s) {unknown}. Must be values in {set(burst_mixes)}.")
+
+        io: int = int(kwargs.get("io", 2))
+        time_slice: int = int(kwargs.get("timeslice", 4))
+        seed: int = int(kwargs.get("seed", 0))
+        cases: list[dict] = [
+            {"sched": sched, "nj": nj, "cpu": cpu, "io": io, "mix": mix, "timeslice": time_slice, "seed": seed}
+            for nj, mix, cpu, sched in product(as_list("nj", "1000", int), mixes, as_list("cpu", "1,4", int), scheds)
+        ]
+        repeat: int = int(kwargs.get("repeat", 3))
+        if repeat < 1:
+            raise ValueError(f"invalid value {repeat} for 'repeat'. Must be an integer >= 1.")
+        threshold: float = float(kwargs.get("threshold", 0.1))
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    history_file: str = kwargs.get("history", "bench_history.json")
+    history: list[dict] = load_history(history_file)
+
+    start: float = perf_counter()
+    results: list[dict] = run_benchmarks(cases, kwargs.get("workdir", ".bench"), repeat)
+    print(f"Ran {len(cases)} benchmarks in {perf_counter() - start:.2f}s")
+
+    regressions: list[str] = find_regressions(results, latest_results(history), threshold)
+
+    if "--no-save" not in args and not regressions:
+        history.append(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "python": sys.version.split()[0],
+                "results": results,
+            }
+        )
+        with open(history_file, "w") as jsonFile:
+            json.dump(history, jsonFile, indent=4)
+        print(f"Results appended to {history_file}")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {threshold:.0%} in ticks per second:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
@@ -4,8 +4,10 @@
 
 """
 from pcb import PCB
+from stats import StatsAccumulator
+from tickcounter import Clock
 from collections import deque
-from statistics import mean
+import heapq
 
 
 class CPU:
@@ -23,10 +25,13 @@ class CPU:
         waiting    (deque[PCB]): queue for holding processes in the "waiting" state
         io         (list[PCB]): `list` for holding processes in the "io" state
         terminated (deque[PCB]): queue for holding processes in the "teriminated state
+        io_slots   (dict[int, int]): I/O device of each process in the "io" state, by process id
+        stats      (StatsAccumulator): running stats of the processes
+        clock      (Clock): tick counter of the simulation
 
     """
 
-    def __init__(self, num_cores: int = 1, io_devices: int = 1) -> None:
+    def __init__(self, num_cores: int = 1, io_devices: int = 1, clock: Clock | None = None) -> None:
         """__init__ method for `CPU`
 
         Constructs a new `CPU` object.
@@ -34,6 +39,7 @@ class CPU:
         Args:
             num_cores(optional): `int` representing number of cores.
             io_devices(optional): `int` representing number of I/O devices.
+            clock(optional): `Clock` counting the ticks of the simulation. Defaults to a new `Clock`.
 
         """
         self.num_cores: int = num_cores
@@ -45,6 +51,38 @@ class CPU:
         self.waiting: deque[PCB] = deque()
         self.io: list[PCB] = []
         self.terminated: deque[PCB] = deque()
+        self.io_slots: dict[int, int] = {}
+        # Heap of free I/O devices, so the lowest is taken first
+        self.__free_io: list[int] = list(range(io_devices))
+        self.stats: StatsAccumulator = StatsAccumulator(num_cores, io_devices)
+        self.clock: Clock = Clock() if clock is None else clock
+
+    def take_io_device(self, pcb: PCB) -> int:
+        """Gives `pcb` the lowest free I/O device, which it keeps until `release_io_device`.
+
+        Devices are numbered the same way as by `timeline.TimelineRecorder`.
+
+        Args:
+            pcb: process entering the "io" state.
+
+        Returns:
+            int: the device, -1 if every device is taken.
+
+        """
+        device: int = heapq.heappop(self.__free_io) if self.__free_io else -1
+        self.io_slots[pcb.process_id] = device
+        return device
+
+    def release_io_device(self, pcb: PCB) -> None:
+        """Frees the I/O device of `pcb`, as it leaves the "io" state.
+
+        Args:
+            pcb: process leaving the "io" state.
+
+        """
+        device: int = self.io_slots.pop(pcb.process_id, -1)
+        if device >= 0:
+            heapq.heappush(self.__free_io, device)
 
 
 def cpu_utilization(pcbList: list[PCB], current_ticks: int) -> float:
@@ -61,16 +99,30 @@ def cpu_utilization(pcbList: list[PCB], current_ticks: int) -> float:
         float: CPU Utilization.
         
     """
-    average_wait_time: int = mean([pcb.wait_time for pcb in pcbList])
+    average_wait_time: float = sum(pcb.wait_time for pcb in pcbList) / len(pcbList)
+    return cpu_utilization_from_wait(average_wait_time, len(pcbList), current_ticks)
+
+
+def cpu_utilization_from_wait(average_wait_time: float, n: int, current_ticks: int) -> float:
+    """Calculates CPU Utilization from the average wait time.
+
+    Same formula as `cpu_utilization`, for when the `PCB`s are no longer available.
+
+    Args:
+        average_wait_time: average wait time of the processes.
+        n: number of processes.
+        current_ticks: current ticks in simulation.
+    Returns:
+        float: CPU Utilization.
+
+    """
     total_time: int = current_ticks
 
-    n: int = len(pcbList)
     # Calculate probability of a process waiting for I/O
     p: float = average_wait_time / total_time if total_time else 0.0
     # Calculate CPU utlization
     utilization: float = 1.0 - p**n
     return utilization
 
-
 if __name__ == "__main__":
     help("cpu")
@@ -18,7 +18,11 @@ Usage: (All params have defaults, but can be changed with the following):
         minp            : Min priority [1-n]
         maxp            : Max priority 
         prioWeights     : Priority weights 
-        ofile           : Outfile Name will write the output to that file.
+        seed            : Seed for the random values, for reproducible files.
+        ofile           : Outfile Name will write the output to that file. Names ending in ".pcbt"
+                          are written in the compact binary trace format (see `pcb`).
+        --convert       : Convert `input` to `ofile` instead of generating data. JSON to binary
+                          trace if `ofile` ends in ".pcbt", binary trace to JSON otherwise.
 
 Example Commands:
 
@@ -34,20 +38,30 @@ or
 or
 
         generate_input.py prioWeights=high intensiveBurstType=io ofile=datafile_io_intense.json
+or
+
+        generate_input.py nj=1000000 ofile=huge.pcbt
+or
+
+        generate_input.py --convert input=data.json ofile=data.pcbt
 """
 import random
 import sys
 import json
+from array import array
+from typing import Iterable
+from pcb import TRACE_HEADER, TRACE_MAGIC, TRACE_VERSION, TRACE_EXTENSION, PCBTrace, trace_layout
 
 
 class WeightedPriorities:
-    def __init__(self, choiceType="even"):
+    def __init__(self, choiceType="even", rng: random.Random | None = None):
         self.priorityChoiceWeights = {
             "low": [35, 25, 18, 15, 7],
             "even": [20, 20, 20, 20, 20],
             "high": [7, 15, 18, 25, 35],
         }
         self.choiceType = choiceType
+        self.rng = rng or random.Random()
         self.priorityChoiceList = []
         self.generateWeightedPriority(choiceType)
 
@@ -74,7 +88,7 @@ class WeightedPriorities:
         for i in range(len(weights)):
             self.priorityChoiceList.extend([i + 1] * weights[i])
 
-        random.shuffle(self.priorityChoiceList)
+        self.rng.shuffle(self.priorityChoiceList)
 
         # print(self.priorityChoiceList)
 
@@ -108,7 +122,8 @@ def parse_commandline_args(argv: list[str]) -> tuple[list[str], dict[str, str]]:
 
     for arg in argv:
         if "=" in arg:
-            key, val = arg.split("=")
+            # Split on the first "=" only, values can be file names like "RR_timeslice=5_...json"
+            key, val = arg.split("=", 1)
             kwargs[key] = val
         else:
             args.append(arg)
@@ -117,17 +132,18 @@ def parse_commandline_args(argv: list[str]) -> tuple[list[str], dict[str, str]]:
 
 def generate_file(
     nj: int | str = 5,
-    minCpuBT: int | str = random.randint(5, 10),
+    minCpuBT: int | str | None = None,
     maxCpuBT: int | str | None = None,
-    minIOBT: int | str = random.randint(10, 15),
+    minIOBT: int | str | None = None,
     maxIOBT: int | None = None,
-    minNumBursts: int | str = random.randint(5, 8),
+    minNumBursts: int | str | None = None,
     maxNumBursts: int | str | None = None,
     intBurstType: str | list[str] = "normal",
     minat: int | str = 1,
     maxat: int | str | None = None,
     prioWeights: str = "even",
     ofile: str = "data",
+    seed: int | str | None = None,
 ) -> None:
     """Generates JSON-formatted data for CPU Scheduling Simulation.
 
@@ -135,17 +151,18 @@ def generate_file(
 
     Args:
         nj (optional): Number of processes. Defaults to 5.
-        minCpuBT (optional): Minimum value of a CPU burst time. Defaults to random.randint(5, 10).
+        minCpuBT (optional): Minimum value of a CPU burst time. Defaults to a random value in [5, 10].
         maxCpuBT (optional): Maximum value of a CPU burst time. Defaults to None.
-        minIOBT (optional): Minimum value of an IO burst time. Defaults to random.randint(10, 15).
+        minIOBT (optional): Minimum value of an IO burst time. Defaults to a random value in [10, 15].
         maxIOBT (optional): Maximum value of an IO burst time. Defaults to None.
-        minNumBursts (optional): Minimum number of bursts. IO bursts will always have 1 less than CPU bursts. Defaults to random.randint(5, 8).
+        minNumBursts (optional): Minimum number of bursts. IO bursts will always have 1 less than CPU bursts. Defaults to a random value in [5, 8].
         maxNumBursts (optional): Maximum number of bursts. IO bursts will always have 1 less than CPU bursts. Defaults to None.
         intBurstType (optional): Alters generated data to be CPU intensive, IO intensive, or normal. Defaults to "normal".
         minat (optional): Minimum number of process that can arrive at one time. Defaults to 1.
         maxat (optional): Maximum number of processes that can arrivate at one time. Defaults to None.
         prioWeights (optional): Alters ratio of high priority and low priority processes. Defaults to "even".
         ofile (optional): Name of output fille. Defaults to "data".
+        seed (optional): Seed for the random values, for reproducible files. Defaults to None (unseeded).
 
     """
     process_id: int = 0
@@ -159,31 +176,34 @@ def generate_file(
 
     jsonJobs: list = []
 
+    # Draw every random value from one generator, so a seed reproduces the file
+    rng: random.Random = random.Random(None if seed is None else int(seed))
+
     # If file is run with command line args, cast `str` numbers to `int`
     nj = int(nj)
-    minCpuBT = int(minCpuBT)
-    minIOBT = int(minIOBT)
-    minNumBursts = int(minNumBursts)
+    minCpuBT = rng.randint(5, 10) if minCpuBT is None else int(minCpuBT)
+    minIOBT = rng.randint(10, 15) if minIOBT is None else int(minIOBT)
+    minNumBursts = rng.randint(5, 8) if minNumBursts is None else int(minNumBursts)
     minat = int(minat)
 
     # default values
     if not maxCpuBT:
-        maxCpuBT = random.randint(minCpuBT + 3, minCpuBT + 8)
+        maxCpuBT = rng.randint(minCpuBT + 3, minCpuBT + 8)
     else:
         maxCpuBT = int(maxCpuBT)
 
     if not maxIOBT:
-        maxIOBT = random.randint(minIOBT, minIOBT + 5)
+        maxIOBT = rng.randint(minIOBT, minIOBT + 5)
     else:
         maxIOBT = int(maxIOBT)
 
     if not maxNumBursts:
-        maxNumBursts = random.randint(minNumBursts + 3, minNumBursts + 8)
+        maxNumBursts = rng.randint(minNumBursts + 3, minNumBursts + 8)
     else:
         maxNumBursts = int(maxNumBursts)
 
     if not maxat:
-        maxat = random.randint(minat, minat + 2)
+        maxat = rng.randint(minat, minat + 2)
     else:
         maxat = int(maxat)
 
@@ -199,14 +219,14 @@ def generate_file(
         minCpuBT += 4
         maxCpuBT += 4
 
-    prios = WeightedPriorities(prioWeights)
+    prios = WeightedPriorities(prioWeights, rng)
 
     while process_id < nj:
         jsonJob = {}
-        jobs = random.randint(minat, maxat)  # num jobs at this time
+        jobs = rng.randint(minat, maxat)  # num jobs at this time
         for _ in range(jobs):
             jsonJob["arrival_time"] = time
-            cpub = random.randint(minNumBursts, maxNumBursts)  # num cpu bursts
+            cpub = rng.randint(minNumBursts, maxNumBursts)  # num cpu bursts
             jsonJob["process_id"] = process_id
             priority = prios.getNext()
             jsonJob["priority"] = priority
@@ -215,12 +235,12 @@ def generate_file(
             cpuBursts = []
 
             for _ in range(cpub - 1):
-                b = random.randint(minCpuBT, maxCpuBT)
-                i = random.randint(minIOBT, maxIOBT)
+                b = rng.randint(minCpuBT, maxCpuBT)
+                i = rng.randint(minIOBT, maxIOBT)
                 cpuBursts.append(b)
                 ioBursts.append(i)
 
-            b = random.randint(minCpuBT, maxCpuBT)
+            b = rng.randint(minCpuBT, maxCpuBT)
             cpuBursts.append(b)
 
             jsonJob["cpu_bursts"] = cpuBursts
@@ -229,6 +249,10 @@ def generate_file(
         jsonJobs.append(jsonJob)
         time += 1
 
+    if ofile.endswith(TRACE_EXTENSION):
+        write_trace(jsonJobs, ofile)
+        return None
+
     with open(ofile, "w") as jsonFile:
         kwargs: dict = {
             "nj": nj,
@@ -243,6 +267,7 @@ def generate_file(
             "maxat": maxat,
             "prioWeights": prioWeights,
             "ofile": ofile,
+            "seed": seed,
         }
 
         jsonData: dict = {"kwargs": kwargs, "jobs": jsonJobs}
@@ -252,6 +277,83 @@ def generate_file(
     return None
 
 
+def write_trace(jobs: Iterable[dict], ofile: str) -> None:
+    """Writes jobs to a compact binary trace file.
+
+    Columns are collected in typed `array`s (8 or 4 bytes per value) and
+    written in one pass, in the format described in `pcb`.
+
+    Args:
+        jobs: job `dict`s with "arrival_time", "process_id", "priority", "cpu_bursts" and "io_bursts".
+        ofile: Name of output file.
+
+    """
+    columns: dict[str, array] = {
+        name: array(typecode) for name, typecode, _ in trace_layout(0, 0, 0)
+    }
+    columns["cpu_offsets"].append(0)
+    columns["io_offsets"].append(0)
+
+    for job in jobs:
+        columns["arrival_time"].append(job["arrival_time"])
+        columns["process_id"].append(job["process_id"])
+        columns["priority"].append(job["priority"])
+        columns["cpu_bursts"].extend(job["cpu_bursts"])
+        columns["io_bursts"].extend(job["io_bursts"])
+        columns["cpu_offsets"].append(len(columns["cpu_bursts"]))
+        columns["io_offsets"].append(len(columns["io_bursts"]))
+
+    with open(ofile, "wb") as traceFile:
+        traceFile.write(
+            TRACE_HEADER.pack(
+                TRACE_MAGIC,
+                TRACE_VERSION,
+                0,
+                len(columns["arrival_time"]),
+                len(columns["cpu_bursts"]),
+                len(columns["io_bursts"]),
+            )
+        )
+
+        for name, _, _ in trace_layout(0, 0, 0):
+            column: array = columns[name]
+            if sys.byteorder == "big":
+                column.byteswap()
+            traceFile.write(column.tobytes())
+            # Pad to keep every section 8-byte aligned
+            traceFile.write(bytes(-len(column) * column.itemsize % 8))
+
+
+def json2trace(input_file: str, ofile: str) -> None:
+    """Converts a JSON job file to a binary trace file.
+
+    Args:
+        input_file: Name of JSON file.
+        ofile: Name of output binary trace file.
+
+    """
+    with open(input_file, "r") as jsonFile:
+        write_trace(json.load(jsonFile).get("jobs", []), ofile)
+
+
+def trace2json(input_file: str, ofile: str) -> None:
+    """Converts a binary trace file to a JSON job file.
+
+    Args:
+        input_file: Name of binary trace file.
+        ofile: Name of output JSON file.
+
+    """
+    keys: tuple[str, ...] = ("arrival_time", "process_id", "priority", "cpu_bursts", "io_bursts")
+    jsonJobs: list[dict] = [
+        {key: value for key, value in dict(pcb).items() if key in keys}
+        for pcb in PCBTrace(input_file)
+    ]
+
+    with open(ofile, "w") as jsonFile:
+        json.dump({"kwargs": {"input": input_file, "ofile": ofile}, "jobs": jsonJobs}, jsonFile, indent=4)
+
+
 if __name__ == "__main__":
     from rich import print
 
@@ -264,6 +366,13 @@ if __name__ == "__main__":
         help("generate_input")
         sys.exit()
 
+    if "--convert" in args:
+        if kwargs["ofile"].endswith(TRACE_EXTENSION):
+            json2trace(kwargs["input"], kwargs["ofile"])
+        else:
+            trace2json(kwargs["input"], kwargs["ofile"])
+        sys.exit()
+
     print("Default values can be changed in the `generate_file` function. \n")
     print("However run this file with `--help` after filename to get a usage ")
     print("example to change values from command line. \n")
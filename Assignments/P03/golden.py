@@ -0,0 +1,344 @@
+"""Checks that the CPU Scheduling Simulation still gives the same results.
+
+CPU Scheduling Golden Outputs
+
+Guards optimizations of the simulation engine. The results of every process
+(exit, turnaround, ready, running, wait and I/O time, and priority, which PB
+ages) are frozen in `golden.jsonl` for `data.json`, `cpu_int.json`,
+`io_int.json` and `prio_high.json`, for every scheduling algorithm, core and
+I/O device count, and time slice for the algorithms that use one. A faster
+engine must reproduce them exactly, quirks included (e.g. a process exits at
+`ticks + 1`).
+
+With --random, randomly generated workloads and configurations are simulated
+instead, and each run is checked against properties every correct engine has
+(e.g. a process runs for exactly the sum of its CPU bursts, no core runs two
+processes at once). If `engine` is given, its results must also match
+`scheduler.simulate` on each of them. A failing run prints its seed, and
+`--random runs=1 seed=<seed>` runs it again.
+
+Engines are functions with the same parameters as `scheduler.simulate`. They
+must fill in the stats of the `PCB`s they are given, and return a
+`StatsAccumulator` for the properties checked with --random.
+
+Command-line Args:
+    engine(str, optional): Engine to check, as "module:function". Defaults to "scheduler:simulate".
+    golden(str, optional): Golden output file. Defaults to "golden.jsonl".
+    runs(int, optional): Number of random runs with --random. Defaults to 200.
+    seed(int, optional): Seed of the first random run with --random. Defaults to 0.
+    --update(optional): Freeze the results of `engine` as the new golden outputs.
+    --random(optional): Check random workloads instead of the golden outputs.
+
+Examples:
+    python3.11 golden.py
+
+    python3.11 golden.py engine=fastsim:simulate --random runs=1000
+
+    python3.11 golden.py --update
+
+"""
+import importlib
+import json
+import random
+import sys
+from itertools import product
+from time import perf_counter
+from typing import Callable
+from pcb import PCB, json2PCBs
+from scheduler import simulate
+from stats import StatsAccumulator
+from timeline import IO, RUNNING, TimelineRecorder
+from main import scheduling_algorithms, time_slice_algorithms
+from generate_input import parse_commandline_args
+from workload import WorkloadGenerator, arrival_distributions, burst_distributions, chunk_jobs
+
+golden_inputs: tuple[str, ...] = ("data.json", "cpu_int.json", "io_int.json", "prio_high.json")
+golden_cores: tuple[int, ...] = (1, 2, 4)
+golden_io_devices: tuple[int, ...] = (1, 3)
+golden_time_slices: tuple[int, ...] = (1, 3, 7)
+
+# `PCB` stats frozen per process, in golden file order
+result_fields: tuple[str, ...] = (
+    "process_id",
+    "priority",
+    "exit_time",
+    "turnaround_time",
+    "ready_time",
+    "running_time",
+    "wait_time",
+    "io_time",
+)
+
+SEED: int = 0
+
+
+def load_engine(name: str) -> Callable[..., StatsAccumulator]:
+    """Imports an engine given as "module:function"."""
+    module_name, _, function_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), function_name or "simulate")
+
+
+def golden_configs() -> list[dict]:
+    """Returns every configuration with golden outputs."""
+    return [
+        {"input": input_file, "sched": sched, "cpu": cpu, "io": io, "timeslice": time_slice}
+        for input_file, sched, cpu, io in product(golden_inputs, scheduling_algorithms, golden_cores, golden_io_devices)
+        for time_slice in (golden_time_slices if sched in time_slice_algorithms else (1,))
+    ]
+
+
+def run(engine: Callable[..., StatsAccumulator], pcbList: list[PCB], config: dict, **kwargs) -> StatsAccumulator:
+    """Simulates `pcbList` headless with `engine` and the algorithm, cores, devices and time slice of `config`."""
+    policy_class = scheduling_algorithms[config["sched"]]
+    policy_kwargs: dict = {"time_slice": config["timeslice"]}
+    if policy_class.randomized:
+        policy_kwargs["seed"] = SEED
+
+    return engine(
+        pcbList=pcbList,
+        policy=policy_class(**policy_kwargs),
+        num_cores=config["cpu"],
+        io_devices=config["io"],
+        sleep_delay=0,
+        visualize=False,
+        **kwargs,
+    )
+
+
+def results(pcbList: list[PCB]) -> list[list[int]]:
+    """Returns the `result_fields` of each process, in process id order."""
+    return [[getattr(pcb, field) for field in result_fields] for pcb in sorted(pcbList, key=lambda pcb: pcb.process_id)]
+
+
+def compare(expected: list[list[int]], actual: list[list[int]]) -> str | None:
+    """Returns the first difference between two `results`, `None` if they are equal."""
+    if len(expected) != len(actual):
+        return f"{len(actual)} processes instead of {len(expected)}"
+
+    for expected_row, actual_row in zip(expected, actual):
+        for field, want, got in zip(result_fields, expected_row, actual_row):
+            if want != got:
+                return f"process {expected_row[0]}: {field} is {got} instead of {want}"
+    return None
+
+
+def update_golden(engine: Callable[..., StatsAccumulator], golden_file: str) -> int:
+    """Freezes the results of `engine` for every golden configuration, one JSON line each.
+
+    Returns:
+        int: number of configurations written.
+    """
+    configs: list[dict] = golden_configs()
+
+    with open(golden_file, "w") as goldenFile:
+        goldenFile.write(json.dumps({"fields": result_fields}) + "\n")
+        for config in configs:
+            pcbList: list[PCB] = json2PCBs(config["input"])
+            run(engine, pcbList, config)
+            goldenFile.write(json.dumps({**config, "results": results(pcbList)}) + "\n")
+
+    return len(configs)
+
+
+def check_golden(engine: Callable[..., StatsAccumulator], golden_file: str) -> list[str]:
+    """Runs every golden configuration with `engine` and compares the results.
+
+    Returns:
+        list[str]: a description of each configuration whose results differ.
+
+    Raises:
+        ValueError: if the golden file was frozen with other `result_fields`.
+    """
+    failures: list[str] = []
+
+    with open(golden_file, "r") as goldenFile:
+        if tuple(json.loads(goldenFile.readline())["fields"]) != result_fields:
+            raise ValueError(f"'{golden_file}' has other fields than {result_fields}, run with --update")
+
+        for line in goldenFile:
+            golden: dict = json.loads(line)
+            config: dict = {key: golden[key] for key in ("input", "sched", "cpu", "io", "timeslice")}
+
+            pcbList: list[PCB] = json2PCBs(config["input"])
+            run(engine, pcbList, config)
+
+            difference: str | None = compare(golden["results"], results(pcbList))
+            if difference is not None:
+                failures.append(f"{' '.join(f'{key}={value}' for key, value in config.items())}: {difference}")
+
+    return failures
+
+
+def random_case(seed: int) -> tuple[list[dict], dict]:
+    """Returns a random workload and configuration.
+
+    Args:
+        seed: seed of the workload and configuration.
+
+    Returns:
+        tuple[list[dict], dict]: jobs, and a configuration as in `golden_configs`.
+    """
+    rng: random.Random = random.Random(seed)
+
+    minCpuBT: int = rng.randint(1, 10)
+    minIOBT: int = rng.randint(1, 10)
+    minat: int = rng.randint(1, 3)
+    generator: WorkloadGenerator = WorkloadGenerator(
+        seed=seed,
+        minCpuBT=minCpuBT,
+        maxCpuBT=minCpuBT + rng.randint(0, 20),
+        minIOBT=minIOBT,
+        maxIOBT=minIOBT + rng.randint(0, 20),
+        minNumBursts=1,
+        maxNumBursts=rng.randint(1, 8),
+        intBurstType=rng.choice(("cpu", "io", "normal")),
+        burstDist=rng.choice(burst_distributions),
+        arrivals=rng.choice(arrival_distributions),
+        minat=minat,
+        maxat=minat + rng.randint(0, 3),
+        prioWeights=rng.choice(("low", "even", "high")),
+    )
+    jobs: list[dict] = list(chunk_jobs(generator.chunk(rng.randint(1, 40))))
+
+    config: dict = {
+        "input": f"random seed={seed}",
+        "sched": rng.choice(list(scheduling_algorithms)),
+        "cpu": rng.randint(1, 4),
+        "io": rng.randint(1, 3),
+        "timeslice": rng.randint(1, 8),
+    }
+    return jobs, config
+
+
+def check_properties(jobs: list[dict], pcbList: list[PCB], stats: StatsAccumulator, timeline: TimelineRecorder, config: dict) -> list[str]:
+    """Checks the results of one simulation against properties every correct engine has.
+
+    Args:
+        jobs: the simulated jobs, before the simulation.
+        pcbList: the simulated `PCB`s, after the simulation.
+        stats: running stats returned by the engine.
+        timeline: state transitions recorded during the simulation.
+        config: configuration of the simulation.
+
+    Returns:
+        list[str]: a description of each property that does not hold.
+    """
+    problems: list[str] = []
+    jobs_by_id: dict[int, dict] = {job["process_id"]: job for job in jobs}
+
+    if sorted(jobs_by_id) != sorted(pcb.process_id for pcb in pcbList):
+        return ["the processes changed"]
+
+    for pcb in pcbList:
+        job: dict = jobs_by_id[pcb.process_id]
+        expected: dict[str, int] = {
+            "running_time": sum(job["cpu_bursts"]),
+            "io_time": sum(job["io_bursts"]),
+            "turnaround_time": pcb.exit_time - job["arrival_time"],
+        }
+        for field, want in expected.items():
+            if getattr(pcb, field) != want:
+                problems.append(f"process {pcb.process_id}: {field} is {getattr(pcb, field)} instead of {want}")
+        if pcb.exit_time <= job["arrival_time"]:
+            problems.append(f"process {pcb.process_id}: exits at {pcb.exit_time}, before it arrives at {job['arrival_time']}")
+        if pcb.wait_time < 0 or pcb.ready_time < 0:
+            problems.append(f"process {pcb.process_id}: negative wait or ready time")
+
+    if stats.terminated != len(pcbList):
+        problems.append(f"{stats.terminated} of {len(pcbList)} processes terminated")
+    if stats.busy_core_ticks != sum(pcb.running_time for pcb in pcbList):
+        problems.append(f"{stats.busy_core_ticks} busy core ticks for {sum(pcb.running_time for pcb in pcbList)} ticks of running")
+
+    # Every core and device runs one process at a time, and running intervals add up
+    running: dict[int, int] = {}
+    occupied: set[tuple[int, int, int]] = set()
+    for process_id, state, start, end, slot in timeline.intervals():
+        if state == "running":
+            running[process_id] = running.get(process_id, 0) + end - start
+        if state in ("running", "io"):
+            limit: int = config["cpu"] if state == "running" else config["io"]
+            if not 0 <= slot < limit:
+                problems.append(f"process {process_id}: {state} on slot {slot} of {limit}")
+            for tick in range(start, end):
+                key: tuple[int, int, int] = (RUNNING if state == "running" else IO, slot, tick)
+                if key in occupied:
+                    problems.append(f"process {process_id}: {state} slot {slot} is shared at tick {tick}")
+                occupied.add(key)
+
+    for pcb in pcbList:
+        if running.get(pcb.process_id, 0) != pcb.running_time:
+            problems.append(f"process {pcb.process_id}: timeline runs it {running.get(pcb.process_id, 0)} ticks of {pcb.running_time}")
+
+    return problems
+
+
+def check_random(engine: Callable[..., StatsAccumulator], runs: int, seed: int) -> list[str]:
+    """Checks `runs` random cases, seeded `seed`, `seed + 1`, ..., against the properties
+    of `check_properties` and, if `engine` is not `scheduler.simulate`, against `scheduler.simulate`.
+
+    Returns:
+        list[str]: a description of each failing case, with its seed.
+    """
+    failures: list[str] = []
+
+    for case_seed in range(seed, seed + runs):
+        jobs, config = random_case(case_seed)
+
+        pcbList: list[PCB] = [PCB(**{**job, "cpu_bursts": list(job["cpu_bursts"]), "io_bursts": list(job["io_bursts"])}) for job in jobs]
+        timeline: TimelineRecorder = TimelineRecorder(config["cpu"], config["io"])
+        stats: StatsAccumulator = run(engine, pcbList, config, timeline=timeline)
+        problems: list[str] = check_properties(jobs, pcbList, stats, timeline, config)
+
+        if engine is not simulate:
+            reference: list[PCB] = [PCB(**{**job, "cpu_bursts": list(job["cpu_bursts"]), "io_bursts": list(job["io_bursts"])}) for job in jobs]
+            run(simulate, reference, config)
+            difference: str | None = compare(results(reference), results(pcbList))
+            if difference is not None:
+                problems.append(f"differs from scheduler.simulate, {difference}")
+
+        if problems:
+            settings: str = " ".join(f"{key}={value}" for key, value in config.items() if key != "input")
+            failures.append(f"seed={case_seed} {settings} ({len(jobs)} jobs): {'; '.join(problems[:3])}")
+
+    return failures
+
+
+if __name__ == "__main__":
+    argv: list[str] = sys.argv[1:]
+    args, kwargs = parse_commandline_args(argv)
+
+    # If --help flag is present, print module level doc-string,
+    # then exit program.
+    if "--help" in args:
+        help("golden")
+        sys.exit()
+
+    golden_file: str = kwargs.get("golden", "golden.jsonl")
+    start: float = perf_counter()
+
+    try:
+        engine: Callable[..., StatsAccumulator] = load_engine(kwargs.get("engine", "scheduler:simulate"))
+
+        if "--update" in args:
+            written: int = update_golden(engine, golden_file)
+            print(f"Froze {written} configurations in {golden_file}")
+            sys.exit()
+
+        if "--random" in args:
+            runs: int = int(kwargs.get("runs", 200))
+            failures: list[str] = check_random(engine, runs, int(kwargs.get("seed", 0)))
+            checked: str = f"{runs} random runs"
+        else:
+            failures = check_golden(engine, golden_file)
+            checked = f"the golden outputs in {golden_file}"
+    except (ImportError, AttributeError, OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    for failure in failures:
+        print(failure)
+
+    if failures:
+        print(f"{len(failures)} failure(s) checking {checked}")
+        sys.exit(1)
+    print(f"Checked {checked} in {perf_counter() - start:.2f}s, all match")
@@ -12,10 +12,18 @@ will be replaced with the default values.
 Command-line Args:
     cpu(int, optional): Number of cores. Defaults to `1`.
     io(int, optional): Number of IO devices. Defaults to `1`.
-    sched(str, optional): Scheduling algorithm to perform. Defaults to `"FCFS"` Choices are `"FCFS"`, `"RR"`, and `"PB"`.
-    timeslice(int, optional): Quantum used in Round Robin. Defaults to `1`.
+    sched(str, optional): Scheduling algorithm to perform. Defaults to `"FCFS"` Choices are `"FCFS"`, `"RR"`, `"PB"`,
+        `"SJF"`, `"SRTF"`, `"MLFQ"`, `"LOTTERY"`, and `"STRIDE"`.
+    timeslice(int, optional): Quantum used in Round Robin, Lottery and Stride, and by the top level of MLFQ. Defaults to `1`.
     delay(float, optional): Amount of `delay` in seconds between each prominent change / each tick. Defaults to `1`.
+    fps(float, optional): Most frames drawn per second. Changes in between are drawn together. Defaults to `10`.
     input(str, optional): Input data file to be used in the simulation. Defaults to `"data.json"`.
+        Files ending in ".pcbt" are read as binary traces (see `pcb`).
+    timeline(str, optional): File to save a log of every process state transition to. Written as csv if it
+        ends in ".csv", in the binary format of `timeline` otherwise. Defaults to no log.
+    --stream(optional): Streams the input file instead of loading it, and runs headless. Results of each
+        process are written to the CSV file as it terminates, and the JSON file only has the overall stats.
+        Use for huge input files (JSON or JSON-lines sorted by arrival time).
 
 Examples:
     python3.11 main.py
@@ -26,29 +34,115 @@ Examples:
 
     python3.11 main.py cpu=2 io=4 sched=PB delay=0.1 input=data.json
 
+    python3.11 main.py cpu=4 io=4 sched=RR delay=0 fps=5 input=huge.json
+
     python3.11 main.py cpu=4 io=4 sched=RR timeslice=10 input=data.json
 
+    python3.11 main.py cpu=8 io=8 sched=SRTF input=huge.json --stream
+
+    python3.11 main.py cpu=2 io=2 sched=RR delay=0 timeline=timeline.csv
+
 """
+import os
 import sys
 import json
 import csv
 from rich import print
-from cpu import cpu_utilization
-from pcb import PCB, json2PCBs
-from FCFS import first_come_first_serve
-from RR import round_robin
-from PB import priority_based
+from cpu import cpu_utilization_from_wait
+from pcb import PCB, json2PCBs, stream_PCBs, trace2PCBs, TRACE_EXTENSION
+from scheduler import SchedulingPolicy, simulate
+from stats import StatsAccumulator
+from timeline import TimelineRecorder
+from FCFS import FirstComeFirstServePolicy
+from RR import RoundRobinPolicy
+from PB import PriorityBasedPolicy
+from SJF import ShortestJobFirstPolicy
+from SRTF import ShortestRemainingTimeFirstPolicy
+from MLFQ import MultiLevelFeedbackQueuePolicy
+from LOTTERY import LotteryPolicy
+from STRIDE import StridePolicy
 from generate_input import parse_commandline_args, generate_file
 from time import sleep
-from tickcounter import TickCounter
-from statistics import mean
-
-scheduling_algorithms: set[str] = {
-    "FCFS",
-    "RR",
-    "PB",
+from tickcounter import Clock
+from typing import Iterable
+
+# Registry of scheduling policies, keyed by the value of the "sched" kwarg
+scheduling_algorithms: dict[str, type[SchedulingPolicy]] = {
+    policy.name: policy
+    for policy in (
+        FirstComeFirstServePolicy,
+        RoundRobinPolicy,
+        PriorityBasedPolicy,
+        ShortestJobFirstPolicy,
+        ShortestRemainingTimeFirstPolicy,
+        MultiLevelFeedbackQueuePolicy,
+        LotteryPolicy,
+        StridePolicy,
+    )
 }
 
+# Algorithms that use a time slice, the others ignore the "timeslice" kwarg
+time_slice_algorithms: tuple[str, ...] = ("RR", "MLFQ", "LOTTERY", "STRIDE")
+
+
+def overall_stats(stats: StatsAccumulator, current_ticks: int) -> dict:
+    """Returns the overall stats of a finished simulation.
+
+    Args:
+        stats: running stats of the simulation, as returned by `simulate`.
+        current_ticks: total ticks of the simulation.
+
+    Returns:
+        dict: total time, CPU utilization, averages of the `PCB` stats, the min, max,
+            standard deviation and percentiles of turnaround and wait time, and the
+            measured core usage, throughput and time-weighted queue lengths.
+    """
+    return {
+        "total_time": current_ticks,
+        "cpu_utilization": cpu_utilization_from_wait(stats.average("wait_time"), stats.count, current_ticks),
+        "average_arrival_time": stats.average("arrival_time"),
+        "average_priority": stats.average("priority"),
+        "average_ready_time": stats.average("ready_time"),
+        "average_running_time": stats.average("running_time"),
+        "average_waiting_time": stats.average("wait_time"),
+        "average_io_time": stats.average("io_time"),
+        "average_turnaround_time": stats.average("turnaround_time"),
+        **stats.distributions["turnaround_time"].summary("turnaround_time"),
+        **stats.distributions["wait_time"].summary("waiting_time"),
+        "measured_cpu_utilization": stats.core_utilization(),
+        "busy_core_ticks": stats.busy_core_ticks,
+        "idle_core_ticks": stats.idle_core_ticks(),
+        "throughput": stats.throughput(),
+        "peak_throughput": stats.peak_throughput(),
+        "average_ready_queue_length": stats.average_queue_length("ready"),
+        "average_waiting_queue_length": stats.average_queue_length("waiting"),
+        "average_io_queue_length": stats.average_queue_length("io"),
+    }
+
+
+def device_stats(stats: StatsAccumulator) -> dict:
+    """Returns the measured usage of each I/O device and the throughput over time.
+
+    Args:
+        stats: running stats of the simulation, as returned by `simulate`.
+
+    Returns:
+        dict: busy ticks and utilization of each I/O device, and the processes
+            terminated in each throughput window.
+    """
+    return {
+        "io_devices": [
+            {
+                "device": device,
+                "busy_ticks": busy_ticks,
+                "utilization": busy_ticks / stats.ticks if stats.ticks else 0.0,
+            }
+            for device, busy_ticks in enumerate(stats.io_device_busy_ticks())
+        ],
+        "throughput_window": stats.window,
+        "window_completions": stats.window_completions,
+    }
+
 
 def results2json(
     pcbList: list[PCB],
@@ -58,6 +152,7 @@ def results2json(
     num_cores: int,
     num_io_devices: int,
     current_ticks:int,
+    stats: StatsAccumulator | None = None,
 ) -> None:
     """Writes stats of PCBs and final stats to JSON File.
 
@@ -69,7 +164,11 @@ def results2json(
         scheduling_algorithm: name of the scheduling algorithm.
         num_cores: number of cores the CPU has.
         num_io_devices: number of I/O devices.
+        stats (optional): running stats returned by `simulate`. Computed from `pcbList` if `None`.
     """
+    if stats is None:
+        stats = StatsAccumulator.from_PCBs(pcbList)
+
     jsonData: dict = {
         "kwargs": {
             "input": file_name,
@@ -78,21 +177,13 @@ def results2json(
             "io": num_io_devices,
             "timeslice": time_slice
         },
-        "overall_stats": {
-            "total_time": current_ticks,
-            "cpu_utilization": cpu_utilization(pcbList, current_ticks),
-            "average_arrival_time": mean([pcb.arrival_time for pcb in pcbList]),
-            "average_priority": mean(pcb.priority for pcb in pcbList),
-            "average_ready_time":  mean(pcb.ready_time for pcb in pcbList),
-            "average_running_time":  mean(pcb.running_time for pcb in pcbList),
-            "average_waiting_time":  mean(pcb.wait_time for pcb in pcbList),
-            "average_io_time":  mean(pcb.io_time for pcb in pcbList),
-        },
+        "overall_stats": overall_stats(stats, current_ticks),
+        "device_stats": device_stats(stats),
         "jobs": []
     }
 
     
-    output_file_name: str = f"{scheduling_algorithm}_timeslice={time_slice}_cpu={num_cores}_io={num_io_devices}_{file_name}"
+    output_file_name: str = f"{scheduling_algorithm}_timeslice={time_slice}_cpu={num_cores}_io={num_io_devices}_{os.path.splitext(file_name)[0]}.json"
     jsonData["kwargs"]["timeslice"] = time_slice
 
     for pcb in pcbList:
@@ -104,6 +195,19 @@ def results2json(
     with open(output_file_name, "w") as jsonFile:
         json.dump(jsonData, jsonFile, indent=4)
 
+def csv_field_names() -> list[str]:
+    """Returns the `PCB` attribute names written to csv files.
+
+    Returns:
+        list[str]: `PCB` attribute names, without the bursts.
+    """
+    # Create list of field names
+    field_names: list[str] = list(dict(PCB()).keys())
+    field_names.remove("cpu_bursts")
+    field_names.remove("io_bursts")
+    return field_names
+
+
 def results2csv(
     pcbList: list[PCB],
     file_name: str,
@@ -125,22 +229,91 @@ def results2csv(
 
     """
     # Generate output file name
-    output_file_name: str = f"{scheduling_algorithm}_timeslice={time_slice}_cpu={num_cores}_io={num_io_devices}_{file_name.removesuffix('.json')}.csv"
+    output_file_name: str = f"{scheduling_algorithm}_timeslice={time_slice}_cpu={num_cores}_io={num_io_devices}_{os.path.splitext(file_name)[0]}.csv"
 
     with open(output_file_name, "w") as csvFile:
-        # Create list of field names
-        field_names: list[str] = list(dict(PCB()).keys())
-        field_names.remove("cpu_bursts")
-        field_names.remove("io_bursts")
-
         # Write PCB info to csv file
         writer: csv.DictWriter = csv.DictWriter(
-            csvFile, field_names, extrasaction="ignore"
+            csvFile, csv_field_names(), extrasaction="ignore"
         )
         writer.writeheader()
         writer.writerows([dict(pcb) for pcb in pcbList])
 
 
+def simulate_streamed(
+    pcbStream: Iterable[PCB],
+    file_name: str,
+    scheduling_algorithm: str,
+    time_slice: int,
+    num_cores: int,
+    num_io_devices: int,
+    timeline: TimelineRecorder | None = None,
+) -> None:
+    """Runs a headless simulation on streamed PCBs and writes the results as it goes.
+
+    Each process is written to the csv file as soon as it terminates, and the overall stats
+    come from the running stats of the simulation, so memory does not grow with the number of jobs.
+    The JSON file has the same format as `results2json`, without the "jobs".
+
+    The csv file is removed if the simulation fails, e.g. on input not sorted by arrival time.
+
+    Args:
+        pcbStream: iterable of `PCB`s sorted by arrival time.
+        file_name: name of input file.
+        scheduling_algorithm: name of the scheduling algorithm.
+        time_slice: quantum used by time-sliced algorithms.
+        num_cores: number of cores the CPU has.
+        num_io_devices: number of I/O devices.
+        timeline (optional): `TimelineRecorder` recording every state transition. Defaults to `None`.
+
+    Raises:
+        ValueError: if `pcbStream` is not sorted by arrival time.
+    """
+    output_file_name: str = f"{scheduling_algorithm}_timeslice={time_slice}_cpu={num_cores}_io={num_io_devices}_{os.path.splitext(file_name)[0]}"
+
+    with open(f"{output_file_name}.csv", "w") as csvFile:
+        writer: csv.DictWriter = csv.DictWriter(
+            csvFile, csv_field_names(), extrasaction="ignore"
+        )
+        writer.writeheader()
+
+        def on_terminate(pcb: PCB) -> None:
+            writer.writerow(dict(pcb))
+
+        clock: Clock = Clock()
+        try:
+            stats: StatsAccumulator = simulate(
+                pcbList=pcbStream,
+                policy=scheduling_algorithms[scheduling_algorithm](time_slice=time_slice),
+                num_cores=num_cores,
+                io_devices=num_io_devices,
+                sleep_delay=0,
+                visualize=False,
+                on_terminate=on_terminate,
+                timeline=timeline,
+                clock=clock,
+            )
+        except ValueError:
+            csvFile.close()
+            os.remove(f"{output_file_name}.csv")
+            raise
+
+    jsonData: dict = {
+        "kwargs": {
+            "input": file_name,
+            "sched": scheduling_algorithm,
+            "cpu": num_cores,
+            "io": num_io_devices,
+            "timeslice": time_slice
+        },
+        "overall_stats": overall_stats(stats, clock.get_ticks()),
+        "device_stats": device_stats(stats),
+    }
+
+    with open(f"{output_file_name}.json", "w") as jsonFile:
+        json.dump(jsonData, jsonFile, indent=4)
+
+
 if __name__ == "__main__":
     argv: list[str] = sys.argv[1:]
     args, kwargs = parse_commandline_args(argv)
@@ -151,6 +324,8 @@ if __name__ == "__main__":
     infile: str = "data.json"
     pcbList: list[PCB] = []
     sleep_delay: float = 1
+    max_fps: float = 10
+    streaming: bool = "--stream" in args
 
     # If --help flag is present, print module level doc-string,
     # then exit program.
@@ -184,7 +359,7 @@ if __name__ == "__main__":
         except ValueError as e:
             print(
                 f"Error: invalid argument '{kwargs['cpu']}'"
-                f" for 'sched'. Must be a value in {scheduling_algorithms}."
+                f" for 'sched'. Must be a value in {set(scheduling_algorithms)}."
             )
             sleep(1)
 
@@ -220,26 +395,36 @@ if __name__ == "__main__":
             )
             sleep(1)
 
+    def load_PCBs(file_path: str) -> list[PCB] | Iterable[PCB]:
+        # Streamed files are only opened when the simulation starts, so check they exist now
+        if streaming:
+            if not os.path.isfile(file_path):
+                raise FileNotFoundError(file_path)
+            return stream_PCBs(file_path)
+        if file_path.endswith(TRACE_EXTENSION):
+            return trace2PCBs(file_path)
+        return json2PCBs(file_path)
+
     # Change input file if "input" kwarg is present
     if "input" in kwargs.keys():
         try:
-            pcbList = json2PCBs(kwargs["input"])
+            pcbList = load_PCBs(kwargs["input"])
             infile = kwargs["input"]
-        except (FileNotFoundError, json.decoder.JSONDecodeError) as e:
+        except (FileNotFoundError, ValueError) as e:
             print(
                 f"Error: invalid argument '{kwargs['input']}'"
                 f" for 'input'. File does not exist, or is wrongly formatted."
             )
             sleep(1)
-            pcbList = json2PCBs(infile)
+            pcbList = load_PCBs(infile)
     # If kwarg is not present, attempt to use default file.
     # If file does not exist or wrongly formatted, generate it again.
     else:
         try:
-            pcbList = json2PCBs(infile)
-        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            pcbList = load_PCBs(infile)
+        except (FileNotFoundError, ValueError):
             generate_file(ofile=infile)
-            pcbList = json2PCBs(infile)
+            pcbList = load_PCBs(infile)
 
     # Change delay if "delay" kwarg is present
     if "delay" in kwargs.keys():
@@ -257,30 +442,53 @@ if __name__ == "__main__":
             )
             sleep(1)
 
+    # Change frame rate if "fps" kwarg is present
+    if "fps" in kwargs.keys():
+        try:
+            temp: float = float(kwargs["fps"])
+
+            if temp <= 0:
+                raise ValueError()
+
+            max_fps = temp
+        except ValueError as e:
+            print(
+                f"Error: invalid argument '{kwargs['fps']}'"
+                " for 'fps'. Must be positive, nonzero floating-point value."
+            )
+            sleep(1)
+
+    # Record state transitions if "timeline" kwarg is present
+    timeline: TimelineRecorder | None = None
+    if "timeline" in kwargs.keys():
+        timeline = TimelineRecorder(num_cores, num_io_devices)
+
+    # Stream the input, and write results as processes terminate
+    if streaming:
+        try:
+            simulate_streamed(pcbList, infile, sched_alg, time_slice, num_cores, num_io_devices, timeline)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if timeline is not None:
+            timeline.save(kwargs["timeline"])
+        sys.exit()
+
     # Then we perform the algorithm here
-    if sched_alg == "FCFS":
-        first_come_first_serve(
-            pcbList=pcbList,
-            num_cores=num_cores,
-            io_devices=num_io_devices,
-            sleep_delay=sleep_delay,
-        )
-    elif sched_alg == "RR":
-        round_robin(
-            pcbList=pcbList,
-            num_cores=num_cores,
-            io_devices=num_io_devices,
-            time_slice=time_slice,
-            sleep_delay=sleep_delay,
-        )
-    else:
-        priority_based(
-            pcbList=pcbList,
-            num_cores=num_cores,
-            io_devices=num_io_devices,
-            sleep_delay=sleep_delay,
-        )
+    clock: Clock = Clock()
+    stats: StatsAccumulator = simulate(
+        pcbList=pcbList,
+        policy=scheduling_algorithms[sched_alg](time_slice=time_slice),
+        num_cores=num_cores,
+        io_devices=num_io_devices,
+        sleep_delay=sleep_delay,
+        max_fps=max_fps,
+        timeline=timeline,
+        clock=clock,
+    )
 
     # Write results to output file
     results2csv(pcbList, infile, sched_alg, time_slice, num_cores, num_io_devices)
-    results2json(pcbList, infile, sched_alg, time_slice, num_cores, num_io_devices, TickCounter.get_ticks())
+    results2json(pcbList, infile, sched_alg, time_slice, num_cores, num_io_devices, clock.get_ticks(), stats)
+    if timeline is not None:
+        timeline.save(kwargs["timeline"])
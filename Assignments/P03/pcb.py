@@ -2,14 +2,37 @@
 
 `PCB` represents a "Process Control Block", a data structure in Operating Systems.
 It will be used for "process scheduling". `json2PCBS` is a function that reads data from
-a json file, and returns `list[PCB]`.
+a json file, and returns `list[PCB]`. `stream_PCBs` reads the same files (or JSON-lines
+files) incrementally, yielding one `PCB` at a time. `PCBTrace` memory-maps the compact
+binary trace format written by `generate_input.write_trace`, and `trace2PCBs` reads it
+into a `list[PCB]`.
+
+Binary trace format (".pcbt", little-endian, every section 8-byte aligned):
+
+    header        magic b"PCBTRACE", version (u32), padding (u32),
+                  number of jobs n (u64), total cpu bursts (u64), total io bursts (u64)
+    arrival_time  n x i64
+    process_id    n x i64
+    priority      n x i64
+    cpu_offsets   (n + 1) x i64, job i's cpu bursts are cpu_bursts[cpu_offsets[i]:cpu_offsets[i + 1]]
+    io_offsets    (n + 1) x i64, same for io bursts
+    cpu_bursts    total cpu bursts x i32
+    io_bursts     total io bursts x i32
 
 Typical usage example:
 
   pcb:PCB = PCB()
   pcbList:list[PCB] = json2PCB("example.json")
+  pcbStream:Iterator[PCB] = stream_PCBs("example.json")
+  trace:PCBTrace = PCBTrace("example.pcbt")
 """
 import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from typing import Iterator
 
 
 class PCB:
@@ -220,5 +243,218 @@ def json2PCBs(file_path: str) -> list[PCB]:
     return pcbList
 
 
+# Matches the start of the "jobs" array in files written by `generate_file`
+_JOBS_START = re.compile(r'"jobs"\s*:\s*\[')
+# Matches the separators between jobs
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def stream_PCBs(file_path: str, chunk_size: int = 1 << 16) -> Iterator[PCB]:
+    """Reads a job file incrementally, yielding one `PCB` at a time.
+
+    Reads `chunk_size` characters at a time and decodes the jobs one by one,
+    so memory use does not depend on the size of the file. Binary traces
+    (".pcbt") are memory-mapped with `PCBTrace`. Files ending in
+    ".jsonl" are read as JSON-lines, with one job object per line (lines
+    without a "process_id", e.g. a "kwargs" header, are skipped). Other files
+    are expected in the format written by `generate_file`.
+
+    `PCB`s are yielded in file order, which is sorted by arrival time for files
+    written by `generate_file`, as `simulate` expects.
+
+    Args:
+        file_path: `str` containing the JSON or JSON-lines file path.
+        chunk_size (optional): number of characters read at a time.
+
+    Yields:
+        PCB: the next `PCB` in the file.
+
+    Raises:
+        json.decoder.JSONDecodeError: if the file is wrongly formatted.
+
+    """
+    if file_path.endswith(TRACE_EXTENSION):
+        yield from PCBTrace(file_path)
+        return
+
+    with open(file_path, "r") as jsonFile:
+        if file_path.endswith(".jsonl"):
+            for line in jsonFile:
+                if line.strip():
+                    data: dict = json.loads(line)
+                    if "process_id" in data:
+                        yield PCB(**data)
+            return
+
+        decoder: json.JSONDecoder = json.JSONDecoder()
+        buffer: str = ""
+
+        # Skip everything before the "jobs" array
+        while True:
+            match = _JOBS_START.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            chunk: str = jsonFile.read(chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+
+        position: int = 0
+
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+
+            # Need more data to decode the next job
+            if position == len(buffer):
+                chunk: str = jsonFile.read(chunk_size)
+                if not chunk:
+                    raise json.decoder.JSONDecodeError("Unterminated jobs array", buffer, position)
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            if buffer[position] == "]":
+                return
+
+            try:
+                data, position = decoder.raw_decode(buffer, position)
+            except json.decoder.JSONDecodeError:
+                # Job is cut off at the end of the buffer, read more
+                chunk: str = jsonFile.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield PCB(**data)
+
+
+TRACE_EXTENSION: str = ".pcbt"
+TRACE_MAGIC: bytes = b"PCBTRACE"
+TRACE_VERSION: int = 1
+# magic, version, padding, number of jobs, total cpu bursts, total io bursts
+TRACE_HEADER = struct.Struct("<8sIIQQQ")
+
+
+def trace_layout(num_jobs: int, num_cpu_bursts: int, num_io_bursts: int) -> list[tuple[str, str, int]]:
+    """Returns the sections of a binary trace after the header.
+
+    Args:
+        num_jobs: number of jobs in the trace.
+        num_cpu_bursts: total number of cpu bursts.
+        num_io_bursts: total number of io bursts.
+
+    Returns:
+        list[tuple[str, str, int]]: (name, `array` typecode, length) of each section, in file order.
+
+    """
+    return [
+        ("arrival_time", "q", num_jobs),
+        ("process_id", "q", num_jobs),
+        ("priority", "q", num_jobs),
+        ("cpu_offsets", "q", num_jobs + 1),
+        ("io_offsets", "q", num_jobs + 1),
+        ("cpu_bursts", "i", num_cpu_bursts),
+        ("io_bursts", "i", num_io_bursts),
+    ]
+
+
+class PCBTrace:
+    """A read-only, memory-mapped view of a binary job trace.
+
+    Opening a trace only reads the header, so it takes the same time for any
+    number of jobs. Columns are `memoryview`s into the mapped file (copied only
+    on big-endian machines). `PCB`s are built on access, each with its own
+    burst lists, since the simulation consumes them.
+
+    Attributes:
+        arrival_time (memoryview): arrival time of each job
+        process_id   (memoryview): id of each job
+        priority     (memoryview): priority of each job
+        cpu_offsets  (memoryview): start of each job's cpu bursts, plus the end of the last
+        io_offsets   (memoryview): start of each job's io bursts, plus the end of the last
+        cpu_bursts   (memoryview): every job's cpu bursts, back to back
+        io_bursts    (memoryview): every job's io bursts, back to back
+
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """__init__ method for `PCBTrace`
+
+        Constructs a new `PCBTrace` object by memory-mapping `file_path`.
+
+        Args:
+            file_path: `str` containing the binary trace file path.
+
+        Raises:
+            ValueError: if the file is not a binary trace, or is truncated.
+
+        """
+        with open(file_path, "rb") as traceFile:
+            self.__map: mmap.mmap = mmap.mmap(traceFile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__map) < TRACE_HEADER.size:
+            raise ValueError(f"'{file_path}' is not a binary trace")
+
+        magic, version, _, num_jobs, num_cpu_bursts, num_io_bursts = TRACE_HEADER.unpack_from(self.__map)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError(f"'{file_path}' is not a version {TRACE_VERSION} binary trace")
+
+        view: memoryview = memoryview(self.__map)
+        offset: int = TRACE_HEADER.size
+
+        for name, typecode, length in trace_layout(num_jobs, num_cpu_bursts, num_io_bursts):
+            size: int = length * array(typecode).itemsize
+            if offset + size > len(self.__map):
+                raise ValueError(f"'{file_path}' is truncated")
+
+            column: memoryview = view[offset:offset + size].cast(typecode)
+            if sys.byteorder == "big":
+                swapped: array = array(typecode, column)
+                swapped.byteswap()
+                column = memoryview(swapped)
+
+            setattr(self, name, column)
+            offset += size + (-size % 8)
+
+        self.__length: int = num_jobs
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __getitem__(self, index: int) -> PCB:
+        """Returns the job at `index` as a new `PCB`."""
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("PCBTrace index out of range")
+
+        return PCB(
+            arrival_time=self.arrival_time[index],
+            process_id=self.process_id[index],
+            priority=self.priority[index],
+            cpu_bursts=self.cpu_bursts[self.cpu_offsets[index]:self.cpu_offsets[index + 1]].tolist(),
+            io_bursts=self.io_bursts[self.io_offsets[index]:self.io_offsets[index + 1]].tolist(),
+        )
+
+    def __iter__(self) -> Iterator[PCB]:
+        return (self[index] for index in range(self.__length))
+
+
+def trace2PCBs(file_path: str) -> list[PCB]:
+    """Reads a binary trace file and returns `list[PCB]`
+
+    Args:
+        file_path: `str` containing the binary trace file path.
+
+    Returns:
+        list[PCB]: `list` of `PCB`s within the trace.
+
+    """
+    return list(PCBTrace(file_path))
+
+
 if __name__ == "__main__":
     help("pcb")
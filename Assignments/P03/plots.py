@@ -0,0 +1,350 @@
+"""Plots the results and timelines of CPU Scheduling Simulations.
+
+Renders, without a display, to any format matplotlib can save (picked by the
+extension of the output file, e.g. ".png" or ".svg"):
+
+    gantt chart         : which process ran on each core (and I/O device) and when, from a timeline
+    queue depths        : number of processes ready, running, waiting and in I/O over time, from a timeline
+    turnaround CDF      : distribution of turnaround times, from results files (JSON or csv written by `main`)
+
+Timelines are read column by column with NumPy, and everything drawn is
+decimated to at most about `max_points` points (bars) per line (row), so a
+plot of a run with millions of events stays fast, small and readable. Bars
+of a decimated gantt chart are busy periods, not single processes.
+
+Usage: (All params except one of timeline and results are optional):
+
+        timeline        : Timeline file saved by `main.py` with timeline=, csv or binary.
+        results         : Comma separated results files (JSON or csv) written by `main.py`.
+        prefix          : Prefix of output files. Defaults to "plot".
+        format          : Output format, e.g. "png" or "svg". Defaults to "png".
+        max_points      : Most points drawn per line. Defaults to 2000.
+        --no-io         : Leave I/O devices out of the gantt chart.
+
+Example Commands:
+
+        plots.py timeline=timeline.bin prefix=rr
+
+        plots.py results=FCFS_timeslice=1_cpu=2_io=2_data.json,RR_timeslice=5_cpu=2_io=2_data.json format=svg
+"""
+import csv
+import json
+import os
+import sys
+from array import array
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from generate_input import parse_commandline_args
+from timeline import IO, READY, RUNNING, WAITING, TimelineRecorder, state_names
+
+MAX_POINTS: int = 2000
+
+# States counted in the queue depth plot
+queue_states: tuple[int, ...] = (READY, RUNNING, WAITING, IO)
+
+
+def timeline_arrays(timeline: TimelineRecorder) -> dict[str, np.ndarray]:
+    """Views the columns of `timeline` as NumPy arrays, without copying them.
+
+    Args:
+        timeline: recorded or loaded `TimelineRecorder`.
+
+    Returns:
+        dict[str, np.ndarray]: "tick", "process_id", "from_state", "to_state" and "slot" columns.
+    """
+    return {
+        name: np.frombuffer(getattr(timeline, name), dtype=getattr(timeline, name).typecode)
+        for name in ("tick", "process_id", "from_state", "to_state", "slot")
+    }
+
+
+def state_intervals(timeline: TimelineRecorder) -> dict[str, np.ndarray]:
+    """Computes the time each process spent in each state, like `TimelineRecorder.intervals`.
+
+    Args:
+        timeline: recorded or loaded `TimelineRecorder`.
+
+    Returns:
+        dict[str, np.ndarray]: "process_id", "state", "start", "end" and "slot" of every interval.
+    """
+    columns: dict[str, np.ndarray] = timeline_arrays(timeline)
+
+    # Events of each process, in the order they were recorded
+    order: np.ndarray = np.lexsort((np.arange(len(timeline)), columns["process_id"]))
+    process_id: np.ndarray = columns["process_id"][order]
+    tick: np.ndarray = columns["tick"][order]
+
+    # An interval runs from an event to the next event of the same process
+    start: np.ndarray = tick[:-1]
+    end: np.ndarray = tick[1:]
+    keep: np.ndarray = (process_id[:-1] == process_id[1:]) & (end > start)
+    head: np.ndarray = order[:-1][keep]
+
+    return {
+        "process_id": process_id[:-1][keep],
+        "state": columns["to_state"][head],
+        "start": start[keep],
+        "end": end[keep],
+        "slot": columns["slot"][head],
+    }
+
+
+def merge_bars(start: np.ndarray, end: np.ndarray, gap: float) -> tuple[np.ndarray, np.ndarray]:
+    """Merges bars of one row that overlap or are at most `gap` apart.
+
+    Args:
+        start: start of each bar.
+        end: end of each bar.
+        gap: widest gap merged over.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: start and end of the merged bars.
+    """
+    if len(start) == 0:
+        return start, end
+
+    order: np.ndarray = np.argsort(start, kind="stable")
+    start, end = start[order], end[order]
+
+    # A new bar begins where a start is past every previous end by more than `gap`
+    reach: np.ndarray = np.maximum.accumulate(end)
+    first: np.ndarray = np.flatnonzero(np.concatenate(([True], start[1:] > reach[:-1] + gap)))
+
+    return start[first], np.maximum.reduceat(end, first)
+
+
+def decimate(x: np.ndarray, y: np.ndarray, max_points: int = MAX_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """Reduces a line to about `max_points` points, keeping its peaks and troughs.
+
+    Points are split into `max_points / 2` buckets, and each bucket is drawn as its
+    lowest and highest value.
+
+    Args:
+        x: x values, in increasing order.
+        y: y values.
+        max_points (optional): most points kept. Defaults to `MAX_POINTS`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: x and y values of the decimated line.
+    """
+    if len(x) <= max_points:
+        return x, y
+
+    first: np.ndarray = np.linspace(0, len(x), max(max_points // 2, 1), endpoint=False).astype(np.int64)
+    low: np.ndarray = np.minimum.reduceat(y, first)
+    high: np.ndarray = np.maximum.reduceat(y, first)
+
+    return np.repeat(x[first], 2), np.column_stack((low, high)).ravel()
+
+
+def queue_depths(timeline: TimelineRecorder) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Counts the processes in each state after every tick with an event.
+
+    Args:
+        timeline: recorded or loaded `TimelineRecorder`.
+
+    Returns:
+        tuple[np.ndarray, dict[str, np.ndarray]]: ticks, and the number of processes in each
+            of `queue_states` at those ticks.
+    """
+    columns: dict[str, np.ndarray] = timeline_arrays(timeline)
+    order: np.ndarray = np.argsort(columns["tick"], kind="stable")
+    tick: np.ndarray = columns["tick"][order]
+    from_state: np.ndarray = columns["from_state"][order]
+    to_state: np.ndarray = columns["to_state"][order]
+
+    # Last event of each tick
+    last: np.ndarray = np.flatnonzero(np.concatenate((tick[1:] != tick[:-1], [True])))
+
+    depths: dict[str, np.ndarray] = {}
+    for state in queue_states:
+        change: np.ndarray = (to_state == state).astype(np.int64) - (from_state == state)
+        depths[state_names[state]] = np.cumsum(change)[last]
+
+    return tick[last], depths
+
+
+def load_turnaround_times(file_path: str) -> np.ndarray:
+    """Reads the turnaround time of every process from a results file written by `main`.
+
+    Args:
+        file_path: JSON or csv results file.
+
+    Returns:
+        np.ndarray: turnaround times.
+
+    Raises:
+        ValueError: if the file has no processes.
+    """
+    times: array = array("q")
+
+    if file_path.endswith(".csv"):
+        with open(file_path, newline="") as csvFile:
+            for row in csv.DictReader(csvFile):
+                times.append(int(row["turnaround_time"]))
+    else:
+        with open(file_path) as jsonFile:
+            times.extend(job["turnaround_time"] for job in json.load(jsonFile)["jobs"])
+
+    if not times:
+        raise ValueError(f"'{file_path}' has no processes")
+
+    return np.frombuffer(times, dtype=np.int64)
+
+
+def gantt_chart(
+    ax: Axes, timeline: TimelineRecorder, include_io: bool = True, max_points: int = MAX_POINTS
+) -> None:
+    """Draws which process was on each core (and I/O device) and when.
+
+    Each row is drawn as at most about `max_points` bars: if a row has more, bars
+    closer than a `max_points`th of the run are merged into busy periods.
+
+    Args:
+        ax: `Axes` to draw on.
+        timeline: recorded or loaded `TimelineRecorder`.
+        include_io (optional): whether to draw I/O devices. Defaults to True.
+        max_points (optional): most bars per row. Defaults to `MAX_POINTS`.
+    """
+    intervals: dict[str, np.ndarray] = state_intervals(timeline)
+    rows: list[tuple[int, str]] = [(RUNNING, "Core")] + ([(IO, "IO")] if include_io else [])
+    labels: list[str] = []
+    span: int = int(intervals["end"].max() - intervals["start"].min()) if len(intervals["end"]) else 1
+
+    for state, name in rows:
+        in_state: np.ndarray = intervals["state"] == state
+        for slot in np.unique(intervals["slot"][in_state]):
+            mask: np.ndarray = in_state & (intervals["slot"] == slot)
+            start: np.ndarray = intervals["start"][mask]
+            end: np.ndarray = intervals["end"][mask]
+            y: int = len(labels)
+            labels.append(f"{name} {slot}")
+
+            if len(start) <= max_points:
+                # One bar per process, colored by process id
+                process_id: np.ndarray = intervals["process_id"][mask]
+                facecolors = [f"C{pid % 10}" for pid in process_id.tolist()]
+            else:
+                start, end = merge_bars(start, end, span / max_points)
+                facecolors = "C0" if state == RUNNING else "C1"
+
+            ax.broken_barh(
+                np.column_stack((start, end - start)), (y - 0.4, 0.8), facecolors=facecolors, linewidth=0
+            )
+
+    ax.set_yticks(range(len(labels)), labels)
+    ax.invert_yaxis()
+    ax.set_xlabel("Tick")
+    ax.set_title("Gantt Chart")
+
+
+def queue_depth_chart(ax: Axes, timeline: TimelineRecorder, max_points: int = MAX_POINTS) -> None:
+    """Draws the number of processes ready, running, waiting and in I/O over time.
+
+    Args:
+        ax: `Axes` to draw on.
+        timeline: recorded or loaded `TimelineRecorder`.
+        max_points (optional): most points per line. Defaults to `MAX_POINTS`.
+    """
+    ticks, depths = queue_depths(timeline)
+
+    for name, depth in depths.items():
+        x, y = decimate(ticks, depth, max_points)
+        ax.step(x, y, where="post", label=name.capitalize(), linewidth=1)
+
+    ax.set_xlabel("Tick")
+    ax.set_ylabel("Processes")
+    ax.set_title("Queue Depths")
+    ax.legend()
+
+
+def turnaround_cdf_chart(ax: Axes, results: dict[str, np.ndarray], max_points: int = MAX_POINTS) -> None:
+    """Draws the cumulative distribution of turnaround times of one or more runs.
+
+    Args:
+        ax: `Axes` to draw on.
+        results: turnaround times of each run, by label.
+        max_points (optional): most points per line. Defaults to `MAX_POINTS`.
+    """
+    for label, times in results.items():
+        times = np.sort(times)
+        # Evenly spaced quantiles, always including the largest time
+        keep: np.ndarray = np.unique(np.linspace(0, len(times) - 1, min(len(times), max_points)).astype(np.int64))
+        ax.step(times[keep], (keep + 1) / len(times), where="post", label=label, linewidth=1)
+
+    ax.set_xlabel("Turnaround Time")
+    ax.set_ylabel("Fraction of Processes")
+    ax.set_ylim(0, 1.05)
+    ax.set_title("Turnaround Time CDF")
+    ax.legend(fontsize="small")
+
+
+def save_chart(draw, ofile: str, *args, figsize: tuple[float, float] = (12, 6), **kwargs) -> None:
+    """Draws a chart on a new figure and saves it, without a display.
+
+    Args:
+        draw: chart function, e.g. `gantt_chart`, called with a new `Axes`, `args` and `kwargs`.
+        ofile: output file. Its extension picks the format, e.g. ".png" or ".svg".
+        figsize (optional): size of the figure, in inches. Defaults to (12, 6).
+    """
+    fig: Figure = Figure(figsize=figsize, layout="constrained")
+    draw(fig.add_subplot(), *args, **kwargs)
+    fig.savefig(ofile)
+
+
+def plot_gantt(
+    timeline: TimelineRecorder, ofile: str, include_io: bool = True, max_points: int = MAX_POINTS
+) -> None:
+    """Saves a gantt chart of `timeline` to `ofile`, see `gantt_chart`."""
+    columns: dict[str, np.ndarray] = timeline_arrays(timeline)
+    rows: int = sum(
+        len(np.unique(columns["slot"][columns["to_state"] == state])) for state in (RUNNING, IO)
+    )
+    save_chart(gantt_chart, ofile, timeline, include_io, max_points, figsize=(12, max(3, 0.4 * rows + 1.5)))
+
+
+def plot_queue_depths(timeline: TimelineRecorder, ofile: str, max_points: int = MAX_POINTS) -> None:
+    """Saves a chart of the queue depths of `timeline` to `ofile`, see `queue_depth_chart`."""
+    save_chart(queue_depth_chart, ofile, timeline, max_points)
+
+
+def plot_turnaround_cdf(results_files: list[str], ofile: str, max_points: int = MAX_POINTS) -> None:
+    """Saves the turnaround time CDF of each results file to `ofile`, see `turnaround_cdf_chart`."""
+    results: dict[str, np.ndarray] = {
+        os.path.splitext(os.path.basename(file_path))[0]: load_turnaround_times(file_path)
+        for file_path in results_files
+    }
+    save_chart(turnaround_cdf_chart, ofile, results, max_points)
+
+
+if __name__ == "__main__":
+    argv: list[str] = sys.argv[1:]
+    args, kwargs = parse_commandline_args(argv)
+
+    if "--help" in args or not ("timeline" in kwargs or "results" in kwargs):
+        # Print documentation
+        help("plots")
+        sys.exit()
+
+    prefix: str = kwargs.get("prefix", "plot")
+    extension: str = kwargs.get("format", "png")
+
+    try:
+        max_points: int = int(kwargs.get("max_points", MAX_POINTS))
+        written: list[str] = []
+
+        if "timeline" in kwargs:
+            timeline: TimelineRecorder = TimelineRecorder.load(kwargs["timeline"])
+            plot_gantt(timeline, f"{prefix}_gantt.{extension}", "--no-io" not in args, max_points)
+            plot_queue_depths(timeline, f"{prefix}_queues.{extension}", max_points)
+            written += [f"{prefix}_gantt.{extension}", f"{prefix}_queues.{extension}"]
+
+        if "results" in kwargs:
+            plot_turnaround_cdf(kwargs["results"].split(","), f"{prefix}_turnaround_cdf.{extension}", max_points)
+            written.append(f"{prefix}_turnaround_cdf.{extension}")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Wrote {', '.join(written)}")
@@ -0,0 +1,230 @@
+"""`readyqueue` contains "ready" queue containers for scheduling policies.
+
+The simulation kernel and the visualization only use `append`, `popleft`,
+`len` and iteration on `CPU.ready`, so any of these classes can replace the
+default `deque` in `SchedulingPolicy.on_start`. `popleft` always removes the
+process that should run next under the queue's ordering.
+
+`HeapReadyQueue` orders processes by a key (O(log n) per operation),
+`MultiLevelReadyQueue` keeps one FIFO queue per priority level, and
+`LotteryReadyQueue` draws a process at random weighted by its tickets
+using a Fenwick tree (O(log n) per operation).
+
+Typical usage example:
+
+  cpu.ready = HeapReadyQueue(key=lambda pcb: pcb.cpu_bursts[0])
+"""
+import heapq
+from collections import deque
+from itertools import count
+from random import Random
+from typing import Callable, Iterator
+from pcb import PCB
+
+
+class HeapReadyQueue:
+    """A "ready" queue ordered by a key, smallest key first.
+
+    Processes with equal keys leave in the order they were appended.
+    The key of a process is computed once, when it is appended.
+
+    Attributes:
+        key (Callable[[PCB], int]): function returning the ordering key of a `PCB`
+
+    """
+
+    def __init__(self, key: Callable[[PCB], int]) -> None:
+        """__init__ method for `HeapReadyQueue`
+
+        Constructs a new, empty `HeapReadyQueue` object.
+
+        Args:
+            key: function returning the ordering key of a `PCB`.
+
+        """
+        self.key: Callable[[PCB], int] = key
+        self.__heap: list[tuple[int, int, PCB]] = []
+        self.__counter = count()
+
+    def append(self, pcb: PCB) -> None:
+        """Adds `pcb` to the queue."""
+        heapq.heappush(self.__heap, (self.key(pcb), next(self.__counter), pcb))
+
+    def popleft(self) -> PCB:
+        """Removes and returns the `PCB` with the smallest key."""
+        return heapq.heappop(self.__heap)[2]
+
+    def peek(self) -> PCB:
+        """Returns the `PCB` with the smallest key without removing it."""
+        return self.__heap[0][2]
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def __iter__(self) -> Iterator[PCB]:
+        return (entry[2] for entry in self.__heap)
+
+
+class MultiLevelReadyQueue:
+    """A "ready" queue made of one FIFO queue per priority level.
+
+    Level 0 is the highest priority. `popleft` takes from the highest
+    priority non-empty level.
+
+    Attributes:
+        levels   (list[deque[PCB]]): FIFO queue for each level
+        level_of (Callable[[PCB], int]): function returning the level of a `PCB`
+
+    """
+
+    def __init__(self, num_levels: int, level_of: Callable[[PCB], int]) -> None:
+        """__init__ method for `MultiLevelReadyQueue`
+
+        Constructs a new, empty `MultiLevelReadyQueue` object.
+
+        Args:
+            num_levels: `int` representing the number of levels.
+            level_of: function returning the level of a `PCB`.
+
+        """
+        self.levels: list[deque[PCB]] = [deque() for _ in range(num_levels)]
+        self.level_of: Callable[[PCB], int] = level_of
+        self.__size: int = 0
+
+    def append(self, pcb: PCB) -> None:
+        """Adds `pcb` to the back of its level."""
+        self.levels[self.level_of(pcb)].append(pcb)
+        self.__size += 1
+
+    def popleft(self) -> PCB:
+        """Removes and returns the front `PCB` of the highest priority non-empty level."""
+        for level in self.levels:
+            if level:
+                self.__size -= 1
+                return level.popleft()
+        raise IndexError("pop from an empty MultiLevelReadyQueue")
+
+    def top_level(self) -> int:
+        """Returns the highest priority non-empty level, or `len(self.levels)` if empty."""
+        for index, level in enumerate(self.levels):
+            if level:
+                return index
+        return len(self.levels)
+
+    def boost(self) -> None:
+        """Moves every `PCB` to level 0, keeping their relative order."""
+        top: deque[PCB] = self.levels[0]
+        for level in self.levels[1:]:
+            top.extend(level)
+            level.clear()
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self) -> Iterator[PCB]:
+        for level in self.levels:
+            yield from level
+
+
+class LotteryReadyQueue:
+    """A "ready" queue that draws the next `PCB` at random, weighted by tickets.
+
+    Ticket counts are kept in a Fenwick (binary indexed) tree, so appending
+    and drawing are both O(log n).
+
+    Attributes:
+        tickets (Callable[[PCB], int]): function returning the tickets of a `PCB`
+        rng     (Random): random number generator used for drawing
+
+    """
+
+    def __init__(self, tickets: Callable[[PCB], int], rng: Random) -> None:
+        """__init__ method for `LotteryReadyQueue`
+
+        Constructs a new, empty `LotteryReadyQueue` object.
+
+        Args:
+            tickets: function returning the (positive) tickets of a `PCB`.
+            rng: random number generator used for drawing.
+
+        """
+        self.tickets: Callable[[PCB], int] = tickets
+        self.rng: Random = rng
+        self.__slots: list[PCB | None] = [None] * 16
+        self.__weights: list[int] = [0] * 16
+        self.__tree: list[int] = [0] * 17
+        self.__free: list[int] = list(range(15, -1, -1))
+        self.__size: int = 0
+
+    def __add(self, slot: int, amount: int) -> None:
+        index: int = slot + 1
+        while index < len(self.__tree):
+            self.__tree[index] += amount
+            index += index & -index
+
+    def __grow(self) -> None:
+        capacity: int = len(self.__slots)
+        self.__slots.extend([None] * capacity)
+        self.__weights.extend([0] * capacity)
+        self.__free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+        # Rebuild the tree in O(n)
+        self.__tree = [0] + self.__weights[:]
+        for index in range(1, len(self.__tree)):
+            parent: int = index + (index & -index)
+            if parent < len(self.__tree):
+                self.__tree[parent] += self.__tree[index]
+
+    def append(self, pcb: PCB) -> None:
+        """Adds `pcb` to the queue with its tickets."""
+        if not self.__free:
+            self.__grow()
+
+        slot: int = self.__free.pop()
+        weight: int = max(self.tickets(pcb), 1)
+        self.__slots[slot] = pcb
+        self.__weights[slot] = weight
+        self.__add(slot, weight)
+        self.__size += 1
+
+    def popleft(self) -> PCB:
+        """Removes and returns a `PCB` drawn at random, weighted by tickets."""
+        if not self.__size:
+            raise IndexError("pop from an empty LotteryReadyQueue")
+
+        winner: int = self.rng.randrange(self.__prefix(len(self.__slots)))
+
+        # Descend the tree to find the slot holding the winning ticket
+        index: int = 0
+        step: int = 1 << (len(self.__slots).bit_length() - 1)
+        while step:
+            if index + step < len(self.__tree) and self.__tree[index + step] <= winner:
+                index += step
+                winner -= self.__tree[index]
+            step >>= 1
+
+        slot: int = index
+        pcb: PCB = self.__slots[slot]
+        self.__add(slot, -self.__weights[slot])
+        self.__slots[slot] = None
+        self.__weights[slot] = 0
+        self.__free.append(slot)
+        self.__size -= 1
+        return pcb
+
+    def __prefix(self, end: int) -> int:
+        total: int = 0
+        while end:
+            total += self.__tree[end]
+            end -= end & -end
+        return total
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self) -> Iterator[PCB]:
+        return (pcb for pcb in self.__slots if pcb is not None)
+
+
+if __name__ == "__main__":
+    help("readyqueue")
@@ -0,0 +1,306 @@
+"""Compares the results of many CPU Scheduling Simulations in one table and one set of charts.
+
+CPU Scheduling Comparison Report
+
+Reads results files written by `main.py` (JSON, see `results2json`) and CSV
+files written by `sweep.py`, from any mix of files, directories and glob
+patterns. Runs of the same input, scheduling algorithm, cores, IO devices and
+time slice (e.g. different seeds) are averaged together with pandas.
+
+Only the "kwargs", "overall_stats" and "device_stats" of a results file are
+parsed, not its "jobs", so hundreds of results files load in seconds.
+
+Writes:
+    <prefix>.csv                : the comparison table, also printed to the console
+    <prefix>_vs_cpu.<format>    : mean/P95 turnaround, mean/P95 wait and CPU utilization vs. cores
+    <prefix>_vs_timeslice.<...> : the same vs. time slice
+    <prefix>_by_sched.<...>     : the same per algorithm, if neither cores nor time slice vary
+
+Command-line Args:
+    results(str): Comma separated results files, directories or glob patterns (e.g. "out/*.json").
+    prefix(str, optional): Prefix of output files. Defaults to `"report"`.
+    format(str, optional): Chart format, e.g. "png" or "svg". Defaults to `"png"`.
+    --no-charts(optional): Only write and print the table.
+
+Examples:
+    python3.11 report.py results=sweep_results.csv
+
+    python3.11 report.py results=.,runs/*.json prefix=compare format=svg
+
+"""
+import glob
+import json
+import os
+import sys
+from time import perf_counter
+import pandas as pd
+from matplotlib.figure import Figure
+from rich.console import Console
+from rich.table import Table
+from rich import box
+from generate_input import parse_commandline_args
+
+# Columns identifying a configuration
+config_columns: list[str] = ["input", "sched", "cpu", "io", "timeslice"]
+
+# Compared stats and their titles, in table order
+metric_titles: dict[str, str] = {
+    "average_turnaround_time": "Mean Turnaround",
+    "p95_turnaround_time": "P95 Turnaround",
+    "average_waiting_time": "Mean Wait",
+    "p95_waiting_time": "P95 Wait",
+    "cpu_utilization": "CPU Utilization",
+    "measured_cpu_utilization": "Measured Core Utilization",
+    "throughput": "Throughput",
+    "total_time": "Total Time",
+}
+
+# Columns printed to the console and their headers, one table per input
+console_titles: dict[str, str] = {
+    "sched": "Sched",
+    "cpu": "Cores",
+    "io": "IO",
+    "timeslice": "Slice",
+    "runs": "Runs",
+    "average_turnaround_time": "Mean TAT",
+    "p95_turnaround_time": "P95 TAT",
+    "average_waiting_time": "Mean Wait",
+    "p95_waiting_time": "P95 Wait",
+    "measured_cpu_utilization": "Util",
+    "throughput": "Thru",
+}
+
+# Stats drawn in the charts; utilization is the measured one when available
+chart_metrics: list[str] = [
+    "average_turnaround_time",
+    "p95_turnaround_time",
+    "average_waiting_time",
+    "p95_waiting_time",
+    "measured_cpu_utilization",
+]
+
+JOBS_KEY: str = '"jobs":'
+
+
+def read_results_json(file_path: str) -> dict | None:
+    """Reads the configuration and stats of a results file written by `results2json`.
+
+    The file is read up to its "jobs", which `results2json` writes last, and the
+    jobs are not parsed.
+
+    Args:
+        file_path: name of the JSON file.
+
+    Returns:
+        dict | None: "kwargs", "overall_stats" and "device_stats" of the file, `None` if it
+            is not a results file (e.g. an input file).
+    """
+    with open(file_path, "r") as jsonFile:
+        text: str = ""
+        while JOBS_KEY not in text:
+            chunk: str = jsonFile.read(1 << 16)
+            if not chunk:
+                break
+            text += chunk
+
+        try:
+            head: str = text[: text.index(JOBS_KEY)]
+            data: dict = json.loads(head + JOBS_KEY + "[]}")
+        except ValueError:
+            # No "jobs", or not in the expected place: parse everything
+            data = json.loads(text + jsonFile.read())
+
+    if not isinstance(data, dict) or "overall_stats" not in data:
+        return None
+    return data
+
+
+def expand_paths(patterns: list[str]) -> list[str]:
+    """Returns the files named by `patterns`: files, directories (their JSON and CSV files) or glob patterns."""
+    paths: list[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(glob.glob(os.path.join(pattern, "*.json")) + glob.glob(os.path.join(pattern, "*.csv"))))
+        else:
+            paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    return paths
+
+
+def load_results(patterns: list[str]) -> pd.DataFrame:
+    """Loads every results file named by `patterns` into one row per run.
+
+    JSON files that are not results files, CSV files without a "sched" column (e.g.
+    the per-process CSV files of `main.py`) and comparison tables written by this
+    module (they have a "runs" column) are skipped.
+
+    Args:
+        patterns: results files, directories or glob patterns.
+
+    Returns:
+        pd.DataFrame: configuration and overall stats of each run.
+
+    Raises:
+        ValueError: if no results are found.
+    """
+    rows: list[dict] = []
+    frames: list[pd.DataFrame] = []
+
+    for file_path in expand_paths(patterns):
+        if file_path.endswith(".csv"):
+            frame: pd.DataFrame = pd.read_csv(file_path)
+            if "sched" in frame.columns and "runs" not in frame.columns:
+                frames.append(frame.assign(file=file_path))
+        else:
+            data: dict | None = read_results_json(file_path)
+            if data is not None:
+                rows.append({**data["kwargs"], **data["overall_stats"], "file": file_path})
+
+    if rows:
+        frames.append(pd.DataFrame.from_records(rows))
+    if not frames:
+        raise ValueError(f"no results found in {patterns}")
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def comparison_table(results: pd.DataFrame) -> pd.DataFrame:
+    """Averages the stats of runs with the same configuration.
+
+    Args:
+        results: runs, as returned by `load_results`.
+
+    Returns:
+        pd.DataFrame: one row per configuration, with the number of runs averaged and the
+            mean of every stat in `metric_titles`, sorted by input and mean turnaround time.
+    """
+    metrics: list[str] = [metric for metric in metric_titles if metric in results.columns]
+    groups = results.groupby(config_columns, dropna=False, sort=False)
+
+    table: pd.DataFrame = groups[metrics].mean()
+    table.insert(0, "runs", groups.size())
+
+    return table.reset_index().sort_values(["input", metrics[0]], kind="stable", ignore_index=True)
+
+
+def print_table(table: pd.DataFrame, console: Console | None = None) -> None:
+    """Prints the comparison table with rich, one table per input file.
+
+    Args:
+        table: comparison table, as returned by `comparison_table`.
+        console (optional): `Console` to print to. Defaults to the terminal, or 120 columns
+            when the output is not a terminal.
+    """
+    if console is None:
+        console = Console()
+        if not console.is_terminal:
+            console = Console(width=120)
+    columns: list[str] = [column for column in console_titles if column in table.columns]
+
+    for input_file, rows in table.groupby("input", sort=False):
+        richTable: Table = Table(title=f"Scheduling Comparison - {input_file}", box=box.SIMPLE_HEAVY)
+        for column in columns:
+            richTable.add_column(console_titles[column], justify="left" if column == "sched" else "right")
+
+        for row in rows[columns].itertuples(index=False):
+            richTable.add_row(*(f"{value:.2f}" if isinstance(value, float) else str(value) for value in row))
+
+        console.print(richTable)
+
+
+def comparison_chart(results: pd.DataFrame, x: str, ofile: str) -> None:
+    """Draws every stat of `chart_metrics` against `x`, one line (bar) per algorithm.
+
+    Each input file gets its own row of charts. Runs of the same input that differ
+    in anything but `x` and the algorithm are averaged together.
+
+    Args:
+        results: runs, as returned by `load_results`.
+        x: "cpu", "timeslice" or "sched" (bars).
+        ofile: output file. Its extension picks the format, e.g. ".png" or ".svg".
+    """
+    metrics: list[str] = [metric for metric in chart_metrics[:-1] if metric in results.columns]
+    metrics.append("measured_cpu_utilization" if "measured_cpu_utilization" in results.columns else "cpu_utilization")
+
+    # Same color for an algorithm in every chart
+    scheds: list[str] = sorted(results["sched"].unique())
+    colors: dict[str, str] = {sched: f"C{i % 10}" for i, sched in enumerate(scheds)}
+
+    inputs = results.groupby("input", sort=True)
+    fig: Figure = Figure(figsize=(5 * len(metrics), 4 * inputs.ngroups), layout="constrained")
+    axes = fig.subplots(inputs.ngroups, len(metrics), squeeze=False)
+
+    for row, (input_file, runs) in zip(axes, inputs):
+        for ax, metric in zip(row, metrics):
+            if x == "sched":
+                means: pd.Series = runs.groupby("sched", sort=True)[metric].mean()
+                ax.bar(means.index, means.to_numpy(), color=[colors[sched] for sched in means.index])
+            else:
+                pivot: pd.DataFrame = runs.pivot_table(index=x, columns="sched", values=metric, aggfunc="mean")
+                for sched in pivot.columns:
+                    line: pd.Series = pivot[sched].dropna()
+                    ax.plot(line.index, line.to_numpy(), marker="o", color=colors[sched], label=sched)
+                ax.set_xticks(pivot.index)
+            ax.set_title(f"{metric_titles[metric]} - {input_file}", fontsize="medium")
+            ax.set_xlabel({"cpu": "Cores", "timeslice": "Time Slice", "sched": "Algorithm"}[x])
+
+    if x != "sched":
+        handles, labels = [], []
+        for ax in axes[:, 0]:
+            for handle, label in zip(*ax.get_legend_handles_labels()):
+                if label not in labels:
+                    handles.append(handle)
+                    labels.append(label)
+        fig.legend(handles, labels, loc="outside right upper")
+
+    fig.savefig(ofile)
+
+
+def write_report(results: pd.DataFrame, prefix: str, extension: str = "png", charts: bool = True) -> list[str]:
+    """Writes the comparison table and charts of `results`.
+
+    Args:
+        results: runs, as returned by `load_results`.
+        prefix: prefix of output files.
+        extension (optional): chart format, e.g. "png" or "svg". Defaults to "png".
+        charts (optional): whether to draw charts. Defaults to True.
+
+    Returns:
+        list[str]: names of the files written.
+    """
+    table: pd.DataFrame = comparison_table(results)
+    table.to_csv(f"{prefix}.csv", index=False)
+    print_table(table)
+    written: list[str] = [f"{prefix}.csv"]
+
+    if charts:
+        varying: list[str] = [x for x in ("cpu", "timeslice") if results[x].nunique() > 1]
+        for x in varying or ["sched"]:
+            ofile: str = f"{prefix}_{'by' if x == 'sched' else 'vs'}_{x}.{extension}"
+            comparison_chart(results, x, ofile)
+            written.append(ofile)
+
+    return written
+
+
+if __name__ == "__main__":
+    argv: list[str] = sys.argv[1:]
+    args, kwargs = parse_commandline_args(argv)
+
+    # If --help flag is present or no results are given, print module level
+    # doc-string, then exit program.
+    if "--help" in args or "results" not in kwargs:
+        help("report")
+        sys.exit()
+
+    start: float = perf_counter()
+
+    try:
+        results: pd.DataFrame = load_results([pattern for pattern in kwargs["results"].split(",") if pattern])
+        written: list[str] = write_report(
+            results, kwargs.get("prefix", "report"), kwargs.get("format", "png"), "--no-charts" not in args
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Compared {len(results)} runs in {perf_counter() - start:.2f}s, wrote {', '.join(written)}")
@@ -0,0 +1,469 @@
+"""Provides the shared simulation kernel for every CPU Scheduling Algorithm.
+
+`SchedulingPolicy` is the interface a scheduling algorithm implements. It only
+decides *which* process runs and *when* a running process has to give up its
+core. `simulate` owns the tick loop (arrivals, dispatching, CPU bursts, I/O
+bursts, termination and the visualization) and asks the policy for those decisions
+through a small set of hooks.
+
+Typical usage example:
+
+  policy: SchedulingPolicy = RoundRobinPolicy(time_slice=5)
+  simulate(pcbList, policy, num_cores=2, io_devices=2)
+"""
+from pcb import PCB
+from cpu import CPU
+from tickcounter import Clock, use_clock
+from stats import StatsAccumulator
+from timeline import TimelineRecorder, NEW, READY, RUNNING, WAITING, IO, TERMINATED
+from scheduling_visuals import LiveRenderer
+from time import sleep
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator
+from rich.text import Text
+
+
+class SchedulingPolicy:
+    """Base class for scheduling policies run by `simulate`.
+
+    The default hooks implement a plain first-come-first-serve policy with a
+    FIFO "ready" queue and no preemption. Subclasses override only the hooks
+    they need.
+
+    Attributes:
+        name          (str): short name of the algorithm, e.g. "FCFS"
+        title         (str): title shown in the visualization
+        show_priority (bool): whether the visualization shows priorities
+        randomized    (bool): whether the policy accepts a `seed` argument
+        time_slice    (int): quantum used by time-sliced policies
+
+    """
+
+    name: str = "FCFS"
+    title: str = "Scheduling Algorithm"
+    show_priority: bool = False
+    randomized: bool = False
+
+    def __init__(self, time_slice: int = 1) -> None:
+        """__init__ method for `SchedulingPolicy`
+
+        Constructs a new `SchedulingPolicy` object.
+
+        Args:
+            time_slice(optional): `int` representing the quantum. Ignored by non time-sliced policies.
+
+        """
+        self.time_slice: int = time_slice
+
+    def on_start(self, cpu: CPU) -> None:
+        """Called once before the first tick, e.g. to replace `cpu.ready`.
+
+        Args:
+            cpu: the `CPU` being simulated.
+
+        """
+
+    def on_arrival(self, cpu: CPU, pcb: PCB) -> None:
+        """Places a newly arrived process into the "ready" queue.
+
+        Args:
+            cpu: the `CPU` being simulated.
+            pcb: the `PCB` that just arrived.
+
+        """
+        self.on_ready(cpu, pcb)
+
+    def on_ready(self, cpu: CPU, pcb: PCB) -> None:
+        """Places a process that finished an I/O burst into the "ready" queue.
+
+        Args:
+            cpu: the `CPU` being simulated.
+            pcb: the `PCB` that became ready.
+
+        """
+        cpu.ready.append(pcb)
+
+    def pick_next(self, cpu: CPU) -> PCB:
+        """Removes and returns the next process to run from the "ready" queue.
+
+        Only called when the "ready" queue is not empty.
+
+        Args:
+            cpu: the `CPU` being simulated.
+
+        Returns:
+            PCB: the process to dispatch.
+
+        """
+        return cpu.ready.popleft()
+
+    def should_preempt(self, cpu: CPU) -> bool:
+        """Decides whether the last running process yields its core.
+
+        Only called when both the "running" and "ready" queues are not empty.
+        If `True`, `cpu.running[-1]` is replaced by `pick_next` and handed to `on_preempt`.
+
+        Args:
+            cpu: the `CPU` being simulated.
+
+        Returns:
+            bool: `True` if `cpu.running[-1]` should be preempted.
+
+        """
+        return False
+
+    def on_preempt(self, cpu: CPU, pcb: PCB) -> None:
+        """Places a preempted process back into the "ready" queue.
+
+        Args:
+            cpu: the `CPU` being simulated.
+            pcb: the `PCB` that was preempted.
+
+        """
+        self.on_ready(cpu, pcb)
+
+    def on_dispatch(self, cpu: CPU) -> None:
+        """Called after each change to the "running" queue.
+
+        Args:
+            cpu: the `CPU` being simulated.
+
+        """
+
+    def quantum_expired(self, pcb: PCB) -> bool:
+        """Accounts one tick of CPU time and reports if the quantum is used up.
+
+        Called once per tick for each running process whose CPU burst is not finished.
+
+        Args:
+            pcb: the running `PCB`.
+
+        Returns:
+            bool: `True` if `pcb` must leave the core.
+
+        """
+        return False
+
+    def on_quantum_expire(self, cpu: CPU, pcb: PCB) -> None:
+        """Places a process whose quantum expired back into the "ready" queue.
+
+        Args:
+            cpu: the `CPU` being simulated.
+            pcb: the `PCB` whose quantum expired.
+
+        """
+        self.on_ready(cpu, pcb)
+
+    def on_burst_complete(self, pcb: PCB) -> None:
+        """Called when a running process finishes its current CPU burst.
+
+        Args:
+            pcb: the `PCB` that finished a CPU burst.
+
+        """
+
+    def on_tick(self, cpu: CPU) -> None:
+        """Called once per tick, after ready and wait times are updated.
+
+        Args:
+            cpu: the `CPU` being simulated.
+
+        """
+
+
+def simulate(
+    pcbList: list[PCB] | Iterable[PCB],
+    policy: SchedulingPolicy,
+    num_cores: int = 1,
+    io_devices: int = 1,
+    sleep_delay: float = 1,
+    visualize: bool = True,
+    on_terminate: Callable[[PCB], None] | None = None,
+    max_fps: float = 10.0,
+    timeline: TimelineRecorder | None = None,
+    clock: Clock | None = None,
+) -> StatsAccumulator:
+    """Runs a CPU scheduling simulation of `policy` on a `list` of `PCB` objects.
+
+    Performs the simulation on `pcbList`, then shows a visualization of the results.
+    The `PCB`s in `pcbList` are updated in place.
+
+    If `pcbList` is any other iterable (e.g. the generator returned by `stream_PCBs`),
+    it must yield `PCB`s sorted by arrival time. They are then pulled lazily, only
+    when the simulation reaches their arrival time, and terminated `PCB`s are handed
+    to `on_terminate` instead of being kept in `cpu.terminated`. Memory use is
+    bounded by the number of live processes, not by the number of jobs.
+
+    Args:
+        pcbList: a `list` of `PCB` objects, or an iterable of `PCB`s sorted by arrival time.
+        policy: the `SchedulingPolicy` making the scheduling decisions.
+        num_cores (optional): `int` representing number of cores in CPU.
+        io_devices (optional): `int` representing number of I/O devices.
+        sleep_delay (optional): `float` controlling how fast the visualization occurs.
+        visualize (optional): `bool` to toggle the visualization. If `False`, the simulation
+            runs headless, without rendering or sleeping. Defaults to `True`.
+            Must be `False` when `pcbList` is not a `list`.
+        on_terminate (optional): function called with each `PCB` once it terminates.
+        max_fps (optional): most frames drawn per second by the visualization. State changes
+            between frames are coalesced, so `sleep_delay` can be lower than 1 / `max_fps`.
+            Defaults to 10.
+        timeline (optional): `TimelineRecorder` recording every state transition. Defaults to `None`.
+        clock (optional): `Clock` counting the ticks of this simulation; its ticks are the total
+            time once the simulation is done. It is reset at the start, and also becomes the clock
+            `TickCounter` uses in the calling thread or asyncio task. Defaults to a new `Clock`.
+
+    Returns:
+        StatsAccumulator: running stats of the simulated processes (`cpu.stats`).
+
+    Raises:
+        ValueError: if `visualize` is `True` and `pcbList` is not a `list`, or if a streamed
+            `PCB` arrives before the one streamed just before it.
+    """
+    streaming: bool = not isinstance(pcbList, list)
+
+    if streaming and visualize:
+        raise ValueError("cannot visualize a streamed simulation, use visualize=False")
+
+    # Create instance of CPU that has `numCores` number of cores, with its own clock
+    cpu: CPU = CPU(num_cores, io_devices, clock)
+    clock = cpu.clock
+
+    # Clear ticks, and keep `TickCounter` working for callers that still use it
+    clock.reset_ticks()
+    use_clock(clock)
+    policy.on_start(cpu)
+
+    # Sort processes by arrival time, and put into "new" queue
+    if streaming:
+        arrivals: Iterator[PCB] = iter(pcbList)
+    else:
+        arrivals: Iterator[PCB] = iter(())
+        cpu.new.extend(sorted(pcbList, key=lambda x: x.arrival_time))
+        for pcb in cpu.new:
+            cpu.stats.add_process(pcb)
+
+    last_arrival: int | None = None
+
+    def next_arrival() -> bool:
+        # Pull the next streamed PCB into "new", if "new" is empty
+        nonlocal last_arrival
+        if not cpu.new:
+            pcb: PCB | None = next(arrivals, None)
+            if pcb is None:
+                return False
+            # A PCB arriving earlier than the last one would be admitted late, with wrong stats
+            if last_arrival is not None and pcb.arrival_time < last_arrival:
+                raise ValueError(
+                    f"streamed input is not sorted by arrival time: process {pcb.process_id}"
+                    f" arrives at {pcb.arrival_time}, before the previous process at {last_arrival}"
+                )
+            last_arrival = pcb.arrival_time
+            cpu.new.append(pcb)
+            cpu.stats.add_process(pcb)
+        return True
+
+    def active() -> bool:
+        return bool(
+            next_arrival()
+            or len(cpu.ready)
+            or len(cpu.running)
+            or len(cpu.waiting)
+            or len(cpu.io)
+        )
+
+    def show(pcb: PCB, event: str, style: str, current_ticks: int | None = None):
+        if not visualize:
+            return
+        if current_ticks is None:
+            current_ticks = clock.get_ticks()
+        visual.update(
+            current_ticks,
+            Text(
+                f"Process {pcb.process_id} {event} at time {current_ticks}\n",
+                style=style,
+            ),
+        )
+        if sleep_delay > 0:
+            sleep(sleep_delay)
+
+    def transition(pcb: PCB, from_state: int, to_state: int, current_ticks: int | None = None):
+        if timeline is None:
+            return
+        timeline.record(
+            clock.get_ticks() if current_ticks is None else current_ticks,
+            pcb.process_id,
+            from_state,
+            to_state,
+        )
+
+    def refresh():
+        if not visualize:
+            return
+        visual.update(clock.get_ticks())
+        if sleep_delay > 0:
+            sleep(sleep_delay)
+
+    renderer: LiveRenderer | nullcontext = (
+        LiveRenderer(pcbList, cpu, policy.title, policy.show_priority, max_fps)
+        if visualize
+        else nullcontext()
+    )
+
+    with renderer as visual:
+        # Keep looping until all processes are terminated
+        while active():
+            # Load stuff into "ready" as it arrives
+            while next_arrival() and clock.get_ticks() >= cpu.new[0].arrival_time:
+                pcb: PCB = cpu.new.popleft()
+                policy.on_arrival(cpu, pcb)
+                transition(pcb, NEW, READY)
+                show(pcb, "has arrived", "bold yellow")
+
+            # Load stuff from ready to running if there's available space, and if there is a PCB in ready.
+            # Swap the last running PCB with the next ready PCB, if the policy preempts.
+            while True:
+                if len(cpu.running) and len(cpu.ready) and policy.should_preempt(cpu):
+                    preempted_pcb: PCB = cpu.running[-1]
+                    pcb: PCB = policy.pick_next(cpu)
+                    cpu.running[-1] = pcb
+                    policy.on_preempt(cpu, preempted_pcb)
+                    transition(preempted_pcb, RUNNING, READY)
+                elif len(cpu.running) < cpu.num_cores and len(cpu.ready):
+                    pcb: PCB = policy.pick_next(cpu)
+                    cpu.running.append(pcb)
+                # Exit the loop, nothing to swap or move into running queue
+                else:
+                    break
+
+                transition(pcb, READY, RUNNING)
+                policy.on_dispatch(cpu)
+                show(cpu.running[-1], "is running", "bold green")
+
+            # Increment ticks
+            clock.increment_ticks()
+
+            # Reduce CPU burst times for all process in running state
+            run_idx: int = 0
+            busy_cores: int = 0
+
+            while run_idx < len(cpu.running):
+                pcb: PCB = cpu.running[run_idx]
+
+                # If cpu bursts is not empty
+                if pcb.cpu_bursts:
+                    # Increment running time
+                    pcb.running_time += 1
+                    busy_cores += 1
+                    pcb.cpu_bursts[0] -= 1
+
+                    # If burst is finished, pop it and move PCB to waiting queue
+                    if not pcb.cpu_bursts[0]:
+                        pcb.cpu_bursts.pop(0)
+                        policy.on_burst_complete(pcb)
+                        cpu.waiting.append(cpu.running.pop(run_idx))
+                        transition(pcb, RUNNING, WAITING)
+                        show(pcb, "is waiting", "bold blue")
+                        continue
+
+                    # If quantum is used up, move PCB back to ready queue
+                    if policy.quantum_expired(pcb):
+                        cpu.running.pop(run_idx)
+                        policy.on_quantum_expire(cpu, pcb)
+                        transition(pcb, RUNNING, READY)
+                        show(pcb, "is ready", "bold blue")
+                        continue
+                else:
+                    cpu.waiting.append(cpu.running.pop(run_idx))
+                    transition(pcb, RUNNING, WAITING)
+                    show(pcb, "is waiting", "bold blue")
+                    continue
+
+                run_idx += 1
+
+            cpu.stats.add("running_time", busy_cores)
+
+            # Move PCB from waiting to io if there's available space, and if there is a PCB in waiting
+            while len(cpu.io) < io_devices and len(cpu.waiting):
+                cpu.io.append(cpu.waiting.popleft())  # Move next PCB into io queue
+                cpu.take_io_device(cpu.io[-1])
+                transition(cpu.io[-1], WAITING, IO)
+                show(cpu.io[-1], "is doing I/O", "bold purple")
+
+            # Increment ready time
+            for pcb in cpu.ready:
+                pcb.ready_time += 1
+            ready_length: int = len(cpu.ready)
+            cpu.stats.add("ready_time", ready_length)
+
+            # Increment wait time
+            for pcb in cpu.waiting:
+                pcb.wait_time += 1
+            waiting_length: int = len(cpu.waiting)
+            cpu.stats.add("wait_time", waiting_length)
+
+            policy.on_tick(cpu)
+
+            # Show visualization of process after tick
+            refresh()
+
+            # Reduce IO burst times for all process in IO state
+            io_idx: int = 0
+            io_busy: int = 0
+
+            while io_idx < len(cpu.io):
+                pcb: PCB = cpu.io[io_idx]
+
+                # If IO bursts is not empty
+                if pcb.io_bursts:
+                    # Increment IO time
+                    pcb.io_time += 1
+                    io_busy += 1
+                    cpu.stats.io_busy_ticks[cpu.io_slots[pcb.process_id]] += 1
+                    # If decrement does not result in 0, decrement
+                    if pcb.io_bursts[0] - 1 > 0:
+                        pcb.io_bursts[0] -= 1
+                        io_idx += 1
+                        continue
+                    # Else, pop IO burst from list and move PCB to ready queue, if has more cpu bursts
+                    elif pcb.cpu_bursts:
+                        pcb.io_bursts.pop(0)
+                        cpu.io.pop(io_idx)
+                        cpu.release_io_device(pcb)
+                        policy.on_ready(cpu, pcb)
+                        transition(pcb, IO, READY)
+                        show(pcb, "is ready", "bold yellow")
+                        continue
+
+                # If CPU bursts is empty, move to terminated
+                pcb.exit_time = clock.get_ticks() + 1
+                pcb.turnaround_time = pcb.exit_time - pcb.arrival_time
+                cpu.stats.terminate(pcb)
+                pcb.io_bursts.clear()
+                cpu.io.pop(io_idx)
+                cpu.release_io_device(pcb)
+                if not streaming:
+                    cpu.terminated.append(pcb)
+                if on_terminate:
+                    on_terminate(pcb)
+                transition(pcb, IO, TERMINATED, pcb.exit_time)
+                show(
+                    pcb,
+                    "has terminated",
+                    "bold red",
+                    current_ticks=clock.get_ticks() + 1,
+                )
+
+            cpu.stats.add("io_time", io_busy)
+            cpu.stats.record_tick(busy_cores, ready_length, waiting_length, io_busy)
+
+        # Increment ticks counter so it is correct
+        clock.increment_ticks()
+
+        # Show final stats
+        refresh()
+
+    return cpu.stats
+
+
+if __name__ == "__main__":
+    help("scheduler")
@@ -3,9 +3,11 @@
 `processes_table` returns a `Table` showing all the information for a list
 of processes. `queues_table` returns a `Table` showing all the processes in each
 state. `cpu_scheduling_visualization` shows the entire visualization for the
-simulation.
+simulation. `LiveRenderer` draws it live at a capped frame rate, paging through
+the processes and only rebuilding the rows that changed.
 
 """
+from time import perf_counter
 from rich.table import Table, Column
 from rich import box
 from rich.style import Style
@@ -17,9 +19,9 @@ from rich.align import Align
 from rich.layout import Layout
 from rich.columns import Columns
 from rich.text import Text
-from statistics import mean
 from pcb import PCB
-from cpu import CPU, cpu_utilization
+from cpu import CPU, cpu_utilization, cpu_utilization_from_wait
+from stats import StatsAccumulator
 
 
 def cpu_scheduling_visualization(
@@ -32,6 +34,9 @@ def cpu_scheduling_visualization(
     queues_table_title: str = "Process States",
     stats_table_title: str = "Stats",
     show_priority: bool = False,
+    rows: list[list[str]] | None = None,
+    rows_caption: str | None = None,
+    max_queue_ids: int | None = None,
 ) -> Table:
     """Returns a `Table` object that is a visual representation of a CPU scheduling algorithm.
 
@@ -46,17 +51,35 @@ def cpu_scheduling_visualization(
         stats_table_title (optional): title for the `Panel` that contains stats table. Defaults to "Stats".
         show_priority (optional): a `bool` to toggle priorities in the table. Defaults to `False`.
         current_ticks (optional): an `int` to show the current ticks in the simulation. Defaults to `None`.
+        rows (optional): prebuilt rows (see `process_row`) to show instead of every process. Defaults to `None`.
+        rows_caption (optional): caption for the processes table, e.g. the page shown. Defaults to `None`.
+        max_queue_ids (optional): most process ids listed per state. Defaults to `None` (all).
     Returns:
         Table: a renderable for representing the visualization of CPU scheduling.
 
     """
+    # Use the running stats of the simulation if it has them, instead of a pass over every PCB
+    stats: StatsAccumulator = cpu.stats
+    if stats.count == len(pcbList):
+        utilization: float = cpu_utilization_from_wait(stats.average("wait_time"), stats.count, current_ticks)
+        averages: dict[str, float] | None = {field: stats.average(field) for field in stats.fields}
+    else:
+        utilization = cpu_utilization(pcbList, current_ticks)
+        averages = None
+    measured: bool = stats.ticks > 0
+
     # Table for current ticks, CPU utilization, and messages.
     text_table = Table(box=box.HORIZONTALS, expand=True, show_header=False, width=50, show_edge=False)
     text_table.add_row(f"Ticks: {current_ticks}", style="bold red italic")
     text_table.add_row(
-        f"CPU Utilization: {cpu_utilization(pcbList, current_ticks)*100.0 : .4f}%",
+        f"CPU Utilization: {utilization*100.0 : .4f}%",
         style="bold green",
     )
+    if measured:
+        text_table.add_row(
+            f"Measured Core Utilization: {stats.core_utilization()*100.0 : .4f}%",
+            style="green",
+        )
     text_table.add_section()
 
     if message:
@@ -79,6 +102,9 @@ def cpu_scheduling_visualization(
                 pcbList,
                 None,
                 show_priority,
+                rows,
+                rows_caption,
+                averages,
             ),
             title=processes_table_title,
             expand=True,
@@ -93,6 +119,7 @@ def cpu_scheduling_visualization(
                     queues_table(
                         cpu,
                         None,
+                        max_queue_ids,
                     ),
                 ],
                 equal=True,
@@ -103,10 +130,52 @@ def cpu_scheduling_visualization(
     return Layout(complete_table)
 
 
+def average(values: list[int]) -> float:
+    """Returns the mean of `values`.
+
+    Same result as `statistics.mean` for `int`s, without its exact fraction arithmetic,
+    which is slow when the table is redrawn for thousands of processes.
+    """
+    return sum(values) / len(values)
+
+
+def process_row(pcb: PCB, show_priority: bool = False) -> list[str]:
+    """Returns the cells of a process in the processes table.
+
+    Args:
+        pcb: a `PCB` object.
+        show_priority (optional): a `bool` to include the priority. Defaults to `False`.
+    Returns:
+        list[str]: the cells of the row, in column order.
+
+    """
+    row: list[str] = [str(pcb.process_id)]
+    # Add priority value to row if show_priority is True
+    if show_priority:
+        row.append(str(pcb.priority))
+    row.extend(
+        [
+            str(pcb.arrival_time),
+            str(pcb.ready_time),
+            str(pcb.running_time),
+            str(pcb.wait_time),
+            str(pcb.io_time),
+            str(pcb.turnaround_time),
+            str(pcb.exit_time),
+            str(pcb.cpu_bursts),
+            str(pcb.io_bursts),
+        ]
+    )
+    return row
+
+
 def processes_table(
     pcbList: list[PCB],
     title: str = "Processes",
     show_priority: bool = False,
+    rows: list[list[str]] | None = None,
+    caption: str | None = None,
+    averages: dict[str, float] | None = None,
 ) -> Table:
     """Returns a table showing the information of processes in a CPU scheduling algorithm.
 
@@ -116,7 +185,11 @@ def processes_table(
         pcbList: a `list` of `PCB` objects.
         title (optional): title of the table. Defaults to "Processes".
         show_priority (optional): a `bool` to toggle priorities in the table. Defaults to `False`.
-        current_ticks (optional): an `int` to show the current ticks in the simulation. Defaults to `None`.
+        rows (optional): prebuilt rows to show instead of one row per `PCB`. Averages are
+            still computed over `pcbList`. Defaults to `None`.
+        caption (optional): caption of the table. Defaults to `None`.
+        averages (optional): average of each stat, by `PCB` attribute name. Computed from
+            `pcbList` if `None`. Defaults to `None`.
     Returns:
         Table: a table containing the data from a list of PCBs.
 
@@ -124,6 +197,7 @@ def processes_table(
 
     table: Table = Table(
         title=title,
+        caption=caption,
         expand=True,
     )
 
@@ -146,83 +220,49 @@ def processes_table(
     table.add_column("Exit Time", style="bold red")
     table.add_column("CPU Bursts", style="green")
     table.add_column("IO Bursts", style="magenta")
-    for pcb in pcbList:
-        # Add priority value to row if show_priority is True
-        if show_priority:
-            table.add_row(
-                str(pcb.process_id),
-                str(pcb.priority),
-                str(pcb.arrival_time),
-                str(pcb.ready_time),
-                str(pcb.running_time),
-                str(pcb.wait_time),
-                str(pcb.io_time),
-                str(pcb.turnaround_time),
-                str(pcb.exit_time),
-                str(pcb.cpu_bursts),
-                str(pcb.io_bursts),
-            )
-        else:
-            table.add_row(
-                str(pcb.process_id),
-                str(pcb.arrival_time),
-                str(pcb.ready_time),
-                str(pcb.running_time),
-                str(pcb.wait_time),
-                str(pcb.io_time),
-                str(pcb.turnaround_time),
-                str(pcb.exit_time),
-                str(pcb.cpu_bursts),
-                str(pcb.io_bursts),
-            )
+    if rows is None:
+        rows = [process_row(pcb, show_priority) for pcb in pcbList]
+    for row in rows:
+        table.add_row(*row)
 
     # Add row for averages
     table.add_section()
 
+    # Columns with an average, in table order
+    average_fields: list[str] = [
+        "arrival_time",
+        "ready_time",
+        "running_time",
+        "wait_time",
+        "io_time",
+        "turnaround_time",
+        "exit_time",
+    ]
     # If show_priority is True, add average priority to row
     if show_priority:
-        table.add_row(
-            "Averages:",
-            f"{mean([pcb.priority for pcb in pcbList]): .4f}",
-            f"{mean([pcb.arrival_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.ready_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.running_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.wait_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.io_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.turnaround_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.exit_time for pcb in pcbList]): .4f}",
-            Text(style=Style(bgcolor="white")),
-            Text(style=Style(bgcolor="white")),
-            style=Style(
-                color=Color.from_rgb(255, 127, 127),
-                bold=True,
-                italic=True,
-            ),  # Light red
-        )
-    else:
-        table.add_row(
-            "Averages:",
-            f"{mean([pcb.arrival_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.ready_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.running_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.wait_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.io_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.turnaround_time for pcb in pcbList]): .4f}",
-            f"{mean([pcb.exit_time for pcb in pcbList]): .4f}",
-            Text(style=Style(bgcolor="white")),
-            Text(style=Style(bgcolor="white")),
-            style=Style(
-                color=Color.from_rgb(255, 127, 127),
-                bold=True,
-                italic=True,
-            ),  # Light red
-        )
+        average_fields.insert(0, "priority")
+
+    if averages is None:
+        averages = {field: average([getattr(pcb, field) for pcb in pcbList]) for field in average_fields}
+
+    table.add_row(
+        "Averages:",
+        *[f"{averages[field]: .4f}" for field in average_fields],
+        Text(style=Style(bgcolor="white")),
+        Text(style=Style(bgcolor="white")),
+        style=Style(
+            color=Color.from_rgb(255, 127, 127),
+            bold=True,
+            italic=True,
+        ),  # Light red
+    )
     return table
 
 
 def queues_table(
     cpu: CPU,
     title: str = "Process States",
+    max_ids: int | None = None,
 ) -> Table:
     """Returns a table showing states of processes in a CPU scheduling algorithm.
 
@@ -231,7 +271,7 @@ def queues_table(
     Args:
         cpu: a `CPU` containing various queues that have processes in different states.
         title (optional): the title of the table. Defaults to "Process States".
-        current_ticks (optional): an `int` to show the current ticks in the algorithm. Defaults to `None`.
+        max_ids (optional): most process ids listed per state, the rest are counted. Defaults to `None` (all).
     Returns:
         Table: a table representing different process in their current state in CPU scheduling.
 
@@ -243,25 +283,167 @@ def queues_table(
         expand=True,
     )
 
-    # Creates lists of Process IDs for each queue
-    new_processes: list[int] = [i.process_id for i in cpu.new]
-    ready_processes: list[int] = [i.process_id for i in cpu.ready]
-    running_processes: list[int] = [i.process_id for i in cpu.running]
-    waiting_processes: list[int] = [i.process_id for i in cpu.waiting]
-    io_processes: list[int] = [i.process_id for i in cpu.io]
-    terminated_processes: list[int] = [i.process_id for i in cpu.terminated]
+    def ids(queue) -> str:
+        # Lists the Process IDs in a queue, up to `max_ids` of them
+        if max_ids is None or len(queue) <= max_ids:
+            return str([i.process_id for i in queue])
+        shown: list[int] = [pcb.process_id for pcb, _ in zip(queue, range(max_ids))]
+        return f"{shown} ... (+{len(queue) - max_ids} more)"
 
     # Add info to rows
-    table.add_row("New", str(new_processes), style="cyan", end_section=True)
-    table.add_row("Ready", str(ready_processes), style="yellow", end_section=True)
-    table.add_row("Running", str(running_processes), style="green", end_section=True)
-    table.add_row("Waiting", str(waiting_processes), style="blue", end_section=True)
-    table.add_row("IO", str(io_processes), style="purple", end_section=True)
+    table.add_row("New", ids(cpu.new), style="cyan", end_section=True)
+    table.add_row("Ready", ids(cpu.ready), style="yellow", end_section=True)
+    table.add_row("Running", ids(cpu.running), style="green", end_section=True)
+    table.add_row("Waiting", ids(cpu.waiting), style="blue", end_section=True)
+    table.add_row("IO", ids(cpu.io), style="purple", end_section=True)
     table.add_row(
-        "Terminated", str(terminated_processes), style="red", end_section=True
+        "Terminated", ids(cpu.terminated), style="red", end_section=True
     )
     return table
 
 
+class LiveRenderer:
+    """Draws `cpu_scheduling_visualization` live, at a capped frame rate.
+
+    `update` only records the latest state; a frame is drawn when at least
+    1 / `max_fps` seconds have passed since the last one, so bursts of state
+    changes are coalesced into one redraw however fast the simulation runs.
+    The processes table shows one page of `page_size` processes, moving to the
+    next page every `page_seconds`. Rows are cached per process and only rebuilt
+    when the process changed.
+
+    Attributes:
+        pcbList       (list[PCB]): processes being simulated
+        cpu           (CPU): the `CPU` being simulated
+        title         (str): title of the scheduling algorithm
+        show_priority (bool): whether the processes table shows priorities
+        max_fps       (float): most frames drawn per second
+        page_size     (int): most processes shown at once
+        page_seconds  (float): seconds each page of processes is shown
+
+    """
+
+    def __init__(
+        self,
+        pcbList: list[PCB],
+        cpu: CPU,
+        title: str = "Scheduling Algorithm",
+        show_priority: bool = False,
+        max_fps: float = 10.0,
+        page_size: int = 25,
+        page_seconds: float = 3.0,
+    ) -> None:
+        """__init__ method for `LiveRenderer`
+
+        Constructs a new `LiveRenderer` object. Drawing starts when it is entered
+        as a context manager.
+
+        Args:
+            pcbList: a `list` of `PCB` objects.
+            cpu: a `CPU` object.
+            title (optional): title of the scheduling algorithm. Defaults to "Scheduling Algorithm".
+            show_priority (optional): a `bool` to toggle priorities in the table. Defaults to `False`.
+            max_fps (optional): most frames drawn per second. Defaults to 10.
+            page_size (optional): most processes shown at once. Defaults to 25.
+            page_seconds (optional): seconds each page of processes is shown. Defaults to 3.
+
+        """
+        self.pcbList: list[PCB] = pcbList
+        self.cpu: CPU = cpu
+        self.title: str = title
+        self.show_priority: bool = show_priority
+        self.max_fps: float = max_fps
+        self.page_size: int = max(page_size, 1)
+        self.page_seconds: float = page_seconds
+
+        self.__rows: dict[int, tuple[tuple, list[str]]] = {}
+        self.__ticks: int = 0
+        self.__message: Text | str | None = None
+        self.__dirty: bool = True
+        self.__last_draw: float = float("-inf")
+        self.__live: Live | None = None
+
+    def __enter__(self) -> "LiveRenderer":
+        self.__live = Live(self.__frame(perf_counter()), auto_refresh=False)
+        self.__live.__enter__()
+        self.__last_draw = perf_counter()
+        self.__dirty = False
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+        self.__live.__exit__(*exc_info)
+
+    def update(self, current_ticks: int, message: Text | str | None = None) -> None:
+        """Records the latest state, and draws it if a frame is due.
+
+        Args:
+            current_ticks: current ticks in the simulation.
+            message (optional): message shown under the stats. Defaults to `None`.
+        """
+        self.__ticks = current_ticks
+        self.__message = message
+        self.__dirty = True
+
+        now: float = perf_counter()
+        if now - self.__last_draw >= 1 / self.max_fps:
+            self.__draw(now)
+
+    def flush(self) -> None:
+        """Draws the latest state if it was not drawn yet."""
+        if self.__dirty:
+            self.__draw(perf_counter())
+
+    def __draw(self, now: float) -> None:
+        if self.__live is not None:
+            self.__live.update(self.__frame(now), refresh=True)
+        self.__last_draw = now
+        self.__dirty = False
+
+    def __row(self, pcb: PCB) -> list[str]:
+        # Everything a row shows; bursts only change at the front, or by being popped
+        signature: tuple = (
+            pcb.priority,
+            pcb.ready_time,
+            pcb.running_time,
+            pcb.wait_time,
+            pcb.io_time,
+            pcb.turnaround_time,
+            pcb.exit_time,
+            len(pcb.cpu_bursts),
+            pcb.cpu_bursts[0] if pcb.cpu_bursts else None,
+            len(pcb.io_bursts),
+            pcb.io_bursts[0] if pcb.io_bursts else None,
+        )
+        cached: tuple[tuple, list[str]] | None = self.__rows.get(id(pcb))
+
+        if cached is None or cached[0] != signature:
+            cached = (signature, process_row(pcb, self.show_priority))
+            self.__rows[id(pcb)] = cached
+        return cached[1]
+
+    def __frame(self, now: float) -> Layout:
+        count: int = len(self.pcbList)
+        pages: int = max(-(-count // self.page_size), 1)
+        start: int = int(now / self.page_seconds) % pages * self.page_size
+        page: list[PCB] = self.pcbList[start:start + self.page_size]
+
+        caption: str | None = None
+        if pages > 1:
+            caption = f"Processes {start + 1}-{start + len(page)} of {count}"
+
+        return cpu_scheduling_visualization(
+            pcbList=self.pcbList,
+            cpu=self.cpu,
+            current_ticks=self.__ticks,
+            message=self.__message,
+            scheduling_algorithm_title=self.title,
+            show_priority=self.show_priority,
+            rows=[self.__row(pcb) for pcb in page],
+            rows_caption=caption,
+            max_queue_ids=self.page_size,
+        )
+
+
 if __name__ == "__main__":
     help("scheduling_visuals")
\ No newline at end of file
@@ -0,0 +1,395 @@
+"""`stats` contains running statistics for CPU Scheduling Simulation.
+
+`StatsAccumulator` keeps the totals of every `PCB` stat while the simulation
+runs, so averages and CPU utilization cost O(1) per frame instead of a pass
+over every `PCB`. It also keeps the distribution of turnaround and wait times
+of terminated processes: count, min, max, variance (`RunningStat`) and
+streaming percentiles (`StreamingQuantile`). Finally, it measures what the
+simulated hardware did: busy and idle core-ticks, busy ticks of each I/O
+device, time-weighted queue lengths and throughput over windows of ticks.
+
+Typical usage example:
+
+  stats: StatsAccumulator = StatsAccumulator.from_PCBs(pcbList)
+  stats.average("wait_time")
+  stats.distributions["turnaround_time"].quantiles[99].value()
+"""
+import math
+from collections import deque
+from pcb import PCB
+
+
+class RunningStat:
+    """Count, sum, min, max, mean and variance of a stream of values.
+
+    Uses Welford's algorithm, so each value is added in O(1) without being kept.
+
+    Attributes:
+        count   (int): number of values added
+        total   (float): sum of the values
+        minimum (float | None): smallest value, `None` if empty
+        maximum (float | None): largest value, `None` if empty
+        mean    (float): mean of the values, 0.0 if empty
+
+    """
+
+    def __init__(self) -> None:
+        """__init__ method for `RunningStat`
+
+        Constructs a new, empty `RunningStat` object.
+
+        """
+        self.count: int = 0
+        self.total: float = 0
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+        self.mean: float = 0.0
+        self.__m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Adds `value` to the stream."""
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+        delta: float = value - self.mean
+        self.mean += delta / self.count
+        self.__m2 += delta * (value - self.mean)
+
+    def variance(self) -> float:
+        """Returns the population variance, 0.0 if empty."""
+        return self.__m2 / self.count if self.count else 0.0
+
+    def stdev(self) -> float:
+        """Returns the population standard deviation, 0.0 if empty."""
+        return math.sqrt(self.variance())
+
+
+class StreamingQuantile:
+    """Estimates a quantile of a stream of values in O(1) memory.
+
+    The first `exact_limit` values are kept and the quantile is exact (linear
+    interpolation between closest ranks). After that, the P-Square algorithm
+    (Jain and Chlamtac, 1985) tracks the quantile with five markers.
+
+    Attributes:
+        p           (float): the quantile, between 0 and 1
+        exact_limit (int): number of values kept before switching to estimates
+
+    """
+
+    def __init__(self, p: float, exact_limit: int = 1000) -> None:
+        """__init__ method for `StreamingQuantile`
+
+        Constructs a new, empty `StreamingQuantile` object.
+
+        Args:
+            p: the quantile, between 0 and 1 (e.g. 0.95).
+            exact_limit (optional): number of values kept exactly. Defaults to 1000.
+
+        """
+        self.p: float = p
+        self.exact_limit: int = max(exact_limit, 5)
+        self.__values: list[float] | None = []
+        # P-Square marker heights, positions, desired positions and their increments
+        self.__heights: list[float] = []
+        self.__positions: list[float] = [1, 2, 3, 4, 5]
+        self.__desired: list[float] = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.__increments: list[float] = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value: float) -> None:
+        """Adds `value` to the stream."""
+        if self.__values is not None:
+            self.__values.append(value)
+            if len(self.__values) > self.exact_limit:
+                values, self.__values = self.__values, None
+                for kept in values:
+                    self.__estimate(kept)
+            return
+
+        self.__estimate(value)
+
+    def __estimate(self, value: float) -> None:
+        heights: list[float] = self.__heights
+        positions: list[float] = self.__positions
+
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        # Find the cell of `value`, extending the extremes if needed
+        if value < heights[0]:
+            heights[0] = value
+            cell: int = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.__desired[i] += self.__increments[i]
+
+        # Move the middle markers toward their desired positions
+        for i in range(1, 4):
+            offset: float = self.__desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (
+                offset <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step: int = 1 if offset > 0 else -1
+                height: float = self.__parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        positions[i + step] - positions[i]
+                    )
+                heights[i] = height
+                positions[i] += step
+
+    def __parabolic(self, i: int, step: int) -> float:
+        h: list[float] = self.__heights
+        n: list[float] = self.__positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """Returns the current quantile, 0.0 if empty."""
+        if self.__values is None:
+            return self.__heights[2]
+        if not self.__values:
+            return 0.0
+
+        values: list[float] = sorted(self.__values)
+        rank: float = self.p * (len(values) - 1)
+        low: int = math.floor(rank)
+        high: int = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class Distribution:
+    """A `RunningStat` plus streaming percentiles of one stat.
+
+    Attributes:
+        stat      (RunningStat): count, min, max, mean and variance
+        quantiles (dict[int, StreamingQuantile]): percentile estimators, by percentile
+
+    """
+
+    def __init__(self, percentiles: tuple[int, ...] = (50, 95, 99)) -> None:
+        """__init__ method for `Distribution`
+
+        Constructs a new, empty `Distribution` object.
+
+        Args:
+            percentiles (optional): percentiles to track. Defaults to (50, 95, 99).
+
+        """
+        self.stat: RunningStat = RunningStat()
+        self.quantiles: dict[int, StreamingQuantile] = {
+            percentile: StreamingQuantile(percentile / 100) for percentile in percentiles
+        }
+
+    def add(self, value: float) -> None:
+        """Adds `value` to the stat and the percentiles."""
+        self.stat.add(value)
+        for quantile in self.quantiles.values():
+            quantile.add(value)
+
+    def summary(self, name: str) -> dict[str, float]:
+        """Returns the min, max, standard deviation and percentiles, with keys prefixed by `name`."""
+        summary: dict[str, float] = {
+            f"min_{name}": self.stat.minimum or 0,
+            f"max_{name}": self.stat.maximum or 0,
+            f"stdev_{name}": self.stat.stdev(),
+        }
+        for percentile, quantile in self.quantiles.items():
+            summary[f"p{percentile}_{name}"] = quantile.value()
+        return summary
+
+
+class StatsAccumulator:
+    """Running totals and distributions of `PCB` stats during a simulation.
+
+    `simulate` calls `add_process` for each process it simulates, `add` as the
+    stats of the live processes change, `record_tick` once per tick, and
+    `terminate` as processes terminate. Policies that change a stat themselves
+    (e.g. priority aging) report it with `add`.
+
+    I/O devices are numbered as `CPU.take_io_device` gives them out: a process
+    takes the lowest free device and keeps it for its whole I/O burst, as in
+    `timeline.TimelineRecorder`. `simulate` adds each device's busy ticks to
+    `io_busy_ticks`.
+
+    Attributes:
+        count              (int): number of processes added
+        terminated         (int): number of processes terminated
+        totals             (dict[str, int]): sum of each stat over every process added
+        distributions      (dict[str, Distribution]): stats of terminated processes
+        num_cores          (int): number of cores of the simulated CPU
+        io_devices         (int): number of I/O devices
+        window             (int): ticks per throughput window
+        ticks              (int): number of ticks recorded
+        busy_core_ticks    (int): core-ticks spent running a CPU burst
+        io_busy_ticks      (list[int]): ticks each I/O device spent running an I/O burst
+        queue_ticks        (dict[str, int]): sum of each queue's length over the recorded ticks
+        window_completions (list[int]): processes terminated in each window of `window` ticks
+        peak_completions   (int): most processes terminated within any `window` consecutive ticks
+
+    """
+
+    fields: tuple[str, ...] = (
+        "arrival_time",
+        "priority",
+        "ready_time",
+        "running_time",
+        "wait_time",
+        "io_time",
+        "turnaround_time",
+        "exit_time",
+    )
+    distribution_fields: tuple[str, ...] = ("turnaround_time", "wait_time")
+
+    def __init__(
+        self,
+        num_cores: int = 1,
+        io_devices: int = 1,
+        window: int = 100,
+        percentiles: tuple[int, ...] = (50, 95, 99),
+    ) -> None:
+        """__init__ method for `StatsAccumulator`
+
+        Constructs a new, empty `StatsAccumulator` object.
+
+        Args:
+            num_cores (optional): number of cores of the simulated CPU. Defaults to 1.
+            io_devices (optional): number of I/O devices. Defaults to 1.
+            window (optional): ticks per throughput window. Defaults to 100.
+            percentiles (optional): percentiles of turnaround and wait time to track. Defaults to (50, 95, 99).
+
+        """
+        self.count: int = 0
+        self.terminated: int = 0
+        self.totals: dict[str, int] = dict.fromkeys(self.fields, 0)
+        self.distributions: dict[str, Distribution] = {
+            field: Distribution(percentiles) for field in self.distribution_fields
+        }
+
+        self.num_cores: int = num_cores
+        self.io_devices: int = io_devices
+        self.window: int = max(window, 1)
+        self.ticks: int = 0
+        self.busy_core_ticks: int = 0
+        self.queue_ticks: dict[str, int] = {"ready": 0, "waiting": 0, "io": 0}
+        self.window_completions: list[int] = []
+        self.peak_completions: int = 0
+        self.io_busy_ticks: list[int] = [0] * io_devices
+        # Exit times within the last `window` ticks, for the sliding window peak
+        self.__recent_exits: deque[int] = deque()
+
+    @classmethod
+    def from_PCBs(cls, pcbList: list[PCB]) -> "StatsAccumulator":
+        """Returns a `StatsAccumulator` of finished `PCB`s.
+
+        Per-tick measurements (core, I/O device and queue usage) are not
+        available from the `PCB`s, and are left at 0.
+
+        Args:
+            pcbList: `list` of `PCB`s, after a simulation.
+
+        Returns:
+            StatsAccumulator: the stats of `pcbList`.
+
+        """
+        stats: StatsAccumulator = cls()
+        for pcb in sorted(pcbList, key=lambda pcb: pcb.exit_time):
+            stats.add_process(pcb)
+            stats.terminate(pcb)
+        return stats
+
+    def add_process(self, pcb: PCB) -> None:
+        """Adds the current stats of `pcb` to the totals.
+
+        Exit and turnaround time are added by `terminate`.
+        """
+        self.count += 1
+        for field in self.fields:
+            if field not in ("exit_time", "turnaround_time"):
+                self.totals[field] += getattr(pcb, field)
+
+    def add(self, field: str, amount: int) -> None:
+        """Adds `amount` to the total of `field`."""
+        self.totals[field] += amount
+
+    def terminate(self, pcb: PCB) -> None:
+        """Records a terminated `pcb`, whose exit and turnaround time were just set.
+
+        `PCB`s must terminate in order of exit time.
+        """
+        self.terminated += 1
+        self.totals["exit_time"] += pcb.exit_time
+        self.totals["turnaround_time"] += pcb.turnaround_time
+        for field, distribution in self.distributions.items():
+            distribution.add(getattr(pcb, field))
+
+        # Throughput windows
+        index: int = pcb.exit_time // self.window
+        if index >= len(self.window_completions):
+            self.window_completions.extend([0] * (index + 1 - len(self.window_completions)))
+        self.window_completions[index] += 1
+
+        self.__recent_exits.append(pcb.exit_time)
+        while self.__recent_exits[0] <= pcb.exit_time - self.window:
+            self.__recent_exits.popleft()
+        self.peak_completions = max(self.peak_completions, len(self.__recent_exits))
+
+    def record_tick(self, busy_cores: int, ready: int, waiting: int, io_busy: int) -> None:
+        """Records what the CPU and I/O devices did during one tick.
+
+        Args:
+            busy_cores: cores that ran a CPU burst.
+            ready: length of the "ready" queue.
+            waiting: length of the "waiting" queue.
+            io_busy: I/O devices that ran an I/O burst.
+        """
+        self.ticks += 1
+        self.busy_core_ticks += busy_cores
+        self.queue_ticks["ready"] += ready
+        self.queue_ticks["waiting"] += waiting
+        self.queue_ticks["io"] += io_busy
+
+    def idle_core_ticks(self) -> int:
+        """Returns the core-ticks not spent running a CPU burst."""
+        return self.num_cores * self.ticks - self.busy_core_ticks
+
+    def core_utilization(self) -> float:
+        """Returns the measured fraction of core-ticks spent running, 0.0 if no ticks."""
+        return self.busy_core_ticks / (self.num_cores * self.ticks) if self.ticks else 0.0
+
+    def io_device_busy_ticks(self) -> list[int]:
+        """Returns the busy ticks of each I/O device."""
+        return list(self.io_busy_ticks)
+
+    def average_queue_length(self, queue: str) -> float:
+        """Returns the time-weighted average length of "ready", "waiting" or "io", 0.0 if no ticks."""
+        return self.queue_ticks[queue] / self.ticks if self.ticks else 0.0
+
+    def throughput(self) -> float:
+        """Returns terminated processes per recorded tick, 0.0 if no ticks."""
+        return self.terminated / self.ticks if self.ticks else 0.0
+
+    def peak_throughput(self) -> float:
+        """Returns the most processes terminated per tick within any `window` consecutive ticks."""
+        return self.peak_completions / self.window
+
+    def average(self, field: str) -> float:
+        """Returns the average of `field` over every process added, 0.0 if empty."""
+        return self.totals[field] / self.count if self.count else 0.0
+
+
+if __name__ == "__main__":
+    help("stats")
@@ -0,0 +1,215 @@
+"""Runs a grid of headless CPU scheduling simulations in parallel.
+
+CPU Scheduling Parameter Sweep
+
+Every combination of the given scheduling algorithms, cores, I/O devices,
+time slices, input files and seeds is simulated headless (no visualization,
+no delay) in a `ProcessPoolExecutor`, one configuration per task. Each
+result row is appended to one CSV file as soon as its simulation finishes,
+so partial results survive an interrupted sweep.
+
+Seeds only apply to randomized algorithms (e.g. `LOTTERY`). Deterministic
+algorithms are run once per remaining combination, with an empty seed.
+Likewise, time slices only apply to the algorithms in
+`main.time_slice_algorithms`; the others run with the first time slice.
+
+Command-line Args (lists are comma separated):
+    sched(str, optional): Scheduling algorithms. Defaults to every algorithm in `main.scheduling_algorithms`.
+    cpu(int, optional): Numbers of cores. Defaults to `1`.
+    io(int, optional): Numbers of IO devices. Defaults to `1`.
+    timeslice(int, optional): Quantums. Defaults to `1`.
+    input(str, optional): Input data files. Defaults to `"data.json"`.
+    seed(int, optional): Random seeds. Defaults to `0`.
+    workers(int, optional): Number of worker processes. Defaults to the number of CPUs.
+    output(str, optional): Output CSV file. Defaults to `"sweep_results.csv"`.
+
+Examples:
+    python3.11 sweep.py
+
+    python3.11 sweep.py sched=FCFS,RR,PB cpu=1,2,4 io=1,2,4 timeslice=1,5,10 input=cpu_int.json,io_int.json
+
+    python3.11 sweep.py sched=LOTTERY seed=0,1,2,3 workers=4 output=lottery.csv
+
+"""
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import product
+from time import perf_counter
+from pcb import PCB, PCBTrace, TRACE_EXTENSION
+from scheduler import simulate
+from stats import StatsAccumulator
+from tickcounter import Clock
+from main import scheduling_algorithms, time_slice_algorithms, overall_stats
+from generate_input import parse_commandline_args
+
+
+@lru_cache(maxsize=None)
+def load_jobs(file_path: str) -> tuple[dict, ...]:
+    """Reads the jobs of an input file once per worker process.
+
+    Args:
+        file_path: `str` containing the JSON or binary trace file path.
+
+    Returns:
+        tuple[dict, ...]: the job `dict`s in the file.
+
+    """
+    if file_path.endswith(TRACE_EXTENSION):
+        return tuple(dict(pcb) for pcb in PCBTrace(file_path))
+
+    with open(file_path, "r") as jsonFile:
+        return tuple(json.load(jsonFile).get("jobs", []))
+
+
+def run_config(config: dict) -> dict:
+    """Runs one headless simulation and returns its result row.
+
+    Args:
+        config: `dict` with keys "input", "sched", "cpu", "io", "timeslice" and "seed".
+
+    Returns:
+        dict: `config` merged with the overall stats and the wall time of the run.
+
+    """
+    # Bursts are consumed during the simulation, so each run gets its own copies
+    pcbList: list[PCB] = [
+        PCB(**{**job, "cpu_bursts": list(job["cpu_bursts"]), "io_bursts": list(job["io_bursts"])})
+        for job in load_jobs(config["input"])
+    ]
+
+    policy_class = scheduling_algorithms[config["sched"]]
+    policy_kwargs: dict = {"time_slice": config["timeslice"]}
+    if policy_class.randomized:
+        policy_kwargs["seed"] = config["seed"]
+
+    clock: Clock = Clock()
+    start: float = perf_counter()
+    stats: StatsAccumulator = simulate(
+        pcbList=pcbList,
+        policy=policy_class(**policy_kwargs),
+        num_cores=config["cpu"],
+        io_devices=config["io"],
+        sleep_delay=0,
+        visualize=False,
+        clock=clock,
+    )
+    wall_time: float = perf_counter() - start
+
+    return {**config, **overall_stats(stats, clock.get_ticks()), "wall_time": wall_time}
+
+
+def sweep_configs(
+    scheds: list[str],
+    cores: list[int],
+    io_devices: list[int],
+    time_slices: list[int],
+    input_files: list[str],
+    seeds: list[int],
+) -> list[dict]:
+    """Returns every configuration of the grid.
+
+    Seeds are only expanded for randomized algorithms, and time slices only
+    for algorithms in `time_slice_algorithms`. The others run once, with the
+    first time slice.
+
+    Returns:
+        list[dict]: configurations, as accepted by `run_config`.
+
+    """
+    configs: list[dict] = []
+
+    for input_file, sched, cpu, io in product(input_files, scheds, cores, io_devices):
+        for time_slice, seed in product(
+            time_slices if sched in time_slice_algorithms else time_slices[:1],
+            seeds if scheduling_algorithms[sched].randomized else [None],
+        ):
+            configs.append(
+                {
+                    "input": input_file,
+                    "sched": sched,
+                    "cpu": cpu,
+                    "io": io,
+                    "timeslice": time_slice,
+                    "seed": seed,
+                }
+            )
+    return configs
+
+
+def run_sweep(configs: list[dict], output_file: str, workers: int | None = None) -> None:
+    """Runs `configs` in parallel and streams the results into a CSV file.
+
+    Rows are written in completion order, not in the order of `configs`.
+
+    Args:
+        configs: `list` of configurations from `sweep_configs`.
+        output_file: name of the output CSV file.
+        workers (optional): number of worker processes. Defaults to the number of CPUs.
+
+    """
+    with open(output_file, "w", newline="") as csvFile, ProcessPoolExecutor(workers) as executor:
+        writer: csv.DictWriter | None = None
+        futures = [executor.submit(run_config, config) for config in configs]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            row: dict = future.result()
+
+            if writer is None:
+                writer = csv.DictWriter(csvFile, list(row.keys()))
+                writer.writeheader()
+
+            writer.writerow(row)
+            csvFile.flush()
+            print(f"\r[{done}/{len(configs)}]", end="", file=sys.stderr)
+        print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    argv: list[str] = sys.argv[1:]
+    args, kwargs = parse_commandline_args(argv)
+
+    # If --help flag is present, print module level doc-string,
+    # then exit program.
+    if "--help" in args:
+        help("sweep")
+        sys.exit()
+
+    def as_list(key: str, default: str, cast=str) -> list:
+        return [cast(value) for value in kwargs.get(key, default).split(",") if value]
+
+    try:
+        scheds: list[str] = as_list("sched", ",".join(scheduling_algorithms))
+        unknown: set[str] = set(scheds).difference(scheduling_algorithms)
+        if unknown:
+            raise ValueError(f"unknown 'sched' value(s) {unknown}. Must be values in {set(scheduling_algorithms)}.")
+
+        cores: list[int] = as_list("cpu", "1", int)
+        io_devices: list[int] = as_list("io", "1", int)
+        time_slices: list[int] = as_list("timeslice", "1", int)
+        workers: int = int(kwargs.get("workers", os.cpu_count() or 1))
+        for key, values in (("cpu", cores), ("io", io_devices), ("timeslice", time_slices), ("workers", [workers])):
+            if not values or min(values) < 1:
+                raise ValueError(f"invalid value(s) {values} for '{key}'. Must be integers >= 1.")
+
+        configs: list[dict] = sweep_configs(
+            scheds=scheds,
+            cores=cores,
+            io_devices=io_devices,
+            time_slices=time_slices,
+            input_files=as_list("input", "data.json"),
+            seeds=as_list("seed", "0", int),
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start: float = perf_counter()
+    run_sweep(configs, kwargs.get("output", "sweep_results.csv"), workers)
+    print(
+        f"Ran {len(configs)} configurations in {perf_counter() - start:.2f}s"
+        f" with {workers} workers, results in {kwargs.get('output', 'sweep_results.csv')}"
+    )
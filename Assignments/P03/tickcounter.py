@@ -1,16 +1,85 @@
-"""`tickcounter` contains the class `TickCounter`.
+"""`tickcounter` contains the classes `Clock` and `TickCounter`.
 
-`TickCounter` represents a single, "global" instance of a counter.
+`Clock` is the tick counter of one simulation. Every `CPU` owns one, so
+simulations running at the same time, in threads or in asyncio tasks, each
+count their own ticks.
+
+`TickCounter` is kept for compatibility. It used to be a single, "global"
+counter; it now reads and changes the current clock of the calling thread
+or asyncio task, which `simulate` sets to the clock of the simulation it
+runs. After `simulate` returns, `TickCounter.get_ticks()` still gives the
+ticks of that simulation.
 
 """
-class TickCounter:
-    """A class that provides access to a tick counter.
+from contextvars import ContextVar
+
+
+class Clock:
+    """A class for representing the tick counter of one simulation.
+
+    Attributes:
+        ticks (int): the current number of ticks
 
-    The `TickCounter` class provides a singular "tick" counter that can be utilized across
-    different scopes.
     """
 
-    __counter: int = 0
+    def __init__(self, ticks: int = 0) -> None:
+        """__init__ method for `Clock`
+
+        Constructs a new `Clock` object.
+
+        Args:
+            ticks(optional): `int` representing the starting number of ticks. Defaults to 0.
+
+        """
+        self.ticks: int = ticks
+
+    def get_ticks(self) -> int:
+        """Returns the current number of ticks.
+
+        Returns:
+            int: The current number of ticks.
+
+        """
+        return self.ticks
+
+    def increment_ticks(self, amount: int = 1) -> None:
+        """Increments the clock by one or more ticks."""
+        self.ticks += amount
+
+    def set_ticks(self, val: int) -> None:
+        """Sets the current tick count."""
+        self.ticks = val
+
+    def reset_ticks(self) -> None:
+        """Sets the clock to 0."""
+        self.ticks = 0
+
+
+# Clock used by `TickCounter` in the current thread or asyncio task
+__current_clock: ContextVar[Clock] = ContextVar("current_clock")
+
+
+def current_clock() -> Clock:
+    """Returns the current clock of the calling thread or asyncio task, creating one if there is none."""
+    clock: Clock | None = __current_clock.get(None)
+    if clock is None:
+        clock = Clock()
+        __current_clock.set(clock)
+    return clock
+
+
+def use_clock(clock: Clock) -> None:
+    """Makes `clock` the current clock of the calling thread or asyncio task."""
+    __current_clock.set(clock)
+
+
+class TickCounter:
+    """A class that provides access to the current clock.
+
+    Compatibility wrapper around `current_clock`: every method acts on the
+    clock of the simulation last started in the calling thread or asyncio
+    task. New code should use the `Clock` of a `CPU` instead.
+    """
 
     @staticmethod
     def get_ticks() -> int:
@@ -22,7 +91,7 @@ class TickCounter:
             int: The current number of ticks.
 
         """
-        return TickCounter.__counter
+        return current_clock().ticks
 
     @staticmethod
     def increment_ticks(amount: int = 1) -> None:
@@ -30,15 +99,16 @@ class TickCounter:
 
         Increments the tick counter by one or more ticks.
 
-        """   
-        TickCounter.__counter += amount
+        """
+        current_clock().ticks += amount
 
+    @staticmethod
     def set_ticks(val: int) -> None:
         """Set the current tick count.
 
         Sets the current tick count.
         """
-        TickCounter.__counter = val
+        current_clock().ticks = val
 
     @staticmethod
     def reset_ticks() -> None:
@@ -47,7 +117,7 @@ class TickCounter:
         Sets the tick counter to 0.
 
         """
-        TickCounter.__counter = 0
+        current_clock().ticks = 0
 
 if __name__ == "__main__":
     help("tickcounter")
@@ -0,0 +1,283 @@
+"""`timeline` contains `TimelineRecorder`, a per-tick log of process state transitions.
+
+`simulate` records an event each time a process changes state: the tick,
+the process id, the state it left, the state it entered, and the core or
+I/O device involved. Events are stored column by column in typed `array`s,
+so recording costs a few appends and no objects per event.
+
+Timelines export to CSV or to a compact binary format, and can be loaded
+back to be replayed (`events`) or turned into Gantt chart bars (`intervals`).
+
+Event ticks are the ticks the simulation reports in its messages (a process
+terminates at its `exit_time`). The simulation starts a process's I/O, and counts
+a process whose quantum expired as ready, in the same tick it leaves its core,
+so "io" and "ready" intervals can each be one tick shorter than the matching
+`io_time` and `ready_time` stint. "running" intervals add up to `running_time`.
+
+Binary timeline format (little-endian, every section 8-byte aligned):
+
+    header     magic b"PCBTLINE", version (u32), padding (u32), number of events n (u64)
+    tick       n x i64
+    process_id n x i64
+    from_state n x i8
+    to_state   n x i8
+    slot       n x i16, core or I/O device, -1 if none
+
+Typical usage example:
+
+  timeline: TimelineRecorder = TimelineRecorder(num_cores=2, io_devices=1)
+  simulate(pcbList, policy, num_cores=2, visualize=False, timeline=timeline)
+  timeline.to_csv("timeline.csv")
+"""
+import csv
+import heapq
+import struct
+import sys
+from array import array
+from typing import Iterator
+
+# Process states, in the order of `state_names`
+NEW: int = 0
+READY: int = 1
+RUNNING: int = 2
+WAITING: int = 3
+IO: int = 4
+TERMINATED: int = 5
+
+state_names: tuple[str, ...] = ("new", "ready", "running", "waiting", "io", "terminated")
+
+TIMELINE_MAGIC: bytes = b"PCBTLINE"
+TIMELINE_VERSION: int = 1
+# magic, version, padding, number of events
+TIMELINE_HEADER = struct.Struct("<8sIIQ")
+
+# Column names and `array` typecodes, in file order
+timeline_columns: tuple[tuple[str, str], ...] = (
+    ("tick", "q"),
+    ("process_id", "q"),
+    ("from_state", "b"),
+    ("to_state", "b"),
+    ("slot", "h"),
+)
+
+
+class TimelineRecorder:
+    """Records process state transitions into typed column arrays.
+
+    Cores and I/O devices are given stable numbers: a process entering the
+    "running" ("io") state takes the lowest free core (device) and keeps it
+    until it leaves the state.
+
+    Attributes:
+        num_cores  (int): number of cores of the simulated CPU
+        io_devices (int): number of I/O devices
+        tick       (array): tick of each event
+        process_id (array): process id of each event
+        from_state (array): state left, see `state_names`
+        to_state   (array): state entered, see `state_names`
+        slot       (array): core ("running") or device ("io") involved, -1 if none
+
+    """
+
+    def __init__(self, num_cores: int = 1, io_devices: int = 1) -> None:
+        """__init__ method for `TimelineRecorder`
+
+        Constructs a new, empty `TimelineRecorder` object.
+
+        Args:
+            num_cores (optional): number of cores of the simulated CPU. Defaults to 1.
+            io_devices (optional): number of I/O devices. Defaults to 1.
+
+        """
+        self.num_cores: int = num_cores
+        self.io_devices: int = io_devices
+
+        for name, typecode in timeline_columns:
+            setattr(self, name, array(typecode))
+
+        # Heaps of free slots, so the lowest is taken first
+        self.__free: dict[int, list[int]] = {
+            RUNNING: list(range(num_cores)),
+            IO: list(range(io_devices)),
+        }
+        self.__slots: dict[int, dict[int, int]] = {RUNNING: {}, IO: {}}
+
+    def record(self, tick: int, process_id: int, from_state: int, to_state: int) -> None:
+        """Records that process `process_id` moved from `from_state` to `to_state` at `tick`.
+
+        Args:
+            tick: tick of the transition.
+            process_id: id of the process.
+            from_state: state left, e.g. `READY`.
+            to_state: state entered, e.g. `RUNNING`.
+        """
+        slot: int = -1
+
+        # Release the core or device being left
+        if from_state in self.__slots:
+            slot = self.__slots[from_state].pop(process_id, -1)
+            if slot >= 0:
+                heapq.heappush(self.__free[from_state], slot)
+
+        # Take the lowest free core or device
+        if to_state in self.__slots:
+            free: list[int] = self.__free[to_state]
+            slot = heapq.heappop(free) if free else -1
+            self.__slots[to_state][process_id] = slot
+
+        self.tick.append(tick)
+        self.process_id.append(process_id)
+        self.from_state.append(from_state)
+        self.to_state.append(to_state)
+        self.slot.append(slot)
+
+    def __len__(self) -> int:
+        return len(self.tick)
+
+    def events(self) -> Iterator[tuple[int, int, str, str, int]]:
+        """Replays the events in the order they were recorded.
+
+        Yields:
+            tuple[int, int, str, str, int]: tick, process id, state left, state entered and slot.
+        """
+        for tick, process_id, from_state, to_state, slot in zip(
+            self.tick, self.process_id, self.from_state, self.to_state, self.slot
+        ):
+            yield tick, process_id, state_names[from_state], state_names[to_state], slot
+
+    def intervals(self) -> Iterator[tuple[int, str, int, int, int]]:
+        """Yields the time each process spent in each state, e.g. for a Gantt chart.
+
+        An interval starts at the tick a process enters a state and ends at
+        the tick it leaves it. Intervals are yielded when they end; the
+        "terminated" state has no end and is not yielded.
+
+        Yields:
+            tuple[int, str, int, int, int]: process id, state, start tick, end tick and slot.
+        """
+        # Process id -> (state, start tick, slot) of the open interval
+        current: dict[int, tuple[int, int, int]] = {}
+
+        for tick, process_id, from_state, to_state, slot in zip(
+            self.tick, self.process_id, self.from_state, self.to_state, self.slot
+        ):
+            state, start, open_slot = current.pop(process_id, (from_state, tick, -1))
+            if tick > start:
+                yield process_id, state_names[state], start, tick, open_slot
+            if to_state != TERMINATED:
+                current[process_id] = (to_state, tick, slot if to_state in (RUNNING, IO) else -1)
+
+    def to_csv(self, file_path: str) -> None:
+        """Writes the events to a csv file, with state names.
+
+        Args:
+            file_path: name of the csv file.
+        """
+        with open(file_path, "w", newline="") as csvFile:
+            writer = csv.writer(csvFile)
+            writer.writerow([name for name, _ in timeline_columns])
+            writer.writerows(self.events())
+
+    def to_binary(self, file_path: str) -> None:
+        """Writes the events to a binary timeline file.
+
+        Args:
+            file_path: name of the binary file.
+        """
+        with open(file_path, "wb") as timelineFile:
+            timelineFile.write(TIMELINE_HEADER.pack(TIMELINE_MAGIC, TIMELINE_VERSION, 0, len(self)))
+            for name, _ in timeline_columns:
+                column: array = getattr(self, name)
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                timelineFile.write(column.tobytes())
+                # Pad to keep every section 8-byte aligned
+                timelineFile.write(bytes(-len(column) * column.itemsize % 8))
+
+    def save(self, file_path: str) -> None:
+        """Writes the events to `file_path`, as csv if it ends in ".csv", binary otherwise."""
+        if file_path.endswith(".csv"):
+            self.to_csv(file_path)
+        else:
+            self.to_binary(file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "TimelineRecorder":
+        """Reads a timeline written by `save`, as csv if it ends in ".csv", binary otherwise.
+
+        Slot numbers are read back as recorded; the returned recorder is meant for
+        replaying, not for recording more events.
+
+        Args:
+            file_path: name of the timeline file.
+
+        Returns:
+            TimelineRecorder: the recorded events.
+
+        Raises:
+            ValueError: if the file is not a timeline, or is truncated.
+        """
+        if file_path.endswith(".csv"):
+            return cls.from_csv(file_path)
+
+        timeline: TimelineRecorder = cls(0, 0)
+
+        with open(file_path, "rb") as timelineFile:
+            header: bytes = timelineFile.read(TIMELINE_HEADER.size)
+            if len(header) < TIMELINE_HEADER.size:
+                raise ValueError(f"'{file_path}' is not a binary timeline")
+
+            magic, version, _, length = TIMELINE_HEADER.unpack(header)
+            if magic != TIMELINE_MAGIC or version != TIMELINE_VERSION:
+                raise ValueError(f"'{file_path}' is not a version {TIMELINE_VERSION} binary timeline")
+
+            for name, typecode in timeline_columns:
+                column: array = array(typecode)
+                size: int = length * column.itemsize
+                data: bytes = timelineFile.read(size)
+                if len(data) < size:
+                    raise ValueError(f"'{file_path}' is truncated")
+                column.frombytes(data)
+                if sys.byteorder == "big":
+                    column.byteswap()
+                setattr(timeline, name, column)
+                timelineFile.read(-size % 8)
+
+        return timeline
+
+    @classmethod
+    def from_csv(cls, file_path: str) -> "TimelineRecorder":
+        """Reads a timeline written by `to_csv`.
+
+        Args:
+            file_path: name of the csv file.
+
+        Returns:
+            TimelineRecorder: the recorded events.
+
+        Raises:
+            ValueError: if the file is not a csv timeline.
+        """
+        timeline: TimelineRecorder = cls(0, 0)
+        states: dict[str, int] = {name: state for state, name in enumerate(state_names)}
+
+        with open(file_path, newline="") as csvFile:
+            reader = csv.reader(csvFile)
+            if next(reader, None) != [name for name, _ in timeline_columns]:
+                raise ValueError(f"'{file_path}' is not a csv timeline")
+
+            try:
+                for tick, process_id, from_state, to_state, slot in reader:
+                    timeline.tick.append(int(tick))
+                    timeline.process_id.append(int(process_id))
+                    timeline.from_state.append(states[from_state])
+                    timeline.to_state.append(states[to_state])
+                    timeline.slot.append(int(slot))
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"'{file_path}' is not a csv timeline: {e}") from e
+
+        return timeline
+
+if __name__ == "__main__":
+    help("timeline")
@@ -0,0 +1,452 @@
+"""Generates large, reproducible workloads for CPU Scheduling Simulation with NumPy.
+
+Unlike `generate_input.generate_file`, which builds one job at a time, every
+burst count, burst length, arrival time and priority of a block of
+`BLOCK_SIZE` jobs is drawn in one batch from a `numpy.random.Generator` of its
+own, seeded from `seed` and the index of the block. Chunks are cut from these
+blocks and written to the output file as they are generated, so memory use
+depends on `chunk_size`, not on the number of jobs, and the same `seed` gives
+the same jobs whatever the `chunk_size`.
+
+Output format is chosen by the extension of `ofile`: ".pcbt" for a binary
+trace (see `pcb`), ".jsonl" for JSON-lines, anything else for the JSON format
+written by `generate_file`. Binary traces are by far the fastest to write.
+
+Usage: (All params have defaults, but can be changed with the following):
+
+        nj              : Number of jobs [1 - n]
+        seed            : Seed for the random values. Defaults to unseeded.
+        minCpuBT        : Min cpu burst length.
+        maxCpuBT        : Max cpu burst length (mean is (min + max) / 2 for non-uniform distributions).
+        minIOBT         : Min io burst length.
+        maxIOBT         : Max io burst length.
+        minNumBursts    : Min number of cpu bursts [1 - n]
+        maxNumBursts    : Max number of cpu bursts
+        intBurstType    : "cpu", "io" or "normal", same as `generate_file`
+        burstDist       : "uniform", "exponential", "lognormal" or "pareto" (heavy tail)
+        shape           : sigma for "lognormal", alpha for "pareto". Defaults to 1.0 and 1.5.
+        arrivals        : "uniform" (minat - maxat jobs per tick) or "poisson" (rate jobs per tick)
+        minat           : Min jobs per arrival time [1-n]
+        maxat           : Max jobs per arrival time
+        rate            : Mean jobs per tick for "poisson" arrivals. Defaults to (minat + maxat) / 2.
+        prioWeights     : "low", "even" or "high", same as `generate_file`
+        chunk_size      : Number of jobs generated and written at a time. Does not change the jobs.
+        ofile           : Output file name.
+
+Example Commands:
+
+        workload.py nj=10000000 seed=1 ofile=huge.pcbt
+
+        workload.py nj=100000 seed=7 burstDist=pareto shape=1.2 arrivals=poisson rate=0.5 ofile=heavy.jsonl
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+from typing import Iterator
+import numpy as np
+from generate_input import WeightedPriorities, parse_commandline_args
+from pcb import TRACE_EXTENSION, TRACE_HEADER, TRACE_MAGIC, TRACE_VERSION, trace_layout
+
+# Largest burst that fits in a binary trace
+MAX_BURST: int = np.iinfo(np.int32).max
+
+# Number of jobs drawn from each child generator, independent of the chunk size
+BLOCK_SIZE: int = 1 << 14
+
+burst_distributions: tuple[str, ...] = ("uniform", "exponential", "lognormal", "pareto")
+arrival_distributions: tuple[str, ...] = ("uniform", "poisson")
+
+
+def draw_bursts(
+    rng: np.random.Generator, dist: str, size: int, low: int, high: int, shape: float | None = None
+) -> np.ndarray:
+    """Draws `size` burst lengths from a distribution.
+
+    "uniform" draws integers in [`low`, `high`]. The other distributions are
+    never below `low` and have a mean (or median, for "lognormal") around
+    (`low` + `high`) / 2, except "pareto", whose tail is controlled by `shape`.
+
+    Args:
+        rng: random number generator.
+        dist: one of `burst_distributions`.
+        size: number of bursts.
+        low: minimum burst length.
+        high: maximum burst length for "uniform", sets the mean otherwise.
+        shape (optional): sigma for "lognormal", alpha for "pareto".
+
+    Returns:
+        np.ndarray: `int32` burst lengths.
+
+    Raises:
+        ValueError: if `dist` is not a burst distribution.
+
+    """
+    low = max(low, 1)
+    high = max(high, low)
+    mean: float = (low + high) / 2
+
+    if dist == "uniform":
+        return rng.integers(low, high + 1, size=size, dtype=np.int32)
+
+    if dist == "exponential":
+        bursts: np.ndarray = low + rng.exponential(mean - low, size=size)
+    elif dist == "lognormal":
+        bursts = rng.lognormal(np.log(mean), 1.0 if shape is None else shape, size=size)
+    elif dist == "pareto":
+        bursts = low * (1 + rng.pareto(1.5 if shape is None else shape, size=size))
+    else:
+        raise ValueError(f"unknown burst distribution '{dist}'. Must be one of {burst_distributions}.")
+
+    return np.clip(np.rint(bursts), low, MAX_BURST).astype(np.int32)
+
+
+class WorkloadGenerator:
+    """Generates chunks of jobs, drawn in batches of `BLOCK_SIZE` jobs.
+
+    Each chunk is a `dict` of NumPy arrays: "arrival_time", "process_id" and
+    "priority" (one value per job), "cpu_counts" and "io_counts" (bursts per
+    job), and "cpu_bursts" and "io_bursts" (every job's bursts, back to back).
+    Arrival times continue from one chunk to the next.
+
+    Block i is drawn from a generator seeded with `seed_sequence`'s entropy and
+    spawn key (i,), so the jobs only depend on the seed, not on how they are
+    split into chunks.
+
+    Attributes:
+        kwargs (dict): the generation parameters, as written to JSON output
+        seed_sequence (np.random.SeedSequence): the root of the block generators
+
+    """
+
+    def __init__(
+        self,
+        seed: int | None = None,
+        minCpuBT: int = 5,
+        maxCpuBT: int = 15,
+        minIOBT: int = 10,
+        maxIOBT: int = 20,
+        minNumBursts: int = 5,
+        maxNumBursts: int = 13,
+        intBurstType: str = "normal",
+        burstDist: str = "uniform",
+        shape: float | None = None,
+        arrivals: str = "uniform",
+        minat: int = 1,
+        maxat: int = 3,
+        rate: float | None = None,
+        prioWeights: str = "even",
+    ) -> None:
+        """__init__ method for `WorkloadGenerator`
+
+        Constructs a new `WorkloadGenerator` object. Parameters are described
+        in the module documentation.
+
+        Raises:
+            ValueError: if a distribution or the priority weights are unknown.
+
+        """
+        if burstDist not in burst_distributions:
+            raise ValueError(f"unknown burst distribution '{burstDist}'. Must be one of {burst_distributions}.")
+        if arrivals not in arrival_distributions:
+            raise ValueError(f"unknown arrivals '{arrivals}'. Must be one of {arrival_distributions}.")
+
+        weights: dict[str, list[int]] = WeightedPriorities().priorityChoiceWeights
+        if prioWeights not in weights:
+            raise ValueError(f"unknown prioWeights '{prioWeights}'. Must be one of {set(weights)}.")
+
+        # Same adjustments as `generate_file`
+        if "cpu" in intBurstType:
+            minCpuBT, maxCpuBT, minIOBT, maxIOBT = minCpuBT + 10, maxCpuBT + 20, minIOBT - 9, maxIOBT - 9
+        if "io" in intBurstType:
+            minCpuBT, maxCpuBT, minIOBT, maxIOBT = minCpuBT + 4, maxCpuBT + 4, minIOBT + 10, maxIOBT + 20
+
+        self.seed_sequence: np.random.SeedSequence = np.random.SeedSequence(seed)
+        self.cpu_range: tuple[int, int] = (minCpuBT, maxCpuBT)
+        self.io_range: tuple[int, int] = (minIOBT, maxIOBT)
+        self.num_bursts_range: tuple[int, int] = (max(minNumBursts, 1), max(maxNumBursts, minNumBursts, 1))
+        self.burstDist: str = burstDist
+        self.shape: float | None = shape
+        self.arrivals: str = arrivals
+        self.at_range: tuple[int, int] = (max(minat, 1), max(maxat, minat, 1))
+        self.rate: float = rate if rate else sum(self.at_range) / 2
+        self.priority_p: np.ndarray = np.array(weights[prioWeights], dtype=float)
+        self.priority_p /= self.priority_p.sum()
+
+        self.kwargs: dict = {
+            "seed": seed,
+            "minCpuBT": minCpuBT,
+            "maxCpuBT": maxCpuBT,
+            "minIOBT": minIOBT,
+            "maxIOBT": maxIOBT,
+            "minNumBursts": self.num_bursts_range[0],
+            "maxNumBursts": self.num_bursts_range[1],
+            "intBurstType": intBurstType,
+            "burstDist": burstDist,
+            "shape": shape,
+            "arrivals": arrivals,
+            "minat": self.at_range[0],
+            "maxat": self.at_range[1],
+            "rate": self.rate,
+            "prioWeights": prioWeights,
+        }
+
+        self.__next_id: int = 0
+        # Current block, its burst offsets, and the number of its jobs already used
+        self.__block_index: int = 0
+        self.__block: dict[str, np.ndarray] | None = None
+        self.__offsets: dict[str, np.ndarray] = {}
+        self.__used: int = 0
+        # Uniform arrivals: current tick, and jobs still to arrive at it
+        self.__tick: int = -1
+        self.__remaining: int = 0
+        # Poisson arrivals: continuous time of the last arrival
+        self.__clock: float = 0.0
+
+    def __arrival_times(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.arrivals == "poisson":
+            times: np.ndarray = self.__clock + np.cumsum(rng.exponential(1 / self.rate, size=size))
+            self.__clock = float(times[-1])
+            return times.astype(np.int64)
+
+        # Finish the current tick, then draw the number of jobs of each following tick
+        first: int = min(self.__remaining, size)
+        self.__remaining -= first
+        rest: int = size - first
+        if not rest:
+            return np.full(size, self.__tick, dtype=np.int64)
+
+        counts: np.ndarray = rng.integers(self.at_range[0], self.at_range[1] + 1, size=rest // self.at_range[0] + 1)
+        ticks: np.ndarray = np.repeat(np.arange(self.__tick + 1, self.__tick + 1 + len(counts), dtype=np.int64), counts)[:rest]
+
+        last: int = int(ticks[-1])
+        self.__remaining = int(counts[last - self.__tick - 1]) - int(np.count_nonzero(ticks == last))
+        times: np.ndarray = np.concatenate((np.full(first, self.__tick, dtype=np.int64), ticks))
+        self.__tick = last
+        return times
+
+    def __next_block(self) -> None:
+        # Draws the next `BLOCK_SIZE` jobs from the generator of their block
+        rng: np.random.Generator = np.random.default_rng(
+            np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=(self.__block_index,))
+        )
+        self.__block_index += 1
+
+        cpu_counts: np.ndarray = rng.integers(
+            self.num_bursts_range[0], self.num_bursts_range[1] + 1, size=BLOCK_SIZE, dtype=np.int64
+        )
+        io_counts: np.ndarray = cpu_counts - 1
+
+        process_ids: np.ndarray = np.arange(self.__next_id, self.__next_id + BLOCK_SIZE, dtype=np.int64)
+        self.__next_id += BLOCK_SIZE
+
+        self.__block = {
+            "arrival_time": self.__arrival_times(rng, BLOCK_SIZE),
+            "process_id": process_ids,
+            "priority": rng.choice(np.arange(1, len(self.priority_p) + 1), size=BLOCK_SIZE, p=self.priority_p),
+            "cpu_counts": cpu_counts,
+            "io_counts": io_counts,
+            "cpu_bursts": draw_bursts(rng, self.burstDist, int(cpu_counts.sum()), *self.cpu_range, self.shape),
+            "io_bursts": draw_bursts(rng, self.burstDist, int(io_counts.sum()), *self.io_range, self.shape),
+        }
+        self.__offsets = {
+            kind: np.concatenate(([0], np.cumsum(self.__block[f"{kind}_counts"]))) for kind in ("cpu", "io")
+        }
+        self.__used = 0
+
+    def chunk(self, size: int) -> dict[str, np.ndarray]:
+        """Generates the next `size` jobs.
+
+        Args:
+            size: number of jobs.
+
+        Returns:
+            dict[str, np.ndarray]: the chunk, as described in the class documentation.
+
+        """
+        pieces: list[dict[str, np.ndarray]] = []
+
+        while size > 0 or not pieces:
+            if self.__block is None or self.__used == BLOCK_SIZE:
+                self.__next_block()
+
+            start: int = self.__used
+            end: int = min(start + size, BLOCK_SIZE)
+            piece: dict[str, np.ndarray] = {
+                name: self.__block[name][start:end]
+                for name in ("arrival_time", "process_id", "priority", "cpu_counts", "io_counts")
+            }
+            for kind in ("cpu", "io"):
+                offsets: np.ndarray = self.__offsets[kind]
+                piece[f"{kind}_bursts"] = self.__block[f"{kind}_bursts"][offsets[start]:offsets[end]]
+            pieces.append(piece)
+
+            self.__used = end
+            size -= end - start
+
+        if len(pieces) == 1:
+            return pieces[0]
+        return {name: np.concatenate([piece[name] for piece in pieces]) for name in pieces[0]}
+
+    def chunks(self, nj: int, chunk_size: int = 1 << 20) -> Iterator[dict[str, np.ndarray]]:
+        """Generates `nj` jobs, `chunk_size` at a time.
+
+        Args:
+            nj: number of jobs.
+            chunk_size (optional): number of jobs per chunk.
+
+        Yields:
+            dict[str, np.ndarray]: the next chunk.
+
+        """
+        for start in range(0, nj, chunk_size):
+            yield self.chunk(min(chunk_size, nj - start))
+
+
+def chunk_jobs(chunk: dict[str, np.ndarray]) -> Iterator[dict]:
+    """Yields the jobs of a chunk as job `dict`s, in the format of `generate_file`."""
+    cpu_bursts: list[int] = chunk["cpu_bursts"].tolist()
+    io_bursts: list[int] = chunk["io_bursts"].tolist()
+    cpu_start: int = 0
+    io_start: int = 0
+
+    for arrival_time, process_id, priority, cpu_count, io_count in zip(
+        chunk["arrival_time"].tolist(),
+        chunk["process_id"].tolist(),
+        chunk["priority"].tolist(),
+        chunk["cpu_counts"].tolist(),
+        chunk["io_counts"].tolist(),
+    ):
+        yield {
+            "arrival_time": arrival_time,
+            "process_id": process_id,
+            "priority": priority,
+            "cpu_bursts": cpu_bursts[cpu_start:cpu_start + cpu_count],
+            "io_bursts": io_bursts[io_start:io_start + io_count],
+        }
+        cpu_start += cpu_count
+        io_start += io_count
+
+
+def write_trace_chunks(chunks: Iterator[dict[str, np.ndarray]], ofile: str) -> int:
+    """Writes chunks to a binary trace file.
+
+    Each section of the trace is spooled to its own temporary file while the
+    chunks are generated, then the sections are joined behind the header.
+
+    Args:
+        chunks: chunks from `WorkloadGenerator.chunks`.
+        ofile: Name of output binary trace file.
+
+    Returns:
+        int: number of jobs written.
+
+    """
+    sections: list[str] = [name for name, _, _ in trace_layout(0, 0, 0)]
+    dtypes: dict[str, str] = {name: "<i8" if typecode == "q" else "<i4" for name, typecode, _ in trace_layout(0, 0, 0)}
+    spools: dict = {name: tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(ofile))) for name in sections}
+    totals: dict[str, int] = {"jobs": 0, "cpu_bursts": 0, "io_bursts": 0}
+
+    try:
+        spools["cpu_offsets"].write(np.zeros(1, dtype="<i8").tobytes())
+        spools["io_offsets"].write(np.zeros(1, dtype="<i8").tobytes())
+
+        for chunk in chunks:
+            for name in ("arrival_time", "process_id", "priority", "cpu_bursts", "io_bursts"):
+                spools[name].write(chunk[name].astype(dtypes[name]).tobytes())
+            for kind in ("cpu", "io"):
+                offsets: np.ndarray = totals[f"{kind}_bursts"] + np.cumsum(chunk[f"{kind}_counts"])
+                spools[f"{kind}_offsets"].write(offsets.astype("<i8").tobytes())
+                totals[f"{kind}_bursts"] += len(chunk[f"{kind}_bursts"])
+            totals["jobs"] += len(chunk["process_id"])
+
+        with open(ofile, "wb") as traceFile:
+            traceFile.write(
+                TRACE_HEADER.pack(
+                    TRACE_MAGIC, TRACE_VERSION, 0, totals["jobs"], totals["cpu_bursts"], totals["io_bursts"]
+                )
+            )
+            for name in sections:
+                spool = spools[name]
+                size: int = spool.tell()
+                spool.seek(0)
+                shutil.copyfileobj(spool, traceFile, 1 << 20)
+                # Pad to keep every section 8-byte aligned
+                traceFile.write(bytes(-size % 8))
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    return totals["jobs"]
+
+
+def write_workload(generator: WorkloadGenerator, nj: int, ofile: str, chunk_size: int = 1 << 20) -> int:
+    """Generates `nj` jobs and writes them to `ofile`, one chunk at a time.
+
+    Args:
+        generator: `WorkloadGenerator` drawing the jobs.
+        nj: number of jobs.
+        ofile: Name of output file. The extension selects the format.
+        chunk_size (optional): number of jobs generated and written at a time.
+
+    Returns:
+        int: number of jobs written.
+
+    """
+    chunks: Iterator[dict[str, np.ndarray]] = generator.chunks(nj, chunk_size)
+
+    if ofile.endswith(TRACE_EXTENSION):
+        return write_trace_chunks(chunks, ofile)
+
+    with open(ofile, "w") as jsonFile:
+        if ofile.endswith(".jsonl"):
+            for chunk in chunks:
+                jsonFile.writelines(f"{json.dumps(job)}\n" for job in chunk_jobs(chunk))
+            return nj
+
+        # Same layout as `generate_file`, without the indentation
+        kwargs: dict = {"nj": nj, **generator.kwargs, "ofile": ofile}
+        jsonFile.write(f'{{"kwargs": {json.dumps(kwargs)}, "jobs": [')
+        separator: str = "\n"
+        for chunk in chunks:
+            for job in chunk_jobs(chunk):
+                jsonFile.write(separator)
+                jsonFile.write(json.dumps(job))
+                separator = ",\n"
+        jsonFile.write("\n]}\n")
+
+    return nj
+
+
+if __name__ == "__main__":
+    argv: list[str] = sys.argv[1:]
+    args, kwargs = parse_commandline_args(argv)
+
+    if "--help" in args:
+        # Print documentation
+        help("workload")
+        sys.exit()
+
+    int_params: tuple[str, ...] = (
+        "seed", "minCpuBT", "maxCpuBT", "minIOBT", "maxIOBT", "minNumBursts", "maxNumBursts", "minat", "maxat"
+    )
+    float_params: tuple[str, ...] = ("shape", "rate")
+
+    try:
+        nj: int = int(kwargs.pop("nj", 1000))
+        chunk_size: int = int(kwargs.pop("chunk_size", 1 << 20))
+        ofile: str = kwargs.pop("ofile", "workload.pcbt")
+        generator_kwargs: dict = {
+            key: int(value) if key in int_params else float(value) if key in float_params else value
+            for key, value in kwargs.items()
+        }
+        generator: WorkloadGenerator = WorkloadGenerator(**generator_kwargs)
+    except (TypeError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start: float = perf_counter()
+    written: int = write_workload(generator, nj, ofile, chunk_size)
+    print(f"Wrote {written} jobs to {ofile} in {perf_counter() - start:.2f}s")